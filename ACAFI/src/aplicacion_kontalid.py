@@ -0,0 +1,110 @@
+import logging
+import subprocess
+import pyautogui
+
+APP_ID_KONTALID = "shell:AppsFolder\\57778KONTALID.KONTALIDTools_1crwx9b2rpxma!com.embarcadero.KONTALIDTools"
+EJECUTABLE_KONTALID = "KONTALIDTools.exe"
+# Texto de la pantalla principal que indica que la aplicación está lista
+MARCADOR_LISTA = "Documento"
+
+
+class AplicacionKontalid:
+    """
+    Ciclo de vida de KONTALID Tools durante una corrida del descargador.
+
+    La aplicación se abre una sola vez y se reutiliza entre archivos. Antes de
+    cada archivo se verifica que siga abierta y respondiendo (tasklist con el
+    estado NOT RESPONDING de Windows) y se vuelve al campo de búsqueda; solo si
+    se cerró o se colgó se reinicia. La disponibilidad se detecta esperando el
+    marcador "Documento" en pantalla, no con una espera fija.
+
+    Parámetros:
+        localizador (LocalizadorBotones): Localizador de botones por OCR.
+        app_id (str): Identificador de la aplicación para explorer.exe.
+        ejecutable (str): Nombre del proceso (para tasklist y taskkill).
+        maximo_inicio (float): Tiempo máximo para que la aplicación esté lista (s).
+    """
+
+    def __init__(self, localizador, app_id=APP_ID_KONTALID, ejecutable=EJECUTABLE_KONTALID,
+                 maximo_inicio=60):
+        self.localizador = localizador
+        self.app_id = app_id
+        self.ejecutable = ejecutable
+        self.maximo_inicio = maximo_inicio
+        self.inicios = 0
+
+    def _tasklist(self, *filtros):
+        argumentos = ["tasklist", "/NH", "/FI", f"IMAGENAME eq {self.ejecutable}"]
+        for filtro in filtros:
+            argumentos += ["/FI", filtro]
+        salida = subprocess.run(argumentos, capture_output=True, text=True).stdout
+        return self.ejecutable.lower() in salida.lower()
+
+    def esta_abierta(self):
+        return self._tasklist()
+
+    def esta_colgada(self):
+        """Windows marca la ventana como NOT RESPONDING cuando deja de procesar mensajes."""
+        return self._tasklist("STATUS eq NOT RESPONDING")
+
+    def iniciar(self):
+        """
+        Abre la aplicación y espera el marcador de la pantalla principal.
+
+        Retorno:
+            bool: True si la aplicación quedó lista dentro de maximo_inicio.
+        """
+        logging.info("Iniciando KONTALID Tools...")
+        subprocess.Popen(["explorer.exe", self.app_id], shell=True)
+        self.inicios += 1
+        if self.localizador.esperar(MARCADOR_LISTA, self.maximo_inicio) is None:
+            logging.error(f"KONTALID Tools no mostró '{MARCADOR_LISTA}' en {self.maximo_inicio} s.")
+            return False
+        logging.info("KONTALID Tools lista.")
+        return True
+
+    def cerrar(self):
+        subprocess.run(["taskkill", "/f", "/im", self.ejecutable], shell=True)
+        logging.info("KONTALID Tools cerrada.")
+
+    def reiniciar(self):
+        self.cerrar()
+        return self.iniciar()
+
+    def asegurar(self):
+        """Abre la aplicación si no está abierta y la reinicia si está colgada."""
+        if not self.esta_abierta():
+            return self.iniciar()
+        if self.esta_colgada():
+            logging.warning("KONTALID Tools no responde; se reinicia.")
+            return self.reiniciar()
+        return True
+
+    def preparar_busqueda(self):
+        """
+        Deja el foco en el campo de búsqueda de documentos (vacío) para empezar
+        un archivo. Si la pantalla no muestra el marcador, la aplicación se
+        reinicia una vez.
+
+        Retorno:
+            bool: True si el campo de búsqueda quedó listo.
+        """
+        for intento in range(2):
+            if intento:
+                logging.warning(f"No se encontró '{MARCADOR_LISTA}'; se reinicia KONTALID Tools.")
+                self.cerrar()
+            if not self.asegurar():
+                continue
+            # Cerrar un diálogo de descarga que haya quedado abierto
+            pyautogui.press('esc')
+            if self.localizador.hacer_clic(MARCADOR_LISTA, maximo=10):
+                # En lugar de una pausa fija, esperar a que la pantalla vuelva a
+                # mostrar el marcador (comparación de píxeles) antes de escribir
+                if self.localizador.esperar(MARCADOR_LISTA, maximo=10) is None:
+                    continue
+                pyautogui.press('tab')
+                # Limpiar la búsqueda del archivo anterior
+                pyautogui.hotkey('ctrl', 'a')
+                pyautogui.press('delete')
+                return True
+        return False
@@ -0,0 +1,162 @@
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+
+from main_pdf import process_pdf, process_pdfs
+from corpus_facturas import generar_corpus
+
+
+def memoria_pico_mb(incluir_hijos=False):
+    """
+    Pico de memoria residente (RSS) del proceso en MB; con incluir_hijos se suma
+    el pico de los procesos hijos ya terminados (pool de process_pdfs).
+    """
+    try:
+        import resource
+    except ImportError:
+        return _memoria_pico_windows_mb()
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if incluir_hijos:
+        pico += resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(pico / divisor, 1)
+
+
+def _memoria_pico_windows_mb():
+    import ctypes
+    from ctypes import wintypes
+
+    class ContadoresMemoria(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t), ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    contadores = ContadoresMemoria()
+    contadores.cb = ctypes.sizeof(contadores)
+    ctypes.windll.psapi.GetProcessMemoryInfo(
+        ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(contadores), contadores.cb)
+    return round(contadores.PeakWorkingSetSize / (1024 * 1024), 1)
+
+
+def _normalizar(valor):
+    # Las descripciones largas se parten en varias líneas dentro de la celda
+    return " ".join(valor.split()) if isinstance(valor, str) else valor
+
+
+def comparar_campos(extraido, esperado):
+    """Retorna {campo: acierto} para cada campo de esperado.json (los grupos, por subcampo)."""
+    aciertos = {}
+    for campo, valor in esperado.items():
+        if campo == "paginas":
+            continue
+        if isinstance(valor, dict):
+            grupo = extraido.get(campo) or {}
+            for subcampo, subvalor in valor.items():
+                aciertos[subcampo] = grupo.get(subcampo) == subvalor
+        else:
+            aciertos[campo] = _normalizar(extraido.get(campo)) == _normalizar(valor)
+    return aciertos
+
+
+def ejecutar_benchmark(carpeta, procesos=1, limite=None):
+    """
+    Ejecuta process_pdf sobre el corpus de la carpeta (generado con
+    corpus_facturas) y mide páginas por segundo, pico de memoria y aciertos por
+    campo contra esperado.json.
+
+    Parámetros:
+        carpeta (str): Carpeta con los PDFs y esperado.json.
+        procesos (int): 1 para medir process_pdf en este proceso; más de 1 usa
+            process_pdfs con ese número de procesos.
+        limite (int): Número máximo de documentos a procesar.
+    """
+    with open(os.path.join(carpeta, "esperado.json"), "r", encoding="utf-8") as f:
+        esperado = json.load(f)
+    nombres = sorted(esperado)[:limite]
+    rutas = [os.path.join(carpeta, nombre) for nombre in nombres]
+    paginas = sum(esperado[nombre]["paginas"] for nombre in nombres)
+
+    inicio = time.perf_counter()
+    if procesos > 1:
+        resultados = process_pdfs(rutas, max_workers=procesos)
+    else:
+        resultados = {}
+        for ruta in rutas:
+            try:
+                resultados[ruta] = (process_pdf(ruta), None)
+            except Exception as e:
+                resultados[ruta] = (None, f"{type(e).__name__}: {e}")
+    segundos = time.perf_counter() - inicio
+
+    aciertos_por_campo = {}
+    documentos_correctos = 0
+    errores = 0
+    for nombre, ruta in zip(nombres, rutas):
+        datos, error = resultados[ruta]
+        if error:
+            errores += 1
+            logging.error(f"{nombre}: {error}")
+            datos = {}
+        aciertos = comparar_campos(datos, esperado[nombre])
+        for campo, acierto in aciertos.items():
+            aciertos_por_campo[campo] = aciertos_por_campo.get(campo, 0) + acierto
+        if all(aciertos.values()):
+            documentos_correctos += 1
+        else:
+            fallidos = [campo for campo, acierto in aciertos.items() if not acierto]
+            logging.warning(f"{nombre}: campos incorrectos {fallidos}")
+
+    documentos = len(nombres)
+    return {
+        "documentos": documentos,
+        "paginas": paginas,
+        "procesos": procesos,
+        "segundos": round(segundos, 2),
+        "paginas_por_segundo": round(paginas / segundos, 1) if segundos else None,
+        "documentos_por_segundo": round(documentos / segundos, 1) if segundos else None,
+        "memoria_pico_mb": memoria_pico_mb(incluir_hijos=procesos > 1),
+        "errores": errores,
+        "documentos_correctos": round(documentos_correctos / documentos, 4) if documentos else None,
+        "aciertos_por_campo": {
+            campo: round(total / documentos, 4) for campo, total in aciertos_por_campo.items()},
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Mide la extracción de process_pdf sobre un corpus de facturas sintéticas.")
+    parser.add_argument("--corpus", help="Carpeta de un corpus existente (con esperado.json).")
+    parser.add_argument("--documentos", type=int, default=2000,
+                        help="Documentos a generar si no se indica --corpus.")
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--multipagina", type=float, default=0.2)
+    parser.add_argument("--procesos", type=int, default=1)
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el resumen.")
+    opciones = parser.parse_args(argumentos)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if opciones.corpus:
+        resumen = ejecutar_benchmark(opciones.corpus, opciones.procesos)
+    else:
+        with tempfile.TemporaryDirectory(prefix="corpus_facturas_") as carpeta:
+            generar_corpus(carpeta, opciones.documentos, opciones.semilla, opciones.multipagina)
+            resumen = ejecutar_benchmark(carpeta, opciones.procesos)
+
+    print(json.dumps(resumen, ensure_ascii=False, indent=2))
+    if opciones.salida:
+        with open(opciones.salida, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
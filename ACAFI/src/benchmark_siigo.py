@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import time
+import queue
+import random
+import logging
+import argparse
+import tempfile
+import threading
+import statistics
+
+from main import (
+    configurar_logging, iniciar_navegador, navegar_a_url, login, ingresar_cliente,
+    contiene_nota, crear_factura_compra, ingresar_datos_factura, obtener_y_mover_factura,
+    calcular_linea_iva)
+from registrar_cuenta import registrar_cuenta_en_web
+from registro_terceros import RegistroTerceros
+from sesion_navegador import GestorSesiones, crear_opciones_chrome
+from esperas import configurar_esperas
+from siigo_simulado import SimuladorSiigo
+
+# NIT de la empresa simulada en la que se registran las facturas
+NIT_EMPRESA = "900000001"
+
+
+def generar_facturas(cantidad, proveedores=5, semilla=1):
+    """
+    Genera facturas sintéticas con el mismo formato que el plan de cada fila de
+    main.py. Cada cuarta factura lleva el IVA como otro ítem (5 %) y las demás
+    con el impuesto del cliente (19 %). Los proveedores se repiten, así que solo
+    la primera factura de cada uno crea el tercero.
+    """
+    aleatorio = random.Random(semilla)
+    facturas = []
+    for numero in range(1, cantidad + 1):
+        valor = aleatorio.randrange(100, 20000) * 100
+        tarifa = 0.05 if numero % 4 == 0 else 0.19
+        iva = round(valor * tarifa, 2)
+        nit_tercero = str(800000000 + numero % proveedores)
+        facturas.append({
+            "numero": numero,
+            "nit_tercero": nit_tercero,
+            "razon_social": f"Proveedor {nit_tercero} SAS",
+            "prefijo": "FE",
+            "consecutivo": str(1000 + numero),
+            "fecha": "15/01/2025",
+            "codigo_producto": "1001",
+            "centro_costo": "1-1",
+            "valor": str(valor),
+            "iva": str(iva),
+            "valor_total": str(valor + iva),
+            "iva_cliente": "IVA 19 MV",
+            "codigo_iva": "2408",
+        })
+    return facturas
+
+
+def procesar_factura(driver, factura, carpeta, registro_terceros):
+    """
+    Recorre los pasos web de main.py para una factura de compra: crear el
+    comprobante, crear el tercero si hace falta, llenar el formulario, guardar y
+    mover el PDF con el número asignado.
+
+    Retorno:
+        bool: True si Siigo asignó un número a la factura.
+    """
+    _, xpath_factura, _ = contiene_nota("Factura electrónica")
+    ruta_pdf = os.path.join(carpeta, "pdf", f"{factura['numero']}.pdf")
+    with open(ruta_pdf, "wb") as f:
+        f.write(b"%PDF-1.4\n% benchmark\n")
+    datos_pdf = {
+        "Archivo": ruta_pdf,
+        "Información del vendedor": {
+            "Tipo de contribuyente": "Persona Jurídica", "Régimen fiscal": "O-13"},
+        "Descripción del producto": "Servicio",
+    }
+
+    crear_factura_compra(driver, factura["fecha"], factura["nit_tercero"], xpath_factura)
+    registrar_cuenta_en_web(
+        driver, [datos_pdf], factura["nit_tercero"], factura["razon_social"],
+        registro_terceros, NIT_EMPRESA)
+    ingresar_datos_factura(
+        driver, factura["prefijo"], factura["consecutivo"], factura["codigo_producto"],
+        factura["nit_tercero"], factura["valor"], factura["iva"], factura["iva_cliente"],
+        factura["centro_costo"],
+        calcular_linea_iva(factura["valor"], factura["iva"], factura["valor_total"]),
+        factura["codigo_iva"])
+    _, resultado, _ = obtener_y_mover_factura(
+        driver, carpeta, ruta_pdf, factura["razon_social"],
+        f"{factura['prefijo']}{factura['consecutivo']}", os.path.join(carpeta, "salida"))
+    return resultado
+
+
+def trabajador_benchmark(numero, cola, url, chromedriver, headless, carpeta, resultados):
+    """Procesa facturas de la cola con su propio navegador, como trabajador_archivos."""
+    def iniciar():
+        opciones = crear_opciones_chrome()
+        if headless:
+            opciones.add_argument("--headless=new")
+        return iniciar_navegador(chromedriver, opciones)
+
+    gestor_sesiones = GestorSesiones(
+        iniciar=iniciar, navegar=lambda driver: navegar_a_url(driver, url), autenticar=login)
+    registro_terceros = RegistroTerceros(os.path.join(carpeta, "terceros.sqlite"))
+    try:
+        driver = gestor_sesiones.obtener(f"benchmark-{numero}", "clave")
+        ingresar_cliente(driver, NIT_EMPRESA, False)
+        while True:
+            try:
+                factura = cola.get_nowait()
+            except queue.Empty:
+                break
+            inicio = time.perf_counter()
+            try:
+                exitosa = procesar_factura(driver, factura, carpeta, registro_terceros)
+            except Exception as e:
+                logging.error(f"Factura {factura['numero']} fallida: {e}")
+                exitosa = False
+            resultados.append({
+                "numero": factura["numero"], "exitosa": bool(exitosa),
+                "inicio": inicio, "fin": time.perf_counter(),
+            })
+    finally:
+        gestor_sesiones.cerrar_todas()
+        registro_terceros.cerrar()
+
+
+def ejecutar_benchmark(chromedriver, facturas=20, trabajadores=1, proveedores=5,
+                       latencias=None, perfil="rapido", headless=True):
+    """
+    Levanta Siigo simulado, procesa facturas sintéticas con el flujo web de
+    main.py y retorna el resumen de rendimiento (facturas por minuto).
+
+    Parámetros:
+        chromedriver (str): Ruta del ejecutable de ChromeDriver.
+        facturas (int): Número de facturas sintéticas.
+        trabajadores (int): Navegadores simultáneos.
+        proveedores (int): Proveedores distintos (terceros que se crean una vez).
+        latencias (dict): Latencias del simulador (ver LATENCIAS_POR_DEFECTO).
+        perfil (str): Perfil de esperas (ver PERFILES_ESPERA).
+        headless (bool): Ejecutar Chrome sin ventana.
+    """
+    configurar_esperas({"perfil": perfil})
+    simulador = SimuladorSiigo(
+        latencias=latencias, empresas={NIT_EMPRESA: "Empresa benchmark"}).iniciar()
+    cola = queue.Queue()
+    for factura in generar_facturas(facturas, proveedores):
+        cola.put(factura)
+    resultados = []
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_siigo_") as carpeta:
+        os.makedirs(os.path.join(carpeta, "pdf"))
+        inicio = time.perf_counter()
+        hilos = [
+            threading.Thread(
+                target=trabajador_benchmark, name=f"benchmark-{numero}",
+                args=(numero, cola, simulador.url, chromedriver, headless, carpeta, resultados))
+            for numero in range(1, trabajadores + 1)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        total = time.perf_counter() - inicio
+    simulador.detener()
+
+    exitosas = [r for r in resultados if r["exitosa"]]
+    duraciones = [r["fin"] - r["inicio"] for r in resultados]
+    # Ventana de procesamiento: sin el arranque de Chrome ni el login
+    ventana = (max(r["fin"] for r in resultados) - min(r["inicio"] for r in resultados)
+               if resultados else 0)
+    return {
+        "facturas": facturas,
+        "exitosas": len(exitosas),
+        "fallidas": facturas - len(exitosas),
+        "guardadas_en_simulador": len(simulador.comprobantes),
+        "trabajadores": trabajadores,
+        "perfil_esperas": perfil,
+        "latencias": simulador.latencias,
+        "segundos_totales": round(total, 2),
+        "segundos_procesamiento": round(ventana, 2),
+        "segundos_por_factura": round(statistics.mean(duraciones), 2) if duraciones else None,
+        "facturas_por_minuto": round(len(exitosas) * 60 / ventana, 2) if ventana else 0.0,
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Mide las facturas por minuto del flujo web contra Siigo simulado.")
+    parser.add_argument("--chromedriver", required=True, help="Ruta de ChromeDriver.")
+    parser.add_argument("--facturas", type=int, default=20)
+    parser.add_argument("--trabajadores", type=int, default=1)
+    parser.add_argument("--proveedores", type=int, default=5)
+    parser.add_argument("--perfil", default="rapido", help="Perfil de esperas.")
+    parser.add_argument("--latencias", type=json.loads, default={},
+                        help='Latencias del simulador, p. ej. \'{"guardar": 2}\'.')
+    parser.add_argument("--con-ventana", action="store_true",
+                        help="Mostrar Chrome (por defecto se ejecuta sin ventana).")
+    parser.add_argument("--minimo", type=float, default=0.0,
+                        help="Facturas por minuto mínimas; por debajo el comando falla.")
+    parser.add_argument("--salida", help="Archivo JSON donde guardar el resumen.")
+    opciones = parser.parse_args(argumentos)
+
+    configurar_logging("logs/benchmark_siigo.jsonl")
+    resumen = ejecutar_benchmark(
+        opciones.chromedriver, opciones.facturas, opciones.trabajadores,
+        opciones.proveedores, opciones.latencias, opciones.perfil,
+        headless=not opciones.con_ventana)
+
+    print(json.dumps(resumen, ensure_ascii=False, indent=2))
+    if opciones.salida:
+        with open(opciones.salida, "w", encoding="utf-8") as f:
+            json.dump(resumen, f, ensure_ascii=False, indent=2)
+
+    # Código de salida distinto de 0 para que CI detecte regresiones
+    if resumen["fallidas"] or resumen["facturas_por_minuto"] < opciones.minimo:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
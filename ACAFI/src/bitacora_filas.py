@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import logging
+
+
+class BitacoraFilas:
+    """
+    Bitácora append-only (JSON Lines) con el resultado de cada fila de un Excel.
+
+    En lugar de reescribir el libro completo después de cada fila, cada resultado
+    se agrega como una línea y se sincroniza a disco. El Excel se materializa solo
+    en los puntos de control (fin de lote, fin de archivo): se escribe en un archivo
+    temporal, se reemplaza el original de forma atómica y después se vacía la
+    bitácora. Si el proceso se interrumpe, al cargar de nuevo el Excel se aplican
+    los registros pendientes, así que no se pierde ningún resultado.
+
+    Las filas se identifican por su índice en el DataFrame cargado del Excel.
+    """
+
+    def __init__(self, ruta_excel, carpeta_bitacoras, prefijo="filas"):
+        self.ruta_excel = str(ruta_excel)
+        os.makedirs(carpeta_bitacoras, exist_ok=True)
+        nombre_base = os.path.splitext(os.path.basename(self.ruta_excel))[0]
+        self.ruta = os.path.join(
+            str(carpeta_bitacoras), f"{prefijo}_{nombre_base}.jsonl")
+
+    def registrar(self, indice, columnas):
+        """Agrega a la bitácora los valores de columnas de una fila."""
+        registro = {"indice": int(indice), "columnas": columnas, "ts": time.time()}
+        with open(self.ruta, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def registrar_en(self, df, indice, columnas):
+        """Actualiza la fila en el DataFrame en memoria y la registra en la bitácora."""
+        for columna, valor in columnas.items():
+            df.at[indice, columna] = valor
+        self.registrar(indice, columnas)
+
+    def leer(self):
+        """Retorna los registros pendientes, ignorando una última línea incompleta."""
+        if not os.path.exists(self.ruta):
+            return []
+        registros = []
+        with open(self.ruta, "r", encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    registros.append(json.loads(linea))
+                except ValueError:
+                    logging.warning(f"Línea incompleta en la bitácora {self.ruta}; se ignora.")
+        return registros
+
+    def aplicar(self, df):
+        """
+        Aplica sobre el DataFrame los registros pendientes (recuperación tras una
+        interrupción). Retorna el número de registros aplicados.
+        """
+        registros = self.leer()
+        for registro in registros:
+            indice = registro["indice"]
+            if indice not in df.index:
+                continue
+            for columna, valor in registro["columnas"].items():
+                if columna not in df.columns:
+                    df[columna] = ""
+                df.at[indice, columna] = valor
+        if registros:
+            logging.info(
+                f"Se aplicaron {len(registros)} registros pendientes de la bitácora {self.ruta}.")
+        return len(registros)
+
+    def materializar(self, df, ruta_excel=None):
+        """
+        Escribe el DataFrame en el Excel de forma atómica y vacía la bitácora.
+        """
+        ruta_excel = str(ruta_excel or self.ruta_excel)
+        ruta_temporal = f"{ruta_excel}.tmp"
+        # Se escribe a través de un manejador para que pandas no valide la extensión .tmp
+        with open(ruta_temporal, "wb") as f:
+            df.to_excel(f, index=False, engine="openpyxl")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(ruta_temporal, ruta_excel)
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
+        logging.info(f"Archivo Excel materializado en: {ruta_excel}")
@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+
+from main_pdf import VERSION_EXTRACCION
+
+
+class CacheExtraccion:
+    """
+    Caché persistente (SQLite) de los datos extraídos de los PDFs de facturas.
+
+    Cada entrada se identifica por el CUFE y guarda el hash SHA-256 del PDF y la
+    versión de la extracción; si el archivo cambia o la entrada es de otra versión
+    de process_pdf, deja de ser válida. Para no leer el archivo completo
+    en cada consulta, el hash solo se recalcula cuando cambian el tamaño o la fecha
+    de modificación. Las entradas se purgan por antigüedad (último uso) y por
+    número máximo de registros.
+    """
+
+    def __init__(self, ruta_db, max_entradas=20000, max_dias=90, version=VERSION_EXTRACCION):
+        self.ruta_db = str(ruta_db)
+        self.version = version
+        self.max_entradas = max_entradas
+        self.max_dias = max_dias
+        directorio = os.path.dirname(self.ruta_db)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._conexion = sqlite3.connect(self.ruta_db, timeout=30)
+        self._conexion.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extracciones (
+                cufe TEXT PRIMARY KEY,
+                hash TEXT NOT NULL,
+                tamano INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                datos TEXT NOT NULL,
+                creado REAL NOT NULL,
+                usado REAL NOT NULL,
+                version INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        # Bases creadas antes de la columna de versión: sus entradas quedan con versión 0
+        columnas = [fila[1] for fila in self._conexion.execute("PRAGMA table_info(extracciones)")]
+        if "version" not in columnas:
+            self._conexion.execute(
+                "ALTER TABLE extracciones ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        self._conexion.commit()
+
+    @staticmethod
+    def calcular_hash(ruta_pdf):
+        sha = hashlib.sha256()
+        with open(ruta_pdf, "rb") as f:
+            for bloque in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(bloque)
+        return sha.hexdigest()
+
+    def obtener(self, cufe, ruta_pdf):
+        """
+        Retorna los datos extraídos guardados para el CUFE si el PDF no ha cambiado
+        y la entrada es de la versión actual, o None si no hay entrada válida.
+        """
+        try:
+            fila = self._conexion.execute(
+                "SELECT hash, tamano, mtime_ns, datos, version FROM extracciones WHERE cufe = ?",
+                (cufe,)).fetchone()
+            if fila is None:
+                return None
+
+            hash_guardado, tamano, mtime_ns, datos, version = fila
+            if version != self.version:
+                logging.info(
+                    f"La caché del CUFE {cufe} es de la versión {version} de la extracción "
+                    f"(actual {self.version}); se descarta.")
+                self._conexion.execute("DELETE FROM extracciones WHERE cufe = ?", (cufe,))
+                self._conexion.commit()
+                return None
+            estado = os.stat(ruta_pdf)
+            if (estado.st_size, estado.st_mtime_ns) != (tamano, mtime_ns):
+                if self.calcular_hash(ruta_pdf) != hash_guardado:
+                    logging.info(f"El PDF del CUFE {cufe} cambió; se descarta la caché.")
+                    self._conexion.execute(
+                        "DELETE FROM extracciones WHERE cufe = ?", (cufe,))
+                    self._conexion.commit()
+                    return None
+                # Mismo contenido con otra fecha: actualizar la firma del archivo
+                self._conexion.execute(
+                    "UPDATE extracciones SET tamano = ?, mtime_ns = ? WHERE cufe = ?",
+                    (estado.st_size, estado.st_mtime_ns, cufe))
+
+            self._conexion.execute(
+                "UPDATE extracciones SET usado = ? WHERE cufe = ?", (time.time(), cufe))
+            self._conexion.commit()
+
+            datos_extraidos = json.loads(datos)
+            datos_extraidos["Archivo"] = ruta_pdf
+            return datos_extraidos
+
+        except (OSError, sqlite3.Error, ValueError) as e:
+            logging.warning(f"No se pudo leer la caché de extracción para {cufe}: {e}")
+            return None
+
+    def guardar(self, cufe, ruta_pdf, datos_extraidos):
+        """Guarda (o reemplaza) los datos extraídos del PDF de un CUFE."""
+        try:
+            estado = os.stat(ruta_pdf)
+            ahora = time.time()
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO extracciones "
+                "(cufe, hash, tamano, mtime_ns, datos, creado, usado, version) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (cufe, self.calcular_hash(ruta_pdf), estado.st_size, estado.st_mtime_ns,
+                 json.dumps(datos_extraidos, ensure_ascii=False), ahora, ahora, self.version))
+            self._conexion.commit()
+        except (OSError, sqlite3.Error, TypeError) as e:
+            logging.warning(f"No se pudo guardar la caché de extracción para {cufe}: {e}")
+
+    def purgar(self):
+        """Elimina las entradas sin uso en max_dias y las más antiguas por encima de max_entradas."""
+        try:
+            limite = time.time() - self.max_dias * 86400
+            eliminadas = self._conexion.execute(
+                "DELETE FROM extracciones WHERE usado < ?", (limite,)).rowcount
+            eliminadas += self._conexion.execute(
+                "DELETE FROM extracciones WHERE cufe IN ("
+                "SELECT cufe FROM extracciones ORDER BY usado DESC LIMIT -1 OFFSET ?)",
+                (self.max_entradas,)).rowcount
+            self._conexion.commit()
+            if eliminadas:
+                logging.info(f"Caché de extracción: {eliminadas} entradas purgadas.")
+        except sqlite3.Error as e:
+            logging.warning(f"No se pudo purgar la caché de extracción: {e}")
+
+    def cerrar(self):
+        self._conexion.close()
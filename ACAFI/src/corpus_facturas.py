@@ -0,0 +1,344 @@
+import os
+import sys
+import json
+import zlib
+import random
+import logging
+import argparse
+
+# Tamaño carta en puntos y márgenes de la representación gráfica
+ANCHO_PAGINA = 612
+ALTO_PAGINA = 792
+MARGEN = 40
+INTERLINEA = 12
+
+# Columnas de la tabla de ítems: (encabezado, ancho en puntos). La descripción es
+# la tercera columna, como en las facturas que lee _descripcion_en_tablas.
+COLUMNAS_ITEMS = (
+    ("Nro", 25), ("Código", 50), ("Descripción", 190), ("U/M", 30), ("Cantidad", 45),
+    ("Precio unitario", 62), ("Descuento", 45), ("IVA", 35), ("Total", 50),
+)
+ALTO_FILA = 14
+
+DEPARTAMENTOS = (
+    "Antioquia", "Bogotá D.C.", "Valle del Cauca", "Atlántico", "Santander",
+    "Cundinamarca", "Bolívar", "Risaralda", "Nariño", "Boyacá",
+)
+MUNICIPIOS = ("Medellín", "Bogotá", "Cali", "Barranquilla", "Bucaramanga", "Cartagena")
+EMPRESAS = (
+    "Distribuciones Andinas S.A.S.", "Comercializadora El Ñandú Ltda.",
+    "Servicios Técnicos Integrales S.A.", "Papelería y Suministros del Norte S.A.S.",
+    "Transportes Rápidos de Occidente S.A.S.", "Ferretería La Económica S.A.S.",
+)
+NOMBRES = ("María José", "Juan Camilo", "Andrés Felipe", "Luz Ángela", "Sebastián", "Inés")
+APELLIDOS = ("Pérez Gómez", "Rodríguez Peña", "Muñoz Álvarez", "Castaño Ríos", "Ortiz León")
+FORMAS_DE_PAGO = ("Contado", "Crédito")
+# Formas de la línea de IVA en los totales (con y sin la tarifa antes del monto)
+ETIQUETAS_IVA = ("IVA", "IVA 19%", "IVA (19%)", "Total IVA 19 %")
+REGIMENES_JURIDICA = (
+    "O-13 - Gran contribuyente", "O-15 - Autorretenedor",
+    "O-23 - Agente de retención IVA", "O-47 - Régimen simple de tributación",
+)
+REGIMEN_NATURAL = "R-99-PN - No aplica - Otros"
+DESCRIPCIONES = (
+    "Servicio de mantenimiento preventivo de equipos de cómputo",
+    "Resma papel carta 75 g",
+    "Arrendamiento de bodega mes de enero",
+    "Honorarios por asesoría contable y tributaria del período",
+    "Tóner referencia CF258A compatible",
+    "Transporte de mercancía Medellín - Bogotá",
+    "Café molido 500 g",
+    "Licencia de software de facturación anual con soporte técnico incluido",
+)
+
+
+def formato_pesos(valor):
+    """1234567.5 -> '1.234.567,50' (separadores colombianos)."""
+    return f"{valor:,.2f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def _texto_pdf(texto):
+    """Cadena literal PDF en WinAnsiEncoding (cp1252)."""
+    datos = texto.encode("cp1252", errors="replace")
+    datos = datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+    return b"(" + datos + b")"
+
+
+def _partir(texto, ancho, tamano):
+    """Divide el texto en líneas que caben en el ancho (ancho medio de Helvetica)."""
+    maximo = max(1, int(ancho / (tamano * 0.5)))
+    lineas, actual = [], ""
+    for palabra in texto.split():
+        candidata = f"{actual} {palabra}".strip()
+        if len(candidata) > maximo and actual:
+            lineas.append(actual)
+            actual = palabra
+        else:
+            actual = candidata
+    lineas.append(actual)
+    return lineas
+
+
+class PaginaPDF:
+    """Operadores de contenido de una página (texto en Helvetica y líneas)."""
+
+    def __init__(self):
+        self.operadores = []
+
+    def texto(self, x, y, texto, tamano=8, negrita=False):
+        fuente = "F2" if negrita else "F1"
+        self.operadores.append(
+            b"BT /%s %d Tf %.2f %.2f Td %s Tj ET" % (
+                fuente.encode(), tamano, x, y, _texto_pdf(texto)))
+
+    def linea(self, x1, y1, x2, y2):
+        self.operadores.append(b"%.2f %.2f m %.2f %.2f l S" % (x1, y1, x2, y2))
+
+    def contenido(self):
+        return b"0.5 w\n" + b"\n".join(self.operadores)
+
+
+def escribir_pdf(ruta, paginas):
+    """
+    Escribe un PDF mínimo (Helvetica y Helvetica-Bold en WinAnsiEncoding,
+    contenido comprimido con Flate) con las páginas indicadas.
+    """
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # /Pages, cuando se conocen los números de las páginas
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    referencias = []
+    for pagina in paginas:
+        contenido = zlib.compress(pagina.contenido())
+        objetos.append(
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (
+                len(contenido), contenido))
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>" % (
+                ANCHO_PAGINA, ALTO_PAGINA, len(objetos)))
+        referencias.append(b"%d 0 R" % len(objetos))
+    objetos[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(referencias), len(referencias))
+
+    salida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    posiciones = []
+    for numero, objeto in enumerate(objetos, start=1):
+        posiciones.append(len(salida))
+        salida += b"%d 0 obj\n%s\nendobj\n" % (numero, objeto)
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for posicion in posiciones:
+        salida += b"%010d 00000 n \n" % posicion
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objetos) + 1, inicio_xref)
+    with open(ruta, "wb") as f:
+        f.write(salida)
+
+
+def datos_factura_aleatoria(numero, aleatorio, proporcion_multipagina=0.2):
+    """Datos de una factura sintética (emisor, comprador, ítems y totales)."""
+    natural = aleatorio.random() < 0.35
+    if natural:
+        razon_social = f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)}"
+        tipo = "Persona Natural y asimiladas"
+        regimen = REGIMEN_NATURAL
+    else:
+        razon_social = aleatorio.choice(EMPRESAS)
+        tipo = "Persona Jurídica y asimiladas"
+        regimen = aleatorio.choice(REGIMENES_JURIDICA)
+
+    cantidad_items = (aleatorio.randint(40, 90) if aleatorio.random() < proporcion_multipagina
+                      else aleatorio.randint(1, 8))
+    items = []
+    for _ in range(cantidad_items):
+        cantidad = aleatorio.randint(1, 20)
+        precio = aleatorio.randrange(1000, 500000, 50)
+        items.append({
+            "codigo": str(aleatorio.randint(1000, 9999)),
+            "descripcion": aleatorio.choice(DESCRIPCIONES),
+            "cantidad": cantidad,
+            "precio": precio,
+        })
+    total_bruto = sum(item["cantidad"] * item["precio"] for item in items)
+
+    return {
+        "numero": f"FE{numero}",
+        "cufe": f"{aleatorio.getrandbits(192):048x}",
+        "fecha": f"{aleatorio.randint(1, 28):02d}/{aleatorio.randint(1, 12):02d}/2025",
+        "forma_de_pago": aleatorio.choice(FORMAS_DE_PAGO),
+        "razon_social": razon_social,
+        "nit_emisor": str(aleatorio.randint(800000000, 999999999)),
+        "tipo_contribuyente": tipo,
+        "regimen": regimen,
+        "departamento": aleatorio.choice(DEPARTAMENTOS),
+        "municipio": aleatorio.choice(MUNICIPIOS),
+        "comprador": aleatorio.choice(EMPRESAS),
+        "nit_comprador": str(aleatorio.randint(800000000, 999999999)),
+        "items": items,
+        "total_bruto": total_bruto,
+        "iva": round(total_bruto * 0.19, 2),
+        "etiqueta_iva": aleatorio.choice(ETIQUETAS_IVA),
+    }
+
+
+def _encabezado_tabla(pagina, y):
+    x = MARGEN
+    for encabezado, ancho in COLUMNAS_ITEMS:
+        pagina.texto(x + 2, y - ALTO_FILA + 4, encabezado, 7, negrita=True)
+        x += ancho
+    return y - ALTO_FILA
+
+
+def _bordes_tabla(pagina, y_superior, alturas):
+    """Dibuja la cuadrícula de la tabla para que se detecte por líneas."""
+    ancho_total = sum(ancho for _, ancho in COLUMNAS_ITEMS)
+    y = y_superior
+    pagina.linea(MARGEN, y, MARGEN + ancho_total, y)
+    for alto in alturas:
+        y -= alto
+        pagina.linea(MARGEN, y, MARGEN + ancho_total, y)
+    x = MARGEN
+    for _, ancho in COLUMNAS_ITEMS + (("", 0),):
+        pagina.linea(x, y_superior, x, y)
+        x += ancho
+
+
+def paginas_factura(datos):
+    """Construye las páginas de la representación gráfica de la factura."""
+    paginas = [PaginaPDF()]
+    pagina = paginas[0]
+    y = ALTO_PAGINA - MARGEN
+
+    def escribir(texto, tamano=8, negrita=False, x=MARGEN):
+        nonlocal y
+        pagina.texto(x, y, texto, tamano, negrita)
+        y -= INTERLINEA
+
+    escribir("Representación Gráfica de Factura Electrónica de Venta", 11, True)
+    escribir(f"Factura Electrónica de Venta No. {datos['numero']}", 9, True)
+    y -= 4
+    escribir("Datos del Documento", 9, True)
+    escribir(f"Código Único de Factura - CUFE: {datos['cufe']}")
+    escribir(f"Fecha de Emisión: {datos['fecha']}")
+    escribir(f"Forma de pago: {datos['forma_de_pago']}")
+    escribir("Medio de Pago: Transferencia débito bancaria")
+    y -= 4
+    escribir("Datos del Emisor / Vendedor", 9, True)
+    # Razón social y NIT en la misma línea, como en la representación de la DIAN
+    pagina.texto(320, y, f"Nit del Emisor: {datos['nit_emisor']}", 8)
+    escribir(f"Razón Social: {datos['razon_social']}")
+    escribir(f"Tipo de Contribuyente: {datos['tipo_contribuyente']}")
+    escribir(f"Régimen Fiscal: {datos['regimen']}")
+    escribir(f"Departamento: {datos['departamento']}")
+    escribir(f"Municipio / Ciudad: {datos['municipio']}")
+    escribir("Dirección: Calle 10 # 20 - 30")
+    y -= 4
+    escribir("Datos del Adquiriente / Comprador", 9, True)
+    escribir(f"Nombre o Razón Social: {datos['comprador']}")
+    escribir(f"Número Documento: {datos['nit_comprador']}")
+    y -= 4
+    escribir("Detalles de Productos", 9, True)
+
+    # Tabla de ítems, repartida en varias páginas si no cabe
+    y_tabla = y
+    y = _encabezado_tabla(pagina, y)
+    alturas = [ALTO_FILA]
+    ancho_descripcion = COLUMNAS_ITEMS[2][1] - 4
+    for numero, item in enumerate(datos["items"], start=1):
+        lineas = _partir(item["descripcion"], ancho_descripcion, 7)
+        alto = ALTO_FILA + (len(lineas) - 1) * 9
+        if y - alto < MARGEN + 80:
+            _bordes_tabla(pagina, y_tabla, alturas)
+            pagina = PaginaPDF()
+            paginas.append(pagina)
+            y_tabla = y = ALTO_PAGINA - MARGEN
+            y = _encabezado_tabla(pagina, y)
+            alturas = [ALTO_FILA]
+        celdas = (
+            str(numero), item["codigo"], lineas, "UND", str(item["cantidad"]),
+            formato_pesos(item["precio"]), "0,00", "19,00",
+            formato_pesos(item["cantidad"] * item["precio"]))
+        x = MARGEN
+        for celda, (_, ancho) in zip(celdas, COLUMNAS_ITEMS):
+            for i, linea in enumerate(celda if isinstance(celda, list) else [celda]):
+                pagina.texto(x + 2, y - 10 - i * 9, linea, 7)
+            x += ancho
+        y -= alto
+        alturas.append(alto)
+    _bordes_tabla(pagina, y_tabla, alturas)
+
+    # Totales después de la tabla (en una página nueva si no caben)
+    if y < MARGEN + 70:
+        pagina = PaginaPDF()
+        paginas.append(pagina)
+        y = ALTO_PAGINA - MARGEN
+    y -= 16
+    for etiqueta, valor in (
+            ("Total Bruto Factura", datos["total_bruto"]), (datos["etiqueta_iva"], datos["iva"]),
+            ("Total neto factura", datos["total_bruto"] + datos["iva"])):
+        pagina.texto(360, y, etiqueta, 8, negrita=True)
+        pagina.texto(480, y, formato_pesos(valor), 8)
+        y -= INTERLINEA
+    return paginas
+
+
+def valores_esperados(datos, paginas):
+    """Lo que process_pdf debería extraer de la factura."""
+    natural = datos["regimen"] == REGIMEN_NATURAL
+    return {
+        "paginas": paginas,
+        "Información del vendedor": {
+            "Tipo de contribuyente": "Persona Natural" if natural else "Persona Jurídica",
+            "Departamento": datos["departamento"],
+            "Régimen fiscal": datos["regimen"].split(" - ")[0],
+        },
+        "Forma de Pago": datos["forma_de_pago"],
+        "Descripción del producto": datos["items"][0]["descripcion"],
+        "Total Bruto Factura": f"{datos['total_bruto']:.2f}",
+        "NIT Emisor": datos["nit_emisor"],
+        "Fecha de Emisión": datos["fecha"],
+        "Total IVA": f"{datos['iva']:.2f}",
+    }
+
+
+def generar_corpus(carpeta, documentos=1000, semilla=1, proporcion_multipagina=0.2):
+    """
+    Genera facturas PDF sintéticas estilo DIAN en la carpeta y guarda en
+    esperado.json los valores que se deben extraer de cada una.
+
+    Retorno:
+        dict: {nombre del archivo: valores esperados}.
+    """
+    os.makedirs(carpeta, exist_ok=True)
+    aleatorio = random.Random(semilla)
+    esperado = {}
+    for numero in range(1, documentos + 1):
+        datos = datos_factura_aleatoria(numero, aleatorio, proporcion_multipagina)
+        paginas = paginas_factura(datos)
+        nombre = f"{datos['cufe']}.pdf"
+        escribir_pdf(os.path.join(carpeta, nombre), paginas)
+        esperado[nombre] = valores_esperados(datos, len(paginas))
+    with open(os.path.join(carpeta, "esperado.json"), "w", encoding="utf-8") as f:
+        json.dump(esperado, f, ensure_ascii=False, indent=1)
+    logging.info(f"Corpus de {documentos} facturas generado en {carpeta}")
+    return esperado
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Genera facturas PDF sintéticas estilo DIAN con sus valores esperados.")
+    parser.add_argument("carpeta")
+    parser.add_argument("--documentos", type=int, default=1000)
+    parser.add_argument("--semilla", type=int, default=1)
+    parser.add_argument("--multipagina", type=float, default=0.2,
+                        help="Proporción de facturas con varias páginas de ítems.")
+    opciones = parser.parse_args(argumentos)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    generar_corpus(opciones.carpeta, opciones.documentos, opciones.semilla, opciones.multipagina)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,203 @@
+import re
+import time
+import logging
+import threading
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import (
+    TimeoutException, StaleElementReferenceException, WebDriverException)
+
+
+# Perfiles de velocidad:
+#   sondeo: cada cuánto se evalúa una condición (s)
+#   maximo: tiempo máximo por defecto que se espera una condición (s)
+#   respaldo: máximo para las esperas "blandas" (autocompletados, desplegables);
+#             si se agota se continúa igual que con el time.sleep anterior
+#   asentamiento: pausa mínima tras una acción que dispara animaciones (s)
+PERFILES_ESPERA = {
+    "rapido": {"sondeo": 0.1, "maximo": 10, "respaldo": 3, "asentamiento": 0.1},
+    "normal": {"sondeo": 0.2, "maximo": 15, "respaldo": 5, "asentamiento": 0.3},
+    "lento": {"sondeo": 0.5, "maximo": 30, "respaldo": 10, "asentamiento": 1.0},
+}
+
+XPATH_RESULTADOS_AUTOCOMPLETADO = "//table[contains(@class, 'siigo-ac-table')]//tr"
+
+# Segundos acumulados por hilo en esperas de condiciones y en pausas fijas
+_tiempos = threading.local()
+
+
+def tiempos_hilo():
+    """(segundos en esperas de condiciones, segundos en pausas fijas) del hilo actual."""
+    return getattr(_tiempos, "espera", 0.0), getattr(_tiempos, "pausa", 0.0)
+
+
+def pausar(segundos):
+    """time.sleep que se suma a las pausas fijas del hilo actual."""
+    time.sleep(segundos)
+    _tiempos.pausa = getattr(_tiempos, "pausa", 0.0) + segundos
+
+
+class PoliticaEspera:
+    """
+    Capa de esperas compartida por los flujos del formulario de Siigo.
+
+    Reemplaza los time.sleep fijos por esperas sobre condiciones concretas del DOM
+    (resultados de autocompletado visibles, opciones de un desplegable cargadas,
+    número de la factura en title-container). Cada espera termina en cuanto se cumple
+    su condición, así que la latencia por factura depende de lo que tarde Siigo.
+    """
+
+    def __init__(self, perfil="normal", **ajustes):
+        if perfil not in PERFILES_ESPERA:
+            raise ValueError(f"Perfil de espera no válido: {perfil}")
+        self.perfil = perfil
+        valores = dict(PERFILES_ESPERA[perfil])
+        valores.update({k: v for k, v in ajustes.items() if k in valores})
+        self.sondeo = valores["sondeo"]
+        self.maximo = valores["maximo"]
+        self.respaldo = valores["respaldo"]
+        self.asentamiento = valores["asentamiento"]
+
+    def esperar(self, driver, condicion, maximo=None, mensaje=""):
+        """
+        Espera hasta que la condición retorne un valor verdadero y lo retorna.
+
+        Raises:
+            TimeoutException: Si la condición no se cumple dentro del máximo.
+        """
+        inicio = time.perf_counter()
+        try:
+            return WebDriverWait(
+                driver, maximo or self.maximo, poll_frequency=self.sondeo,
+                ignored_exceptions=(StaleElementReferenceException,),
+            ).until(condicion, mensaje)
+        finally:
+            _tiempos.espera = getattr(_tiempos, "espera", 0.0) + time.perf_counter() - inicio
+
+    def esperar_o_continuar(self, driver, condicion, maximo=None, descripcion="condición"):
+        """
+        Espera "blanda": si la condición no se cumple dentro del máximo de respaldo
+        se registra y se continúa (retorna None) en lugar de lanzar la excepción.
+        """
+        try:
+            return self.esperar(driver, condicion, maximo or self.respaldo)
+        except TimeoutException:
+            logging.warning(
+                f"Espera agotada ({maximo or self.respaldo} s) para {descripcion}; se continúa.")
+            return None
+
+    def asentar(self, factor=1):
+        """Pausa corta para animaciones que no exponen una condición en el DOM."""
+        pausar(self.asentamiento * factor)
+
+    # ------------------------------------------------------------------
+    # Esperas sobre condiciones concretas del formulario de Siigo
+    # ------------------------------------------------------------------
+
+    def resultados_autocompletado(self, driver, maximo=None):
+        """Espera a que el autocompletado muestre al menos un resultado."""
+        return self.esperar_o_continuar(
+            driver, autocompletado_con_resultados(), maximo,
+            "resultados del autocompletado")
+
+    def cierre_autocompletado(self, driver, maximo=None):
+        """Espera a que la lista de resultados del autocompletado se cierre."""
+        return self.esperar_o_continuar(
+            driver, autocompletado_cerrado(), maximo,
+            "el cierre del autocompletado")
+
+    def opciones_desplegable(self, driver, elemento_select, texto, maximo=None):
+        """Espera a que el <select> tenga una opción que contenga el texto."""
+        return self.esperar_o_continuar(
+            driver, opcion_disponible(elemento_select, texto), maximo,
+            f"la opción '{texto}' del desplegable")
+
+    def texto_coincide(self, driver, localizador, patron, maximo=None):
+        """Espera a que el texto del elemento cumpla el patrón y retorna el texto."""
+        return self.esperar(
+            driver, texto_que_coincide(localizador, patron), maximo,
+            f"El texto de {localizador[1]} no coincidió con {patron}")
+
+    def valor_campo(self, driver, elemento, valor_esperado, maximo=None):
+        """Espera a que el atributo value del campo sea el esperado."""
+        return self.esperar_o_continuar(
+            driver, lambda d: elemento.get_attribute("value") == str(valor_esperado),
+            maximo, f"el valor '{valor_esperado}' en el campo")
+
+
+# ----------------------------------------------------------------------
+# Condiciones (mismo contrato que expected_conditions: reciben el driver)
+# ----------------------------------------------------------------------
+
+def elemento_en(raiz, localizador):
+    """Elemento presente dentro de una raíz (p. ej. un shadow root)."""
+    def _condicion(driver):
+        return raiz.find_element(*localizador)
+    return _condicion
+
+
+def elemento_visible_en(raiz, localizador):
+    """Elemento visible dentro de una raíz (p. ej. un shadow root)."""
+    def _condicion(driver):
+        elemento = raiz.find_element(*localizador)
+        return elemento if elemento.is_displayed() else False
+    return _condicion
+
+
+def autocompletado_con_resultados():
+    def _condicion(driver):
+        filas = driver.find_elements(By.XPATH, XPATH_RESULTADOS_AUTOCOMPLETADO)
+        visibles = [fila for fila in filas if fila.is_displayed()]
+        return visibles or False
+    return _condicion
+
+
+def autocompletado_cerrado():
+    def _condicion(driver):
+        filas = driver.find_elements(By.XPATH, XPATH_RESULTADOS_AUTOCOMPLETADO)
+        return not any(fila.is_displayed() for fila in filas)
+    return _condicion
+
+
+def opcion_disponible(elemento_select, texto):
+    def _condicion(driver):
+        for opcion in elemento_select.find_elements(By.TAG_NAME, "option"):
+            if texto in opcion.text:
+                return opcion
+        return False
+    return _condicion
+
+
+def texto_que_coincide(localizador, patron):
+    patron = re.compile(patron) if isinstance(patron, str) else patron
+
+    def _condicion(driver):
+        try:
+            texto = driver.find_element(*localizador).text
+        except WebDriverException:
+            return False
+        return texto if patron.search(texto) else False
+    return _condicion
+
+
+# Política compartida por todos los módulos; se reconfigura desde main.py
+politica = PoliticaEspera()
+
+
+def configurar_esperas(config_esperas=None):
+    """
+    Configura la política compartida a partir de config["esperas"], por ejemplo
+    {"perfil": "rapido", "respaldo": 4}.
+    """
+    global politica
+    config_esperas = dict(config_esperas or {})
+    perfil = config_esperas.pop("perfil", "normal")
+    politica = PoliticaEspera(perfil, **config_esperas)
+    logging.info(
+        f"Esperas configuradas con el perfil '{perfil}' "
+        f"(máximo {politica.maximo} s, respaldo {politica.respaldo} s).")
+    return politica
+
+
+def obtener_politica():
+    return politica
@@ -0,0 +1,10 @@
+import math
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por rango más cercano; None si no hay valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = max(math.ceil(p / 100 * len(ordenados)), 1)
+    return ordenados[posicion - 1]
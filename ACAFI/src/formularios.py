@@ -0,0 +1,125 @@
+import re
+import logging
+from decimal import Decimal, InvalidOperation
+from selenium.common.exceptions import TimeoutException
+from esperas import obtener_politica
+
+
+# Asigna el valor de varios campos y dispara sus eventos en una sola llamada a
+# execute_script. Cada campo se indica con un WebElement o con un XPath; si alguno
+# todavía no existe no se modifica nada y se retorna null, para poder reintentar.
+# Se usa el setter nativo de "value" para que los frameworks (Angular/DevExtreme)
+# detecten el cambio igual que con la escritura del usuario.
+SCRIPT_LLENAR_CAMPOS = """
+const campos = arguments[0];
+const eventos = arguments[1];
+const resolver = (localizador) => typeof localizador === 'string'
+    ? document.evaluate(localizador, document, null,
+                        XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+    : localizador;
+const elementos = campos.map(campo => resolver(campo[0]));
+if (elementos.some(elemento => !elemento)) {
+    return null;
+}
+const setter = Object.getOwnPropertyDescriptor(HTMLInputElement.prototype, 'value').set;
+return elementos.map((elemento, i) => {
+    elemento.focus();
+    setter.call(elemento, campos[i][1]);
+    for (const evento of eventos) {
+        elemento.dispatchEvent(new Event(evento, {bubbles: true}));
+    }
+    return elemento.value;
+});
+"""
+
+SCRIPT_LEER_VALORES = """
+return arguments[0].map(localizador => {
+    const elemento = typeof localizador === 'string'
+        ? document.evaluate(localizador, document, null,
+                            XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+        : localizador;
+    return elemento ? elemento.value : null;
+});
+"""
+
+EVENTOS_POR_DEFECTO = ("input", "change", "blur")
+
+
+def llenar_campos(driver, campos, eventos=EVENTOS_POR_DEFECTO):
+    """
+    Llena un grupo de campos en un solo viaje al navegador.
+
+    Parámetros:
+    - driver: Objeto de Selenium WebDriver.
+    - campos: Lista de (localizador, valor); localizador es un WebElement o un XPath.
+    - eventos: Eventos que se disparan en cada campo después de asignar el valor.
+
+    Retorno:
+    - list: Valores de los campos justo después de asignarlos, o None si algún
+      campo todavía no existe en la página.
+    """
+    argumentos = [[localizador, str(valor)] for localizador, valor in campos]
+    return driver.execute_script(SCRIPT_LLENAR_CAMPOS, argumentos, list(eventos))
+
+
+def leer_valores(driver, localizadores):
+    """Lee el atributo value de varios campos en un solo viaje al navegador."""
+    return driver.execute_script(SCRIPT_LEER_VALORES, list(localizadores))
+
+
+def _normalizar(valor):
+    """
+    Normaliza un valor para compararlo con lo que muestra el campo. Los números se
+    comparan como Decimal: el último separador ("." o ",") seguido de una o dos
+    cifras es el decimal y los demás se toman como separadores de miles.
+    """
+    texto = str(valor if valor is not None else "").strip()
+    if not re.fullmatch(r"-?[\d.,\s]*\d[\d.,\s]*", texto):
+        return texto
+    texto = re.sub(r"\s", "", texto)
+    decimal = re.search(r"[.,](\d{1,2})$", texto)
+    entero = texto[:decimal.start()] if decimal else texto
+    numero = re.sub(r"[.,]", "", entero) + ("." + decimal.group(1) if decimal else "")
+    try:
+        return Decimal(numero)
+    except InvalidOperation:
+        return texto
+
+
+def campos_diferentes(driver, campos):
+    """
+    Retorna la lista de (localizador, esperado, obtenido) de los campos cuyo valor
+    en la página no coincide con el esperado (una sola lectura).
+    """
+    valores = leer_valores(driver, [localizador for localizador, _ in campos])
+    return [
+        (localizador, esperado, obtenido)
+        for (localizador, esperado), obtenido in zip(campos, valores)
+        if _normalizar(obtenido) != _normalizar(esperado)
+    ]
+
+
+def llenar_y_verificar(driver, campos, eventos=EVENTOS_POR_DEFECTO, maximo=None):
+    """
+    Espera a que existan todos los campos, los llena en una sola llamada y
+    verifica los valores con una sola lectura (repetida hasta que coincidan o
+    se agote el tiempo de respaldo).
+
+    Raises:
+        TimeoutException: Si los campos no aparecen en la página.
+        ValueError: Si algún valor no coincide con el esperado.
+    """
+    espera = obtener_politica()
+    espera.esperar(
+        driver, lambda d: llenar_campos(d, campos, eventos) is not None, maximo,
+        "Los campos del formulario no están disponibles.")
+
+    try:
+        espera.esperar(driver, lambda d: not campos_diferentes(d, campos), espera.respaldo)
+    except TimeoutException:
+        diferencias = campos_diferentes(driver, campos)
+        for localizador, esperado, obtenido in diferencias:
+            logging.error(
+                f"Error: El valor ingresado no coincide. Esperado: {esperado}, Obtenido: {obtenido}")
+        if diferencias:
+            raise ValueError("El valor ingresado no coincide con el esperado.")
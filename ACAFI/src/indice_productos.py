@@ -0,0 +1,88 @@
+import os
+import json
+import logging
+import pandas as pd
+
+
+# Columnas de la base de terceros (config/<nit>.xlsx) y su destino en el Excel de entrada
+COLUMNAS_INDICE = {
+    "Nombre del producto": "Nombre del producto",
+    "Código del Producto": "codigo de producto",
+    "Centro de Costo": "centro de costos",
+}
+
+
+def _firma_archivo(ruta):
+    estado = os.stat(ruta)
+    return {"tamano": estado.st_size, "mtime_ns": estado.st_mtime_ns}
+
+
+def compilar_indice_productos(ruta_bd):
+    """
+    Compila la base de terceros de un cliente en un índice
+    {nit_emisor: [nombre del producto, código del producto, centro de costo]},
+    tomando la primera fila de cada NIT emisor (igual que la búsqueda fila a fila).
+    """
+    df_bd = pd.read_excel(ruta_bd)
+    df_bd["Nit emisor"] = df_bd["Nit emisor"].astype(str)
+    df_bd["Nombre del producto"] = df_bd["Nombre del producto"].astype(str)
+    df_bd["Código del Producto"] = df_bd["Código del Producto"].fillna(
+        0).astype(float).astype(int).astype(str)  # Manejar NaN
+    df_bd["Centro de Costo"] = df_bd["Centro de Costo"].astype(str)
+
+    primeras = df_bd.drop_duplicates("Nit emisor", keep="first")
+    return dict(zip(
+        primeras["Nit emisor"],
+        primeras[list(COLUMNAS_INDICE)].values.tolist()))
+
+
+def cargar_indice_productos(ruta_bd, carpeta_cache):
+    """
+    Retorna el índice de productos de la base de terceros, usando la copia
+    compilada en disco mientras el Excel de origen no cambie (tamaño y fecha).
+
+    Parámetros:
+        ruta_bd (str): Ruta de config/<nit>.xlsx.
+        carpeta_cache (str): Carpeta donde se guardan los índices compilados.
+    """
+    nombre_base = os.path.splitext(os.path.basename(str(ruta_bd)))[0]
+    ruta_cache = os.path.join(str(carpeta_cache), f"indice_productos_{nombre_base}.json")
+    firma = _firma_archivo(ruta_bd)
+
+    if os.path.exists(ruta_cache):
+        try:
+            with open(ruta_cache, "r", encoding="utf-8") as f:
+                guardado = json.load(f)
+            if guardado.get("origen") == firma:
+                return guardado["indice"]
+            logging.info(f"La base de terceros {ruta_bd} cambió; se recompila el índice.")
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"No se pudo leer el índice compilado {ruta_cache}: {e}")
+
+    indice = compilar_indice_productos(ruta_bd)
+    try:
+        os.makedirs(str(carpeta_cache), exist_ok=True)
+        ruta_temporal = f"{ruta_cache}.tmp"
+        with open(ruta_temporal, "w", encoding="utf-8") as f:
+            json.dump({"origen": firma, "indice": indice}, f, ensure_ascii=False)
+        os.replace(ruta_temporal, ruta_cache)
+    except OSError as e:
+        logging.warning(f"No se pudo guardar el índice compilado {ruta_cache}: {e}")
+    return indice
+
+
+def aplicar_indice_productos(df, indice):
+    """
+    Llena 'Nombre del producto', 'codigo de producto' y 'centro de costos' del
+    Excel de entrada con un solo join por 'NIT Emisor'. Las filas sin NIT en el
+    índice quedan con 'sin coincidencia' y las otras dos columnas vacías.
+    """
+    tabla = pd.DataFrame.from_dict(
+        indice, orient="index", columns=list(COLUMNAS_INDICE.values()))
+    unido = df[["NIT Emisor"]].astype(str).join(tabla, on="NIT Emisor")
+    coincide = unido["Nombre del producto"].notna()
+
+    df["Nombre del producto"] = unido["Nombre del producto"].where(coincide, "sin coincidencia")
+    df["codigo de producto"] = unido["codigo de producto"].where(coincide, "")
+    df["centro de costos"] = unido["centro de costos"].where(coincide, "")
+    return int(coincide.sum())
@@ -3,14 +3,13 @@ import re
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver import ActionChains
 from selenium.common.exceptions import WebDriverException, TimeoutException
 import win32com.client as win32
+import pythoncom
 import math
 from openpyxl import load_workbook
 import pandas as pd
@@ -19,62 +18,40 @@ import time
 import logging
 import json
 import os
-import subprocess
 import glob
+import queue
+import threading
 from pathlib import Path
 
 # Importar la función de registrar cuenta
 from registrar_cuenta import registrar_cuenta_en_web
 from cuenta_nota import accion_nota_debito
-
-# funcion configurar loggin
-def configurar_logging(log_file="logs/script.log"):
-    """
-    Configura el sistema de logging para registrar mensajes en un archivo y en la consola.
-
-    Parámetros:
-        log_file (str): Ruta del archivo donde se guardarán los logs. Por defecto es "logs/script.log".
-
-    Raises:
-        OSError: Si no se puede crear el archivo de logs o la carpeta no existe.
-    """
-    try:
-        # Crear la carpeta 'logs' si no existe
-        log_dir = os.path.dirname(log_file)
-        if log_dir and not os.path.exists(log_dir):
-            os.makedirs(log_dir, exist_ok=True)
-
-        # Configurar el logging
-        logging.basicConfig(
-            level=logging.INFO,  # Nivel de logging (INFO, DEBUG, ERROR, etc.)
-            # Formato de los mensajes
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),  # Guardar logs en un archivo
-                logging.StreamHandler()  # Mostrar logs en la consola
-            ]
-        )
-        logging.info("Logging configurado correctamente.")
-    except OSError as e:
-        logging.error(f"No se pudo configurar el logging: {e}")
-        raise
-
+from main_pdf import process_pdf, process_pdfs, extract_reference_invoice
+from cache_extraccion import CacheExtraccion
+from registro_terceros import RegistroTerceros
+from bitacora_filas import BitacoraFilas
+from esperas import configurar_esperas, obtener_politica, elemento_en, elemento_visible_en
+from formularios import llenar_campos, llenar_y_verificar
+from sesion_navegador import GestorSesiones, crear_opciones_chrome
+from planificador_lotes import PlanificadorLotes
+from metricas_pasos import MetricasPasos
+from registro_eventos import configurar_logging, contexto_log, fijar_contexto
+from reintentos_filas import (
+    ColaReintentos, NitNoEncontrado, FilaRechazada, FacturaGuardada)
+from registros_factura import convertir_a_str, normalizar_facturas, PlanFila
 
 # Cargar configuración y convertir rutas relativas en absolutas
-def cargar_configuracion(CONFIG_PATH, CREDENCIALES_PATH, DATOS_EXTRAIDOS_PATH, 
-                        EXCEL_ROUTES_PATH, CONFIG_CLIENTES,BASE_DIR):
+def cargar_configuracion(CONFIG_PATH, CREDENCIALES_PATH, CONFIG_CLIENTES, BASE_DIR):
     """
     Versión mejorada que corrige los problemas de rutas y manejo de errores.
 
     Parámetros:
         CONFIG_PATH (str): Ruta relativa/absoluta del archivo config.json
         CREDENCIALES_PATH (str): Ruta relativa/absoluta del archivo credenciales.json
-        DATOS_EXTRAIDOS_PATH (str): Ruta relativa/absoluta del archivo datos_extraidos.json
-        EXCEL_ROUTES_PATH (str): Ruta relativa/absoluta del archivo excel_routes.json
         CONFIG_CLIENTES (str): Ruta relativa/absoluta del archivo clientes.json
 
     Retorna:
-        tuple: (config, credenciales, datos_extraidos_pdf, excel_routes, config_clientes)
+        tuple: (config, credenciales, config_clientes)
     """
     try:
           
@@ -82,8 +59,6 @@ def cargar_configuracion(CONFIG_PATH, CREDENCIALES_PATH, DATOS_EXTRAIDOS_PATH,
         PATHS = {
             'config': BASE_DIR / CONFIG_PATH,
             'credenciales': BASE_DIR / CREDENCIALES_PATH,
-            'datos_extraidos': BASE_DIR / DATOS_EXTRAIDOS_PATH,
-            'excel_routes': BASE_DIR / EXCEL_ROUTES_PATH,
             'clientes': BASE_DIR / CONFIG_CLIENTES
         }
         
@@ -99,12 +74,6 @@ def cargar_configuracion(CONFIG_PATH, CREDENCIALES_PATH, DATOS_EXTRAIDOS_PATH,
         with open(PATHS['credenciales'], 'r', encoding='utf-8') as f:
             credenciales = json.load(f)
         
-        with open(PATHS['datos_extraidos'], 'r', encoding='utf-8') as f:
-            datos_extraidos_pdf = json.load(f)
-        
-        with open(PATHS['excel_routes'], 'r', encoding='utf-8') as f:
-            excel_routes = json.load(f)
-        
         with open(PATHS['clientes'], 'r', encoding='utf-8') as f:
             config_clientes = json.load(f)
         
@@ -117,7 +86,7 @@ def cargar_configuracion(CONFIG_PATH, CREDENCIALES_PATH, DATOS_EXTRAIDOS_PATH,
                     config['paths'][key] = str(BASE_DIR / normalized_path)
                     logging.info(f"Ruta convertida: {config['paths'][key]}")
         
-        return config, credenciales, datos_extraidos_pdf, excel_routes, config_clientes
+        return config, credenciales, config_clientes
 
     except json.JSONDecodeError as e:
         logging.error(f"Error en formato JSON: {str(e)}")
@@ -181,6 +150,7 @@ def navegar_a_url(driver, url):
         TimeoutException: Si la página tarda demasiado en cargar.
         Exception: Si ocurre un error inesperado.
     """
+    espera = obtener_politica()
     try:
         # Verificar si la URL es válida
         if not url.startswith(("http://", "https://")):
@@ -190,10 +160,8 @@ def navegar_a_url(driver, url):
         driver.get(url)  # Navegar a la URL
 
         # Esperar a que la página se cargue completamente
-        WebDriverWait(driver, 10).until(
-            lambda d: d.execute_script(
-                "return document.readyState") == "complete"
-        )
+        espera.esperar(driver, lambda d: d.execute_script(
+            "return document.readyState") == "complete")
         logging.info("Página cargada exitosamente.")
 
     except ValueError as e:
@@ -224,34 +192,27 @@ def login(driver, user, pas):
         TimeoutException: Si un elemento tarda demasiado en estar disponible.
         Exception: Si ocurre un error inesperado.
     """
+    espera = obtener_politica()
     try:
         logging.info("Localizando el campo de usuario...")
-        username_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, '#username'))
-        )
+        username_element = espera.esperar(driver, EC.presence_of_element_located(
+            (By.CSS_SELECTOR, '#username')))
         shadow_user = username_element.shadow_root
-        WebDriverWait(shadow_user, 10).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "#username-input"))
-        ).send_keys(user)
+        espera.esperar(driver, elemento_en(
+            shadow_user, (By.CSS_SELECTOR, "#username-input"))).send_keys(user)
         logging.info("Usuario ingresado correctamente.")
 
         logging.info("Localizando el campo de contraseña...")
-        password_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, '#current-password'))
-        )
+        password_element = espera.esperar(driver, EC.presence_of_element_located(
+            (By.CSS_SELECTOR, '#current-password')))
         shadow_pass = password_element.shadow_root
-        WebDriverWait(shadow_pass, 10).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "#password-input"))
-        ).send_keys(pas)
+        espera.esperar(driver, elemento_en(
+            shadow_pass, (By.CSS_SELECTOR, "#password-input"))).send_keys(pas)
         logging.info("Contraseña ingresada correctamente.")
 
         logging.info("Localizando y haciendo clic en el botón de login...")
-        WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="login-submit"]'))
-        ).click()
+        espera.esperar(driver, EC.element_to_be_clickable(
+            (By.XPATH, '//*[@id="login-submit"]'))).click()
         logging.info("Login realizado exitosamente.")
     except TimeoutException as e:
         logging.error(f"Tiempo de espera agotado durante el login: {e}")
@@ -301,106 +262,6 @@ def cargar_excel(ruta_excel):
         logging.error(f"Error inesperado al cargar el archivo Excel: {e}")
         raise
 
-# converit a str los valores que figuran com oenteros
-
-
-def convertir_a_str(valor):
-    """
-    Convierte un valor en una cadena de texto (str), eliminando ".0" si es un float sin decimales.
-
-    Parámetros:
-        valor (int, float, str, etc.): Valor a convertir.
-
-    Retorna:
-        str: Representación en cadena del valor, sin ".0" si es un float sin decimales.
-
-    Ejemplos:
-        >>> convertir_a_str(42.0)
-        "42"
-        >>> convertir_a_str(3.14)
-        "3.14"
-        >>> convertir_a_str("Hola")
-        "Hola"
-    """
-    try:
-        # Si el valor es un float sin decimales, convertirlo a int y luego a str
-        if isinstance(valor, float) and valor.is_integer():
-            return str(int(valor))
-        # En cualquier otro caso, convertir directamente a str
-        return str(valor)
-    except Exception as e:
-        logging.error(f"Error al convertir el valor a str: {e}")
-        raise
-
-# procesar las variables de excel
-
-
-def procesar_fila_excel(row):
-    """
-    Función para procesar una fila del archivo Excel y extraer los datos necesarios.
-
-    Parámetros:
-    - row: Una fila del DataFrame (serie de pandas).
-
-    Retorno:
-    - datos_fila: Un diccionario con los datos procesados de la fila.
-    """
-    try:
-        # 🛠️ Manejo de CUFE/CUDE
-        cufe = convertir_a_str(row["CUFE/CUDE"])
-
-        # 🛠️ Manejo de Prefijo y Consecutivo
-        consecutivo = row["Folio"]
-        prefijo = row["Prefijo"]
-        if pd.isna(prefijo) or str(prefijo).lower() == "nan":
-            prefijo="FE"
-        if pd.isna(consecutivo) or str(consecutivo).lower() == "nan":
-            consecutivo = ""
-        elif pd.isna(prefijo) or prefijo == "":
-            valor = convertir_a_str(consecutivo)
-            match = re.match(r"([A-Za-z]*)(\d*)", valor)
-            prefijo = match.group(1)
-            consecutivo = match.group(2)
-
-        # Crear número de factura
-        factura = convertir_a_str(prefijo) + convertir_a_str(consecutivo)
-
-        # Extraer otros datos de la fila
-        centro_costo_excel = (row["centro de costos"])
-        fecha = convertir_a_str(row["Fecha Emisión"])
-        iva = convertir_a_str(row["IVA"])
-        codigo_producto = convertir_a_str(row["codigo de producto"])
-        tipo_documento = convertir_a_str(row["Tipo de documento"])
-        grupo = convertir_a_str(row["Grupo"])
-        valor_total = convertir_a_str(row["Total"])
-        # Datos del vendedor
-        nit_emisor = convertir_a_str(row["NIT Emisor"])
-        razon_social_vendedor = convertir_a_str(row["Nombre Emisor"])
-
-        # Datos del receptor
-        nombre_receptor = convertir_a_str(row["Nombre Receptor"])
-        nit_receptor = convertir_a_str(row["NIT Receptor"])
-        
-        if grupo == "Emitido":
-            nit_tercero = nit_receptor
-        elif grupo == "Recibido":
-            nit_tercero = nit_emisor
-        if prefijo == "nan":
-            # Separar letras y números en "prefijo"
-            prefijo = re.sub(
-                '[^A-Za-z]', '', prefijo) if pd.notna(prefijo) else pd.NA
-            consecutivo = re.sub(
-                '[^0-9]', '', prefijo) if pd.notna(prefijo) else pd.NA
-
-            prefijo = pd.NA
-
-        # Retornar los datos procesados
-        return  cufe, factura, fecha, iva, codigo_producto, nit_tercero, razon_social_vendedor, nombre_receptor, prefijo, consecutivo, tipo_documento, centro_costo_excel, valor_total
-
-    except Exception as e:
-        logging.error(f"Error al procesar la fila: {e}")
-        return None
-
 # Función para obtener la información de un NIT
 
 
@@ -444,10 +305,10 @@ def obtener_informacion_por_nit(nit, config_clientes, centro_costo_excel):
     except KeyError as e:
         logging.error(
             f"Error en la estructura de la configuración de clientes: {e}")
-        return None, None, None
+        return None, None, None, None
     except Exception as e:
         logging.error(f"Error inesperado al obtener información por NIT: {e}")
-        return None, None, None
+        return None, None, None, None
 # condicin para notas o facturas
 
 
@@ -487,71 +348,292 @@ def contiene_nota(texto):
         logging.error(f"Ocurrió un error al procesar el texto: {e}")
         return False, None, f"Error al procesar el texto: {e}"
 
-# ejecutar scrip de pdfs
+# extraer los datos del pdf en el mismo proceso
 
 
-def ejecutar_script_pdf(script_pdf_path, pdf_routes_json_path, pdf_routes):
+def extraer_datos_pdf(documento_pdf):
     """
-    Ejecuta un script de manejo de PDFs y guarda la ruta del PDF en un archivo JSON.
+    Extrae los datos de un PDF de factura llamando directamente a main_pdf.process_pdf.
 
     Parámetros:
-        script_pdf_path (str): Ruta del script de manejo de PDFs.
-        pdf_routes_json_path (str): Ruta del archivo JSON donde se guardará la ruta del PDF.
-        pdf_routes (str): Ruta del archivo PDF a procesar.
+        documento_pdf (DocumentoPDF): Documento compartido con el resto de extractores
+            de la fila (el texto ya leído no se vuelve a extraer).
 
     Retorno:
-        str: Salida estándar del script de PDF.
+        list: Lista con un único diccionario de datos extraídos (mismo formato
+              que datos_extraidos.json).
 
     Raises:
-        FileNotFoundError: Si el script de PDF o el archivo JSON no existen.
-        json.JSONDecodeError: Si el archivo JSON está mal formado.
-        subprocess.CalledProcessError: Si el script de PDF falla.
-        Exception: Si ocurre un error inesperado.
+        FileNotFoundError: Si el archivo PDF no existe.
+        Exception: Si ocurre un error inesperado al procesar el PDF.
     """
     try:
-        # Verificar si el script de PDF existe
-        if not os.path.isfile(script_pdf_path):
-            raise FileNotFoundError(
-                f"El script de PDF no existe: {script_pdf_path}")
+        if not os.path.isfile(documento_pdf.ruta):
+            raise FileNotFoundError(f"El archivo PDF no existe: {documento_pdf.ruta}")
 
-        logging.info("Guardando la ruta del PDF en el archivo JSON...")
-        # 📄 Cargar o crear el JSON
-        if os.path.exists(pdf_routes_json_path):
-            with open(pdf_routes_json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)  # Cargar contenido existente
-        else:
-            data = {}  # Crear estructura vacía si no existe
-
-        # 📝 Sobrescribir con la nueva ruta
-        data["path_pdf"] = pdf_routes
-
-        # Guardar cambios en el JSON
-        with open(pdf_routes_json_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-        logging.info(f"Ruta del PDF guardada en {pdf_routes_json_path}.")
-
-        # Ejecutar el script de PDF
-        logging.info("Ejecutando script de manejo de PDFs...")
-        result = subprocess.run(
-            ["python", script_pdf_path], check=True, text=True, capture_output=True
-        )
-        logging.info("Script de PDF ejecutado exitosamente.")
-        return result.stdout
+        logging.info("Extrayendo datos del PDF...")
+        datos_extraidos = [process_pdf(documento_pdf)]
+        logging.info("Datos del PDF extraídos exitosamente.")
+        return datos_extraidos
 
     except FileNotFoundError as e:
         logging.error(f"Error: {e}")
         raise
-    except json.JSONDecodeError as e:
-        logging.error(f"Error al decodificar el archivo JSON: {e}")
-        raise
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error al ejecutar el script de PDF: {e}")
-        raise
     except Exception as e:
-        logging.error(f"Error inesperado al ejecutar el script de PDF: {e}")
+        logging.error(f"Error inesperado al extraer los datos del PDF: {e}")
         raise
 
 
+def preextraer_datos_pdf(df, carpeta_pdf, nit_cliente, datos_preextraidos=None, max_workers=None,
+                         cache=None):
+    """
+    Extrae en paralelo los datos de los PDFs de todas las filas pendientes del Excel,
+    antes de iniciar sesión, para que la fase web solo haga trabajo web.
+
+    Parámetros:
+        df (DataFrame): Datos del archivo Excel (con la columna 'PDF Generado').
+        carpeta_pdf (str): Carpeta raíz de los PDFs (config["paths"]["pdf"]).
+        nit_cliente (str): NIT del cliente; los PDFs están en <carpeta_pdf>/<nit>/<cufe>.pdf.
+        datos_preextraidos (dict): Resultados de una ejecución anterior; los CUFE
+            que ya estén aquí no se vuelven a procesar.
+        max_workers (int): Número de procesos (por defecto, los núcleos de la máquina).
+        cache (CacheExtraccion): Caché persistente; los PDFs sin cambios no se vuelven
+            a procesar y los nuevos resultados se guardan en ella.
+
+    Retorno:
+        dict: {cufe: (datos_extraidos, error)}.
+    """
+    datos_preextraidos = {} if datos_preextraidos is None else datos_preextraidos
+    previos = len(datos_preextraidos)
+    try:
+        pendientes = df[df['PDF Generado'] != 'Sí']
+        rutas = {}
+        for valor in pendientes['CUFE/CUDE']:
+            if pd.isna(valor):
+                continue
+            cufe = convertir_a_str(valor)
+            if cufe in datos_preextraidos:
+                continue
+            ruta = os.path.join(carpeta_pdf, nit_cliente, f"{cufe}.pdf")
+            # Los PDFs faltantes se reportan en la fila correspondiente
+            if not os.path.isfile(ruta):
+                continue
+            datos_cache = cache.obtener(cufe, ruta) if cache else None
+            if datos_cache is not None:
+                datos_preextraidos[cufe] = (datos_cache, None)
+            else:
+                rutas[ruta] = cufe
+
+        if not rutas:
+            if len(datos_preextraidos) > previos:
+                logging.info("Todos los PDFs pendientes estaban en la caché de extracción.")
+            else:
+                logging.info("No hay PDFs pendientes por extraer.")
+            return datos_preextraidos
+
+        logging.info(f"Pre-extrayendo datos de {len(rutas)} PDFs...")
+        inicio = time.perf_counter()
+        resultados = process_pdfs(rutas, max_workers=max_workers)
+        errores = 0
+        for ruta, (datos, error) in resultados.items():
+            datos_preextraidos[rutas[ruta]] = (datos, error)
+            if error:
+                errores += 1
+                logging.error(f"Error al extraer los datos del PDF {ruta}: {error}")
+            elif cache:
+                cache.guardar(rutas[ruta], ruta, datos)
+        logging.info(
+            f"Pre-extracción finalizada: {len(resultados)} PDFs en "
+            f"{time.perf_counter() - inicio:.1f} s, {errores} con error.")
+        return datos_preextraidos
+
+    except Exception as e:
+        # La extracción fila a fila sigue disponible como respaldo
+        logging.error(f"Error inesperado en la pre-extracción de PDFs: {e}")
+        return datos_preextraidos
+
+
+def calcular_linea_iva(valor, iva, valor_total):
+    """
+    Decide cómo se registra el IVA de una factura.
+
+    Retorno:
+    - None: la fila no tiene IVA (vacío, NaN, guiones o 0).
+    - "impuesto": el total es el valor más el 19 %; se selecciona el impuesto del cliente.
+    - "item": el total no cuadra con el 19 %; el IVA se agrega como otro ítem.
+
+    Raises:
+    - ValueError: Si el valor o el total no son numéricos.
+    """
+    # Verificar si la variable es NaN o un string vacío/contiene solo espacios/guiones
+    if math.isnan(iva) if isinstance(iva, (int, float)) else not iva.strip().replace('-', '').strip():
+        return None
+    # convertir_a_str deja las celdas vacías del Excel como "nan"
+    if iva in ('0', 0, 'nan'):
+        return None
+    diferencia_iva = round(float(valor) * 0.19, 2)
+    resultado_iva = float(valor) + float(diferencia_iva)
+    return "impuesto" if resultado_iva == float(valor_total) else "item"
+
+
+def planificar_fila(registro, carpeta_pdf, nit_cliente, config_clientes, datos_preextraidos):
+    """
+    Resuelve sin navegador todo lo que necesita una fila: información del cliente,
+    fecha, camino (nota o factura), datos del PDF y la línea de IVA.
+
+    Retorno:
+    - PlanFila: Plan de la fila.
+
+    Raises:
+    - FilaRechazada: Si la fila no puede procesarse, con el motivo.
+    """
+    if registro is None:
+        raise FilaRechazada("El Grupo no es 'Emitido' ni 'Recibido'; no hay NIT tercero.")
+    if registro.cufe in ("", "nan"):
+        raise FilaRechazada("La fila no tiene CUFE/CUDE.")
+
+    es_nota, xpath_accion, _ = contiene_nota(registro.tipo_documento)
+    nombre, centro_costo, iva_cliente, codigo_iva = obtener_informacion_por_nit(
+        nit_cliente, config_clientes, registro.centro_costo_excel)
+    # Las facturas necesitan el IVA y el centro de costo del cliente
+    if nombre is None and not es_nota:
+        raise FilaRechazada(f"El NIT {nit_cliente} no tiene configuración de cliente.")
+
+    fecha_formateada = formatear_fecha(registro.fecha)
+    if not fecha_formateada:
+        raise FilaRechazada(f"Fecha de emisión no válida: {registro.fecha}")
+
+    ruta_pdf = os.path.join(carpeta_pdf, nit_cliente, f"{registro.cufe}.pdf")
+    if not os.path.isfile(ruta_pdf):
+        raise FilaRechazada(f"El archivo PDF no existe en la ruta: {ruta_pdf}")
+
+    datos_pdf, error_pdf = datos_preextraidos.get(registro.cufe, (None, None))
+    if datos_pdf is None:
+        # Respaldo en el mismo proceso si la pre-extracción falló o no incluyó el PDF
+        try:
+            datos_pdf = process_pdf(ruta_pdf)
+            datos_preextraidos[registro.cufe] = (datos_pdf, None)
+        except Exception as e:
+            raise FilaRechazada(f"Error al extraer los datos del PDF: {error_pdf or e}")
+
+    plan = PlanFila(
+        registro=registro, ruta_pdf=ruta_pdf, nombre=nombre, centro_costo=centro_costo,
+        iva_cliente=iva_cliente, codigo_iva=codigo_iva, fecha_formateada=fecha_formateada,
+        es_nota=es_nota, xpath_accion=xpath_accion, datos_pdf=datos_pdf,
+        forma_de_pago=datos_pdf.get("Forma de Pago", "Desconocido"),
+        valor=datos_pdf.get("Total Bruto Factura", "Desconocido"))
+
+    if es_nota:
+        plan.referencia_nota = extract_reference_invoice(ruta_pdf)
+        if not plan.referencia_nota:
+            raise FilaRechazada("No se encontró la factura de referencia de la nota en el PDF.")
+        return plan
+
+    if registro.codigo_producto in ("", "nan"):
+        raise FilaRechazada(
+            f"No se encuentra un código de producto para el NIT {registro.nit_tercero}.")
+    try:
+        plan.linea_iva = calcular_linea_iva(plan.valor, registro.iva, registro.valor_total)
+        float(plan.valor)
+    except (TypeError, ValueError):
+        raise FilaRechazada(
+            f"Valores no numéricos: total bruto del PDF {plan.valor}, total del Excel "
+            f"{registro.valor_total}.")
+    if plan.linea_iva == "item" and codigo_iva in (None, "", "nan"):
+        raise FilaRechazada(f"El cliente {nit_cliente} no tiene código de IVA para agregarlo como ítem.")
+    return plan
+
+
+# Estado de las filas cuyo comprobante Siigo guardó sin que se pudiera confirmar su
+# número o mover el PDF; no se vuelven a procesar para no duplicar la factura
+ESTADO_POR_REVISAR = "Guardada en Siigo, revisar"
+
+
+def planificar_filas(df, registros, carpeta_pdf, nit_cliente, config_clientes, datos_preextraidos):
+    """
+    Construye el plan de ejecución de todas las filas pendientes del Excel, sin
+    navegador, para que solo lleguen a Siigo las filas que pueden terminar bien.
+    Las filas en ESTADO_POR_REVISAR no se planifican.
+
+    Retorno:
+    - tuple: ({indice: PlanFila}, {indice: motivo de rechazo}).
+    """
+    planes = {}
+    rechazos = {}
+    pendientes = (df['PDF Generado'] != 'Sí') & (df['Procesamiento Exitoso'] != ESTADO_POR_REVISAR)
+    for indice in df.index[pendientes]:
+        try:
+            planes[indice] = planificar_fila(
+                registros.get(indice), carpeta_pdf, nit_cliente, config_clientes,
+                datos_preextraidos)
+        except FilaRechazada as e:
+            rechazos[indice] = str(e)
+            logging.warning(f"Fila {indice + 1} rechazada antes del navegador: {e}")
+    logging.info(
+        f"Plan de ejecución: {len(planes)} filas por procesar, {len(rechazos)} rechazadas.")
+    return planes, rechazos
+
+
+# Busca en una sola consulta dentro del shadow DOM la fila de la tabla de empresas
+# que contiene el NIT y retorna su botón "Ingresar" junto con la posición de la fila.
+# Si se indica una posición conocida (de un ingreso anterior en la sesión) se
+# verifica esa fila primero. Retorna null si la tabla aún no existe.
+SCRIPT_BUSCAR_FILA_CLIENTE = """
+const [contenedor, nit, posicionConocida] = arguments;
+const raiz = contenedor.shadowRoot;
+const tabla = raiz && raiz.querySelector('#wc-data-table-general');
+if (!tabla) {
+    return null;
+}
+const filas = Array.from(tabla.querySelectorAll('tr'));
+const botonDe = (fila) => {
+    const dropdown = fila.querySelector('siigo-button-dropdown-atom');
+    return dropdown && dropdown.shadowRoot
+        ? dropdown.shadowRoot.querySelector('.button-dropdown__btn') : null;
+};
+const candidatas = posicionConocida !== null && posicionConocida < filas.length
+    ? [posicionConocida].concat(filas.map((_, i) => i)) : filas.map((_, i) => i);
+for (const i of candidatas) {
+    if (filas[i].textContent.includes(nit)) {
+        const boton = botonDe(filas[i]);
+        if (boton) {
+            return [boton, i];
+        }
+    }
+}
+return [null, filas.length];
+"""
+
+# Posición de la fila de cada empresa ya resuelta, por sesión del navegador y NIT
+_filas_clientes_resueltas = {}
+
+
+def buscar_boton_cliente(driver, clientes_element, nit_cliente):
+    """
+    Localiza el botón "Ingresar" de la empresa con el NIT indicado en un solo
+    viaje al navegador (por intento de espera).
+
+    Retorno:
+        WebElement: Botón "Ingresar" de la fila, o None si no se encontró.
+    """
+    espera = obtener_politica()
+    clave = (getattr(driver, "session_id", None), nit_cliente)
+    posicion_conocida = _filas_clientes_resueltas.get(clave)
+
+    def _condicion(d):
+        resultado = d.execute_script(
+            SCRIPT_BUSCAR_FILA_CLIENTE, clientes_element, nit_cliente, posicion_conocida)
+        # null: la tabla aún no existe; [null, n]: las filas aún no incluyen el NIT
+        return resultado if resultado and resultado[0] else False
+
+    try:
+        boton, posicion = espera.esperar(driver, _condicion)
+    except TimeoutException:
+        return None
+    _filas_clientes_resueltas[clave] = posicion
+    return boton
+
+
 def ingresar_cliente(driver, nit_cliente , ingreso_realizado):  # ingresar clientes
     """
     Función para ingresar un cliente en una tabla de una interfaz web.
@@ -563,7 +645,10 @@ def ingresar_cliente(driver, nit_cliente , ingreso_realizado):  # ingresar clien
 
     Retorno:
     - True: Si el ingreso se realizó correctamente.
-    - False: Si el ingreso ya se había realizado o si no se encontró el cliente.
+    - False: Si el ingreso ya se había realizado.
+
+    Raises:
+    - NitNoEncontrado: Si el NIT no aparece en la tabla de clientes.
     """
 
     # Verificar si el ingreso ya se realizó previamente
@@ -573,67 +658,31 @@ def ingresar_cliente(driver, nit_cliente , ingreso_realizado):  # ingresar clien
             logging.info("Localizando el campo de mis clientes...")
 
             # Esperar a que el elemento que contiene la tabla de clientes esté presente en la página
-            clientes_element = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//*[@style="z-index: 1;"]'))
-            )
-
-            # Acceder al Shadow DOM del elemento que contiene la tabla
-            shadow_clientes = clientes_element.shadow_root
-
-            # Buscar la tabla dentro del Shadow DOM
-            tabla = shadow_clientes.find_element(
-                By.CSS_SELECTOR, '#wc-data-table-general')
-            # Esperar 2 segundos para asegurar que la tabla esté cargada
-            time.sleep(2)
-
-            # Encontrar todas las filas de la tabla
-            filas = tabla.find_elements(By.CSS_SELECTOR, 'tr')
-            encontrado = False  # Bandera para indicar si se encontró el cliente
-            # Convertir el NIT a cadena para comparar
+            clientes_element = obtener_politica().esperar(driver, EC.presence_of_element_located(
+                (By.XPATH, '//*[@style="z-index: 1;"]')))
+
+            # Buscar la fila del NIT y su botón "Ingresar" dentro del Shadow DOM
             nit_adquiriente = str(nit_cliente )
+            boton = buscar_boton_cliente(driver, clientes_element, nit_adquiriente)
 
-            # Recorrer cada fila de la tabla
-            for fila in filas:
-
-                # Esperar 1 segundo para evitar problemas de rendimiento
-                time.sleep(1)
-                # Verificar si el NIT del cliente está en la fila actual
-                if nit_adquiriente in fila.text:
-                    try:
-                        # Buscar el botón "Ingresar" dentro de la fila
-                        boton_ingresar = fila.find_element(
-                            By.CSS_SELECTOR, 'siigo-button-dropdown-atom')
-
-                        # Acceder al Shadow DOM del botón
-                        shadow_boton = boton_ingresar.shadow_root
-
-                        # Buscar el botón dentro del Shadow DOM y hacer clic en él
-                        boton = shadow_boton.find_element(
-                            By.CSS_SELECTOR, '.button-dropdown__btn')
-                        boton.click()
-                        logging.info(
-                            "Botón 'Ingresar' clickeado exitosamente.")
-
-                        # Marcar como encontrado y salir del bucle
-                        encontrado = True
-                        break
-                    except Exception as e:
-                        # Registrar un error si no se puede hacer clic en el botón
-                        logging.error(
-                            f"Error al hacer clic en el botón 'Ingresar': {e}")
-                else:
-                    # Registrar que el NIT no se encontró en la fila actual
+            if boton is not None:
+                try:
+                    boton.click()
                     logging.info(
-                        f"No se encontró: {nit_adquiriente} en la tabla")
-
-            # Si no se encontró el cliente, registrar el hecho
-            if not encontrado:
-                logging.info("Valor no encontrado en la tabla.")
+                        "Botón 'Ingresar' clickeado exitosamente.")
+                except Exception as e:
+                    # Registrar un error si no se puede hacer clic en el botón
+                    logging.error(
+                        f"Error al hacer clic en el botón 'Ingresar': {e}")
+            else:
+                # Si no se encontró el cliente no tiene sentido seguir con la fila
+                logging.info(
+                    f"No se encontró: {nit_adquiriente} en la tabla")
+                raise NitNoEncontrado(
+                    f"El NIT {nit_adquiriente} no se encontró en la tabla de clientes.")
 
             # Registrar que el cliente se ingresó correctamente
             logging.info("Cliente ingresado correctamente.")
-            time.sleep(1)  # Esperar 1 segundo antes de continuar
 
             # Cambiar la bandera para evitar que se repita el proceso
             ingreso_realizado = True
@@ -645,7 +694,7 @@ def ingresar_cliente(driver, nit_cliente , ingreso_realizado):  # ingresar clien
             logging.error(f"Error durante el ingreso de cliente: {e}")
             raise  # Relanzar la excepción para manejo externo
 
-    # Retornar False si el ingreso ya se había realizado o si no se encontró el cliente
+    # Retornar False si el ingreso ya se había realizado
     return False
 
 
@@ -668,6 +717,10 @@ def formatear_fecha(fecha, formatos=["%d-%m-%Y", "%d/%m/%Y"]):
     return None
 
 
+# Campo "valor unitario" de la línea en edición
+XPATH_VALOR_UNITARIO = '(//*[@class="dx-texteditor-container"]/div/input[@id="inputDecimal_siigoInputDecimal"])[3]'
+
+
 # ingresar datos para crear la factura de compra
 def crear_factura_compra(driver, fecha_formateada, nit_tercero, xpath_accion):
     """
@@ -681,83 +734,62 @@ def crear_factura_compra(driver, fecha_formateada, nit_tercero, xpath_accion):
     Retorno:
     - None
     """
+    espera = obtener_politica()
     try:
         # ------------------------ Interacción dentro de la página ------------------------
 
         # Click en crear
         logging.info("Intentando hacer clic en el botón 'Crear'...")
-        time.sleep(2)
-        banner_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "siigo-header-molecule.data-siigo-five9"))
-        )
+        banner_element = espera.esperar(driver, EC.presence_of_element_located(
+            (By.CSS_SELECTOR, "siigo-header-molecule.data-siigo-five9")))
         shadow_banner = banner_element.shadow_root
-        crear_element = shadow_banner.find_element(
-            By.CSS_SELECTOR, "siigo-button-atom[data-id='header-create-button']")
+        crear_element = espera.esperar(driver, elemento_en(
+            shadow_banner, (By.CSS_SELECTOR, "siigo-button-atom[data-id='header-create-button']")))
         shadow_crear = crear_element.shadow_root
-        shadow_crear.find_element(
-            By.CSS_SELECTOR, "button[type='button'].btn-element").click()
+        espera.esperar(driver, elemento_en(
+            shadow_crear, (By.CSS_SELECTOR, "button[type='button'].btn-element"))).click()
         logging.info("Se ha dado clic en el botón 'Crear' correctamente.")
-        time.sleep(1)
 
-        # Click en factura de compra / Gasto
+        # Click en factura de compra / Gasto (cuando el menú ya está desplegado)
         logging.info("Intentando hacer clic en 'Factura de compra / Gasto'...")
-        shadow_banner.find_element(
-            By.CSS_SELECTOR, xpath_accion).click()
+        espera.esperar(driver, elemento_visible_en(
+            shadow_banner, (By.CSS_SELECTOR, xpath_accion))).click()
         logging.info(
             "Clic en 'Factura de compra / Gasto' realizado correctamente.")
-        time.sleep(1)
 
         # Ingresar el TIPO DE VALOR
         logging.info("Seleccionando el tipo de factura...")
-        select_tipo = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//*[@value='ERPDocumentTypeID']/select"))
-        )
+        select_tipo = espera.esperar(driver, EC.presence_of_element_located(
+            (By.XPATH, "//*[@value='ERPDocumentTypeID']/select")))
         dropdown = Select(select_tipo)
-        time.sleep(5)
+        espera.opciones_desplegable(driver, select_tipo, "FC - 1 - Compra")
         dropdown.select_by_visible_text("FC - 1 - Compra")
         logging.info("Se ha seleccionado la opción 'FC - 1 - Compra' en tipo.")
-        time.sleep(1)
 
         # Ingresar la fecha de elaboración
         logging.info("Ingresando la fecha de elaboración...")
-        campo_fecha = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '(//*[@class="dx-texteditor-input-container"]/input)[1]'))
-        )
+        xpath_fecha = '(//*[@class="dx-texteditor-input-container"]/input)[1]'
+        campo_fecha = espera.esperar(
+            driver, EC.element_to_be_clickable((By.XPATH, xpath_fecha)))
         campo_fecha.click()
-        time.sleep(0.5)
         campo_fecha.clear()
-        time.sleep(1)
-        campo_fecha = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '(//*[@class="dx-texteditor-input-container"]/input)[1]'))
-        )
-        time.sleep(1)
+        # El editor de fecha se vuelve a renderizar al limpiarlo
+        campo_fecha = espera.esperar(
+            driver, EC.element_to_be_clickable((By.XPATH, xpath_fecha)))
         campo_fecha.click()
-        time.sleep(2)
-        driver.execute_script(
-            "arguments[0].value = arguments[1];", campo_fecha, fecha_formateada)
-        time.sleep(0.5)
-        driver.execute_script(
-            "arguments[0].dispatchEvent(new Event('input'));", campo_fecha)
-        time.sleep(0.5)
-        driver.execute_script(
-            "arguments[0].dispatchEvent(new Event('change'));", campo_fecha)
-        time.sleep(0.5)
+        espera.asentar()
+        llenar_campos(driver, [(campo_fecha, fecha_formateada)], eventos=("input", "change"))
         logging.info("Fecha de elaboración ingresada correctamente.")
 
         # Ingresar el proveedor
         logging.info("Ingresando el NIT del proveedor...")
         action = ActionChains(driver)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[1]'))
+        espera.esperar(driver, EC.presence_of_element_located(
+            (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[1]'))
         ).send_keys(nit_tercero)
-        time.sleep(5)
+        espera.resultados_autocompletado(driver)
         action.send_keys(Keys.ENTER).perform()
-        time.sleep(2)
+        espera.cierre_autocompletado(driver)
         logging.info("Proveedor ingresado correctamente.")
 
     except Exception as e:
@@ -766,7 +798,7 @@ def crear_factura_compra(driver, fecha_formateada, nit_tercero, xpath_accion):
         raise
 
 
-def ingresar_datos_factura(driver, prefijo, consecutivo, codigo_producto, nit_tercero, valor, iva,iva_cliente, centro_costo,valor_total,codigo_iva):  # datos facturas
+def ingresar_datos_factura(driver, prefijo, consecutivo, codigo_producto, nit_tercero, valor, iva,iva_cliente, centro_costo,linea_iva,codigo_iva):  # datos facturas
     """
     Función para ingresar los datos de una factura en la página web.
     Parámetros:
@@ -777,55 +809,36 @@ def ingresar_datos_factura(driver, prefijo, consecutivo, codigo_producto, nit_te
     - codigo_producto: Código del producto.
     - nit_tercero: NIT del emisor.
     - valor: Valor unitario del producto.
+    - linea_iva: Cómo se registra el IVA ("item", "impuesto" o None), resuelto en el plan de la fila.
 
     Retorno:
     - None
     """
+    espera = obtener_politica()
     try:
-        # Ingresar prefijo de número de factura proveedor
-        try:
-            campo_prefijo = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//*[@id="txtExternalPrefix"]'))
-            )
-            campo_prefijo.click()
-            time.sleep(0.5)
-            campo_prefijo.clear()
-            campo_prefijo.send_keys(prefijo)
-            time.sleep(1)
-            logging.info(
-                "Prefijo de número de factura ingresado correctamente.")
-        except Exception as e:
-            logging.error(
-                f"Error al ingresar el prefijo de número de factura: {e}")
-            raise
-
-        # Ingresar consecutivo de número de factura proveedor
+        # Ingresar prefijo y consecutivo de número de factura proveedor
+        # (una sola llamada al navegador para llenar ambos y una para verificarlos)
         try:
-            campo_consecutivo = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//*[@id="txtExternalConsecutive"]'))
-            )
-            campo_consecutivo.send_keys(consecutivo)
-            time.sleep(1)
+            llenar_y_verificar(driver, [
+                ('//*[@id="txtExternalPrefix"]', convertir_a_str(prefijo)),
+                ('//*[@id="txtExternalConsecutive"]', convertir_a_str(consecutivo)),
+            ])
             logging.info(
-                "Consecutivo de número de factura ingresado correctamente.")
+                "Prefijo y consecutivo de número de factura ingresados correctamente.")
         except Exception as e:
             logging.error(
-                f"Error al ingresar el consecutivo de número de factura: {e}")
+                f"Error al ingresar el prefijo y consecutivo de número de factura: {e}")
             raise
 
         # Ingresar centro de costos
         try:
-            campo_centro_costos = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[2]'))
-            )
+            campo_centro_costos = espera.esperar(driver, EC.presence_of_element_located(
+                (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[2]')))
             texto_a_ingresar = str(centro_costo)
             campo_centro_costos.send_keys(texto_a_ingresar)
-            time.sleep(5)
+            espera.resultados_autocompletado(driver)
             ActionChains(driver).send_keys(Keys.ENTER).perform()
-            time.sleep(1)
+            espera.valor_campo(driver, campo_centro_costos, texto_a_ingresar)
 
             # Verificar que el texto se haya ingresado correctamente
             texto_ingresado = campo_centro_costos.get_attribute("value")
@@ -843,55 +856,35 @@ def ingresar_datos_factura(driver, prefijo, consecutivo, codigo_producto, nit_te
 
         # Ingresar tipo de producto
         try:
-            select_activo_fijo = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//*[@id="trEditRow"]/div[2]/siigo-dropdownenum/select'))
-            )
+            select_activo_fijo = espera.esperar(driver, EC.presence_of_element_located(
+                (By.XPATH, '//*[@id="trEditRow"]/div[2]/siigo-dropdownenum/select')))
             dropdown = Select(select_activo_fijo)
-            time.sleep(2)
+            espera.opciones_desplegable(
+                driver, select_activo_fijo, "Gasto / Cuenta contable")
             dropdown.select_by_visible_text("Gasto / Cuenta contable")
             logging.info("Activo fijo seleccionado correctamente.")
-            time.sleep(1)
         except Exception as e:
             logging.error(f"Error al seleccionar el activo fijo: {e}")
             raise
 
         # Ingresar el producto a buscar
         try:
-            if codigo_producto == "nan":
-                logging.error(
-                    f"No se encuentra un código de producto para el NIT {nit_tercero}")
-                raise ValueError("Código de producto no válido.")
-
-            select_producto = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[4]'))
-            )
-            time.sleep(2)
+            select_producto = espera.esperar(driver, EC.presence_of_element_located(
+                (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[4]')))
             select_producto.send_keys(str(codigo_producto))
-            logging.info("Producto seleccionado correctamente.")
-            time.sleep(1)
+            espera.resultados_autocompletado(driver)
             ActionChains(driver).send_keys(Keys.ENTER).perform()
-            time.sleep(1)
+            espera.cierre_autocompletado(driver)
+            logging.info("Producto seleccionado correctamente.")
         except Exception as e:
             logging.error(f"Error al seleccionar el producto: {e}")
             raise
 
         # Ingresar el valor unitario
         try:
-            valor_unitario = WebDriverWait(driver, 10).until(
-                EC.element_to_be_clickable(
-                    (By.XPATH, '(//*[@class="dx-texteditor-container"]/div/input[@id="inputDecimal_siigoInputDecimal"])[3]'))
-            )
-            valor_unitario.click()
-            time.sleep(1)
-            valor_unitario.clear()
-            time.sleep(1)
-            # Simular escritura humana
-            for char in str(valor):
-                valor_unitario.send_keys(char)
-                time.sleep(0.1)
-            time.sleep(1)
+            valor_unitario = espera.esperar(driver, EC.element_to_be_clickable(
+                (By.XPATH, XPATH_VALOR_UNITARIO)))
+            llenar_y_verificar(driver, [(valor_unitario, valor)])
             logging.info("Valor ingresado correctamente.")
         except Exception as e:
             logging.error(f"Error al ingresar el valor unitario: {e}")
@@ -900,86 +893,59 @@ def ingresar_datos_factura(driver, prefijo, consecutivo, codigo_producto, nit_te
         # sacar el iva correspondiente y ver si esta vacio o no
         try:
 
-            # Verificar si la variable es NaN o un string vacío/contiene solo espacios/guiones
-            if not (math.isnan(iva) if isinstance(iva, (int, float)) else not iva.strip().replace('-', '').strip()):
-                if iva != '0' and iva != 0:
-                    # Localizar el elemento <select>
-                    diferencia_iva = round(float(valor) * 0.19, 2)
-                    resultado_iva = float(valor) + float(diferencia_iva)
-                    print(float(valor_total))
-                    if resultado_iva != float(valor_total):
-                        WebDriverWait(driver,10).until(EC.visibility_of_element_located(
-                            (By.XPATH,'//*[text()=" Agregar otro ítem "]')
-                        )).click()
-                        # Ingresar tipo de producto
-                        try:
-                            select_activo_fijo = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located(
-                                    (By.XPATH, '//*[@id="trEditRow"]/div[2]/siigo-dropdownenum/select'))
-                            )
-                            dropdown = Select(select_activo_fijo)
-                            time.sleep(2)
-                            dropdown.select_by_visible_text("Gasto / Cuenta contable")
-                            logging.info("Activo fijo seleccionado correctamente.")
-                            time.sleep(1)
-                        except Exception as e:
-                            logging.error(f"Error al seleccionar el activo fijo: {e}")
-                            raise
-                        # Ingresar el producto a buscar
-                        try:
-                            if codigo_iva == "nan":
-                                logging.error(
-                                    f"No se encuentra un código de producto para el NIT {codigo_iva}")
-                                raise ValueError("Código de producto no válido.")
-
-                            select_producto = WebDriverWait(driver, 10).until(
-                                EC.presence_of_element_located(
-                                    (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[4]'))
-                            )
-                            time.sleep(2)
-                            select_producto.send_keys(str(codigo_iva))
-                            logging.info("Producto seleccionado correctamente.")
-                            time.sleep(1)
-                            ActionChains(driver).send_keys(Keys.ENTER).perform()
-                            time.sleep(1)
-                        except Exception as e:
-                            raise
-                    
-                        # Ingresar el valor unitario
-                        try:
-                            valor_unitario = WebDriverWait(driver, 10).until(
-                                EC.element_to_be_clickable(
-                                    (By.XPATH, '(//*[@class="dx-texteditor-container"]/div/input[@id="inputDecimal_siigoInputDecimal"])[3]'))
-                            )
-                            valor_unitario.click()
-                            time.sleep(1)
-                            valor_unitario.clear()
-                            time.sleep(1)
-                            # Simular escritura humana
-                            for char in str(iva):
-                                valor_unitario.send_keys(char)
-                                time.sleep(0.1)
-                            time.sleep(1)
-                            
-                            logging.info("Valor ingresado correctamente.")
-                        except Exception as e:
-                            logging.error(f"Error al ingresar el valor unitario: {e}")
-                            raise
-                    else:
-                        # Cambia "ID_DEL_SELECT" por el ID real del elemento
-                        select_element = driver.find_element(By.XPATH,
-                            '//siigo-dropdown[@id="editAddTax"]//*[@id="dropdown_dropdownSelect"]')
-                        # Obtener todas las opciones del <select>
-                        options_select_iva = select_element.find_elements(By.TAG_NAME, "option")
-                        # Recorrer las opciones y encontrar el texto "IVA 19 MV"
-                        for option in options_select_iva:
-                            print(option)
-                            if iva_cliente in option.text:
-                                logging.info(f"Texto encontrado: {option.text}")
-                                # Aquí puedes realizar la acción que necesites, como seleccionar la opción
-                                option.click()  # Selecciona la opción
-                                break
-                    
+            # Cómo se registra el IVA: como otro ítem, con el impuesto del cliente o no se registra
+            if linea_iva == "item":
+                espera.esperar(driver, EC.element_to_be_clickable(
+                    (By.XPATH,'//*[text()=" Agregar otro ítem "]')
+                )).click()
+                # Ingresar tipo de producto
+                try:
+                    select_activo_fijo = espera.esperar(driver, EC.presence_of_element_located(
+                        (By.XPATH, '//*[@id="trEditRow"]/div[2]/siigo-dropdownenum/select')))
+                    dropdown = Select(select_activo_fijo)
+                    espera.opciones_desplegable(
+                        driver, select_activo_fijo, "Gasto / Cuenta contable")
+                    dropdown.select_by_visible_text("Gasto / Cuenta contable")
+                    logging.info("Activo fijo seleccionado correctamente.")
+                except Exception as e:
+                    logging.error(f"Error al seleccionar el activo fijo: {e}")
+                    raise
+                # Ingresar el producto a buscar
+                try:
+                    select_producto = espera.esperar(driver, EC.presence_of_element_located(
+                        (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[4]')))
+                    select_producto.send_keys(str(codigo_iva))
+                    espera.resultados_autocompletado(driver)
+                    ActionChains(driver).send_keys(Keys.ENTER).perform()
+                    espera.cierre_autocompletado(driver)
+                    logging.info("Producto seleccionado correctamente.")
+                except Exception as e:
+                    raise
+
+                # Ingresar el valor unitario
+                try:
+                    valor_unitario = espera.esperar(driver, EC.element_to_be_clickable(
+                        (By.XPATH, XPATH_VALOR_UNITARIO)))
+                    llenar_y_verificar(driver, [(valor_unitario, iva)])
+
+                    logging.info("Valor ingresado correctamente.")
+                except Exception as e:
+                    logging.error(f"Error al ingresar el valor unitario: {e}")
+                    raise
+            elif linea_iva == "impuesto":
+                # Cambia "ID_DEL_SELECT" por el ID real del elemento
+                select_element = driver.find_element(By.XPATH,
+                    '//siigo-dropdown[@id="editAddTax"]//*[@id="dropdown_dropdownSelect"]')
+                # Obtener todas las opciones del <select>
+                options_select_iva = select_element.find_elements(By.TAG_NAME, "option")
+                # Recorrer las opciones y encontrar el texto "IVA 19 MV"
+                for option in options_select_iva:
+                    if iva_cliente in option.text:
+                        logging.info(f"Texto encontrado: {option.text}")
+                        # Aquí puedes realizar la acción que necesites, como seleccionar la opción
+                        option.click()  # Selecciona la opción
+                        break
+
             else:
                 logging.warning(
                     "La variable es NaN o está vacía/contiene solo espacios/guiones, no se realiza ninguna acción.")
@@ -990,25 +956,17 @@ def ingresar_datos_factura(driver, prefijo, consecutivo, codigo_producto, nit_te
             raise
         # Ingresar la forma de pago
         try:
-            forma_pago = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//*[@id="editingAcAccount_autocompleteInput"]'))
-            )
-            
-            # 2. Hacer scroll hasta el elemento
-            driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", forma_pago)
-            time.sleep(1)
+            forma_pago = espera.esperar(driver, EC.presence_of_element_located(
+                (By.XPATH, '//*[@id="editingAcAccount_autocompleteInput"]')))
             
-            # 3. Esperar un breve momento (opcional, pero recomendado para páginas lentas)
-            time.sleep(1)
+            # 2. Hacer scroll hasta el elemento (sin animación para no tener que esperarla)
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", forma_pago)
 
-            # 4. Hacer clic (usando JavaScript para evitar intercepciones)
-            forma_pago.click()
+            # 3. Hacer clic cuando el campo sea clickeable
+            espera.esperar(driver, EC.element_to_be_clickable(forma_pago)).click()
 
-            elemento = WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, "//table[contains(@class, 'siigo-ac-table')]//div[text()=' Otras cuentas por pagar ']"))
-            )
+            elemento = espera.esperar(driver, EC.presence_of_element_located(
+                (By.XPATH, "//table[contains(@class, 'siigo-ac-table')]//div[text()=' Otras cuentas por pagar ']")))
             # Desplazarse hasta el elemento (si es necesario)
             ActionChains(driver).move_to_element(elemento).perform()
             # Hacer clic en el elemento
@@ -1019,30 +977,28 @@ def ingresar_datos_factura(driver, prefijo, consecutivo, codigo_producto, nit_te
             raise
 
         try:
-            # Click en la X si aparece
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located((
-                By.XPATH, '//*[@class="icon-siigo-simbolos-cerrar red"]'))).click()
-            logging.info("Ventana emergente cerrada correctamente.")
+            # Click en la X si aparece (espera blanda: normalmente no aparece)
+            cerrar_emergente = espera.esperar_o_continuar(driver, EC.element_to_be_clickable((
+                By.XPATH, '//*[@class="icon-siigo-simbolos-cerrar red"]')),
+                descripcion="la ventana emergente")
+            if cerrar_emergente:
+                cerrar_emergente.click()
+                logging.info("Ventana emergente cerrada correctamente.")
         except Exception as e:
             logging.error(f"Error al cerrar la ventana emergente:")
 
-        time.sleep(2)
-
         try:
             # Hacer click en guardar
-            WebDriverWait(driver, 10).until(EC.presence_of_element_located(
+            espera.esperar(driver, EC.element_to_be_clickable(
                 (By.XPATH, '//*[contains(@class,"SiigoButtonPrimary")]'))).click()
             logging.info("Factura guardada correctamente.")
-            time.sleep(2)
         except Exception as e:
             logging.error(f"Error al guardar la factura: {e}")
             raise
 
         # Esperar y obtener el texto de la factura
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '//*[@class="title-container"]'))
-        )
+        espera.esperar(driver, EC.presence_of_element_located(
+            (By.XPATH, '//*[@class="title-container"]')))
         logging.info("Factura procesada correctamente.")
 
     except Exception as e:
@@ -1056,28 +1012,26 @@ def obtener_y_mover_factura(driver, output_folder, pdf_routes, razon_social_vend
     """
     Obtiene el número de factura de una página web y mueve el archivo PDF correspondiente.
 
-    :return: (numero_factura, True) si la operación fue exitosa, (None, False) en caso contrario.
+    :return: (numero_factura, True, ruta_carpeta_log) si la operación fue exitosa (la
+        carpeta a la que se movió el PDF), (None, False, None) en caso contrario.
     """
     TIMEOUT = 30  # Tiempo máximo de espera para el texto de la factura
+    espera = obtener_politica()
 
     try:
         logging.info("Esperando el texto de la factura...")
-        # Esperar a que aparezca el texto de la factura
-        texto_factura_compra = WebDriverWait(driver, TIMEOUT).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '//*[@class="title-container"]'))
-        )
-        time.sleep(5)
-        texto_factura_compra = WebDriverWait(driver, 15).until(
-            EC.presence_of_element_located(
-                (By.XPATH, '//*[@class="title-container"]'))
-        ).text
+        # Esperar a que el texto de la factura muestre el número asignado
+        try:
+            texto_factura_compra = espera.texto_coincide(
+                driver, (By.XPATH, '//*[@class="title-container"]'), r':\s*\S+', TIMEOUT)
+        except TimeoutException:
+            texto_factura_compra = ""
 
         # Expresión regular para extraer el número de factura
         match = re.search(r':\s*(\S+)', texto_factura_compra)
         if not match:
             logging.error("No se pudo extraer el número de factura.")
-            return None, False
+            return None, False, None
 
         numero_factura = match.group(1)
         logging.info(f"Número de factura extraído: {numero_factura}")
@@ -1121,7 +1075,7 @@ def enviar_correos(nombre_archivo, lista_correos):
         # Verificar si el archivo a adjuntar existe
         ruta_archivo = fr"C:\Users\santi\OneDrive\Escritorio\Swith_bots\Swith_bots\ACAFI\inputs\{nombre_archivo}"
         if not os.path.exists(ruta_archivo):
-            print(f"⚠ Archivo no encontrado: {ruta_archivo}")
+            logging.warning(f"Archivo no encontrado: {ruta_archivo}")
             return
 
         # Iterar sobre cada dirección de correo en la lista
@@ -1136,15 +1090,575 @@ def enviar_correos(nombre_archivo, lista_correos):
 
                 # Adjuntar el archivo
                 mail.Attachments.Add(ruta_archivo)
-                print(f"Archivo adjuntado correctamente para {correo}.")
+                logging.info(f"Archivo adjuntado correctamente para {correo}.")
 
                 # 📤 Enviar el correo
                 mail.Send()
-                print(f"✅ Correo electrónico enviado correctamente a {correo}.")
+                logging.info(f"Correo electrónico enviado correctamente a {correo}.")
             except Exception as e:
-                print(f"❌ Error al enviar el correo electrónico a {correo}: {e}")
+                logging.error(f"Error al enviar el correo electrónico a {correo}: {e}")
     except Exception as e:
-        print(f"❌ Error general al enviar los correos electrónicos: {e}")
+        logging.error(f"Error general al enviar los correos electrónicos: {e}")
+
+
+def iterar_lotes(df, df_pendientes, tamano_lote, primer_lote, cola_reintentos):
+    """
+    Genera (numero_lote, lote) con los lotes de filas pendientes a partir de
+    primer_lote y, al terminar, lotes de reintento (numero_lote None) con las
+    filas de la cola de reintentos hasta vaciarla. La cola se consulta al final,
+    así que las filas que vuelven a fallar en un reintento también se reintentan.
+    """
+    total_lotes = (len(df_pendientes) + tamano_lote - 1) // tamano_lote
+    for lote_num in range(primer_lote, total_lotes):
+        inicio = lote_num * tamano_lote
+        yield lote_num, df_pendientes.iloc[inicio:inicio + tamano_lote]
+
+    while cola_reintentos:
+        yield None, df.loc[cola_reintentos.tomar_lote(tamano_lote)]
+
+
+# Protege el consolidado mensual cuando varios trabajadores terminan a la vez
+_candado_consolidacion = threading.Lock()
+
+
+def procesar_archivo_excel(ruta_archivo, config, credenciales, config_clientes,
+                           gestor_sesiones, cache_extraccion, registro_terceros=None,
+                           procesos_pdf=None):
+    """
+    Procesa todas las filas de un archivo Excel de un cliente en Siigo (hasta 3
+    ejecuciones). Al terminar envía los correos, mueve el Excel a la carpeta de
+    log y lo agrega al consolidado mensual.
+
+    El NIT del cliente se toma del nombre del archivo, así que cada trabajador del
+    pool puede procesar archivos de clientes distintos con sus propias credenciales.
+
+    Parámetros:
+        ruta_archivo (str): Ruta del Excel en la carpeta de entrada.
+        config (dict): Configuración general (config.json).
+        credenciales (dict): Credenciales de Siigo por NIT del cliente.
+        config_clientes (dict): Parámetros de cada cliente por NIT.
+        gestor_sesiones (GestorSesiones): Navegadores del trabajador actual.
+        cache_extraccion (CacheExtraccion): Caché de extracción del trabajador actual.
+        registro_terceros (RegistroTerceros): Terceros que ya existen en cada empresa.
+        procesos_pdf (int): Procesos para la pre-extracción de PDFs (por defecto, los
+            núcleos de la máquina).
+    """
+    config_folder = config["paths"]["config"]
+    nombre_archivo = os.path.basename(ruta_archivo)
+    # Extrae el NIT (todo antes del primer '(', '_' o '.')
+    nit_cliente = re.split(r'[_(.]', nombre_archivo)[0]
+
+    # Contador de ejecuciones del archivo
+    ejecuciones_maximas = 3
+    ejecuciones_realizadas = 0
+    # Bandera para controlar si todas las filas han sido procesadas
+    todas_filas_procesadas = False
+
+    # Tamaño de lote y esperas entre lotes (config["lotes"], opcional): se continúa
+    # de inmediato mientras las filas salen bien y se espera solo tras fallos
+    planificador = PlanificadorLotes(**config.get("lotes", {}))
+    TAMANO_LOTE = planificador.tamano_lote
+    # Archivo para guardar progreso (uno por archivo Excel)
+    ARCHIVO_PROGRESO = os.path.join(
+        config_folder, f"progreso_{os.path.splitext(nombre_archivo)[0]}.json")
+
+    # Limpiar el archivo de progreso si existe
+    if os.path.exists(ARCHIVO_PROGRESO):
+        os.remove(ARCHIVO_PROGRESO)
+        logging.warning("¡Se eliminó el archivo de progreso previo!")
+
+    # Bitácora append-only con el resultado de cada fila; el Excel
+    # solo se reescribe al final de cada lote
+    bitacora = BitacoraFilas(
+        ruta_archivo, os.path.join(config_folder, "bitacoras"), prefijo="siigo")
+
+    # Duración de cada paso por CUFE (JSONL) y resumen al terminar el archivo
+    metricas = MetricasPasos(
+        config.get("metricas_pasos", "logs/metricas_pasos.jsonl"), nombre_archivo)
+
+    # Datos de los PDFs extraídos antes del login, por CUFE
+    datos_preextraidos = {}
+
+    # Filas fallidas que se reintentan al final del archivo en la misma sesión
+    cola_reintentos = ColaReintentos(config.get("max_intentos_fila", 3))
+    # Bandera para no repetir el archivo completo cuando ya se recorrieron todos los lotes
+    recorrido_completo = False
+
+    try:
+        while (ejecuciones_realizadas < ejecuciones_maximas and not todas_filas_procesadas
+               and not recorrido_completo):
+            ejecuciones_realizadas += 1
+            logging.info(f"Ejecución número {ejecuciones_realizadas}.")
+            # Las filas encoladas vuelven a estar entre las pendientes de esta ejecución
+            cola_reintentos.vaciar()
+            try:
+                ###########################################################
+                # Cargar el archivo Excel que contiene los datos a procesar
+                ###########################################################
+                df = cargar_excel(ruta_archivo)
+                logging.info(
+                f"Archivo Excel cargado correctamente: {ruta_archivo}")
+
+                # Verificar si la columna 'PDF Generado' existe, si no, crearla
+                if 'PDF Generado' not in df.columns:
+                    df['PDF Generado'] = 'No'
+                # Definir las columnas necesarias
+                columnas_necesarias = ['PDF Generado', 'Procesamiento Exitoso',
+                                    'Forma de Pago', 'Nombre PDF', 'Mensaje Error']
+
+                # Verificar si las columnas existen, si no, crearlas con valores vacíos
+                for col in columnas_necesarias:
+                    if col not in df.columns:
+                        df[col] = ""  # Se inicializan vacías
+
+                # Recuperar resultados de filas que no alcanzaron a guardarse en el Excel
+                if bitacora.aplicar(df):
+                    with metricas.paso("guardar_excel"):
+                        bitacora.materializar(df)
+
+                # Normalizar todas las filas de una vez (por columnas) en registros de factura
+                registros = normalizar_facturas(df)
+
+                # Verificar si todas las filas ya están procesadas
+                if all(df['PDF Generado'] == 'Sí'):
+                    logging.info(
+                        "Todas las filas ya están procesadas. Finalizando ejecución.")
+                    todas_filas_procesadas = True
+                    break
+                else: 
+                    logging.info(
+                        "todavia faltan documentos por generar"
+                    )
+                ###########################################################
+                # Extraer los datos de todos los PDFs pendientes antes del login
+                ###########################################################
+                with metricas.paso("extraccion_pdf"):
+                    datos_preextraidos = preextraer_datos_pdf(
+                        df, config["paths"]["pdf"], nit_cliente, datos_preextraidos,
+                        max_workers=procesos_pdf, cache=cache_extraccion)
+
+                ###########################################################
+                # Planificar todas las filas pendientes; las que no pueden
+                # terminar bien se rechazan sin abrir el navegador
+                ###########################################################
+                planes, rechazos = planificar_filas(
+                    df, registros, config["paths"]["pdf"], nit_cliente, config_clientes,
+                    datos_preextraidos)
+                for indice, motivo in rechazos.items():
+                    bitacora.registrar_en(df, indice, {
+                        'Procesamiento Exitoso': "Rechazado",
+                        'Mensaje Error': motivo,
+                        'Nombre PDF': "",
+                    })
+                if rechazos:
+                    with metricas.paso("guardar_excel"):
+                        bitacora.materializar(df, ruta_archivo)
+                if not planes:
+                    logging.info("Ninguna fila pendiente puede procesarse; no se abre el navegador.")
+                    recorrido_completo = True
+                    break
+
+                ###########################################################
+                # Iniciar sesión en la aplicación web
+                ###########################################################
+                # Se reutiliza el navegador del usuario si sigue vivo y autenticado
+                with metricas.paso("login"):
+                    driver = gestor_sesiones.obtener(
+                        credenciales[nit_cliente]["usuario"],
+                        credenciales[nit_cliente]["contrasena"])
+                logging.info("Sesión iniciada correctamente.")
+
+                # Bandera para controlar si el ingreso ya se realizó
+                ingreso_realizado = False
+
+                # Cargar o inicializar progreso
+                if os.path.exists(ARCHIVO_PROGRESO):
+                    with open(ARCHIVO_PROGRESO, 'r') as f:
+                        progreso = json.load(f)
+                    lote_actual = progreso['ultimo_lote'] + 1
+                else:
+                    progreso = {
+                        'archivo': ruta_archivo,
+                        'ultimo_lote': -1,
+                        'filas_procesadas': 0
+                    }
+                    lote_actual = 0
+
+                # Calcular lotes pendientes (solo las filas con plan)
+                df_pendientes = df.loc[[indice for indice in df.index if indice in planes]]
+                total_filas = len(df_pendientes)
+                total_lotes = (total_filas + TAMANO_LOTE - 1) // TAMANO_LOTE
+
+                # Procesar lotes pendientes y después los reintentos de las filas fallidas
+                for lote_num, lote in iterar_lotes(
+                        df, df_pendientes, TAMANO_LOTE, lote_actual, cola_reintentos):
+                    if lote_num is None:
+                        logging.info(f"Reintentando {len(lote)} filas fallidas en la misma sesión.")
+                    else:
+                        inicio = lote_num * TAMANO_LOTE
+                        fin = inicio + len(lote)
+                        logging.info(f"Procesando lote {lote_num + 1}/{total_lotes} (filas {inicio+1}-{fin})")
+                    filas_exitosas = 0
+                    filas_fallidas = 0
+
+                    ###########################################################
+                    # Iterar sobre cada fila del DataFrame (archivo Excel)
+                    ###########################################################
+                    for index in lote.index:
+                        inicio_fila = time.perf_counter()
+                        cufe = None
+                        fijar_contexto(fila=index + 1, cufe=None)
+                        try:
+                            logging.info(
+                                f"Procesando fila {index + 1} del archivo Excel.")
+
+                            ###########################################################
+                            # Tomar los datos ya normalizados de la fila actual del Excel
+                            ###########################################################
+                            plan = planes.get(index)
+                            if plan is None:
+                                logging.warning(
+                                    f"Fila {index + 1} no procesada correctamente. Saltando...")
+                                continue
+                            registro = plan.registro
+                            cufe = registro.cufe
+                            fijar_contexto(cufe=cufe)
+                            factura = registro.factura
+                            iva = registro.iva
+                            codigo_producto = registro.codigo_producto
+                            nit_tercero = registro.nit_tercero
+                            razon_social_vendedor = registro.razon_social_vendedor
+                            prefijo = registro.prefijo
+                            consecutivo = registro.consecutivo
+
+                            output_folder = config["paths"]["output"]
+                            # Parámetros del cliente, fecha y datos del PDF resueltos en el plan
+                            centro_costo = plan.centro_costo
+                            iva_cliente = plan.iva_cliente
+                            codigo_iva = plan.codigo_iva
+                            fecha_formateada = plan.fecha_formateada
+                            logging.info(f"Fecha formateada: {fecha_formateada}")
+                            # Obtener la fecha actual
+                            ahora = datetime.now()
+                            año = ahora.strftime("%Y")
+                            mes = ahora.strftime("%m")
+                            dia = ahora.strftime("%d")
+
+                            ruta_carpeta_log = os.path.join(
+                                output_folder, str(nit_cliente ), año, mes, dia)
+
+                            pdf_routes = plan.ruta_pdf
+                            logging.info(f"Procesando archivo PDF: {pdf_routes}")
+                            datos_extraidos = [plan.datos_pdf]
+                            forma_de_pago = plan.forma_de_pago
+                            logging.info(f"Forma de pago: {forma_de_pago}")
+                            valor = plan.valor
+                            logging.info(f"Total Bruto Factura: {valor}")
+
+                            ### ------------------apartado web-------------------------###
+
+                            ###########################################################
+                            # Ingresar los datos del cliente receptor en la aplicación web - 1
+                            ###########################################################
+                            with metricas.paso("ingresar_cliente", cufe, index):
+                                ingreso_correcto = ingresar_cliente(
+                                    driver, nit_cliente, ingreso_realizado)
+                            if not ingreso_correcto:
+                                logging.warning(
+                                    "El ingreso ya se había realizado o hubo un error.")
+
+                            logging.info(
+                                "Ingreso del cliente realizado correctamente.")
+                            ingreso_realizado = True
+
+                            ########################################################
+                            # Nota débito o factura de compra, según el plan
+                            ########################################################
+                            contiene_nota_resultado = plan.es_nota
+                            xpath_accion = plan.xpath_accion
+                            logging.info(
+                                f"¿Contiene la palabra 'nota'? {contiene_nota_resultado}")
+                            # Tomamos decisiones basadas en el resultado booleano
+                            if contiene_nota_resultado:
+                                # Si contiene la palabra "nota", ejecutamos la función relacionada con Nota débito
+                                with metricas.paso("accion_nota_debito", cufe, index):
+                                    accion_nota_debito(
+                                        driver, fecha_formateada, nit_tercero, xpath_accion, plan.referencia_nota,
+                                        ruta_carpeta_log)
+
+                            else:
+                                # El resto del código continúa normalmente
+                                logging.info(
+                                    "El resto del código continúa su ejecución...")
+
+                                ###########################################################
+                                # Crear factura de compra en la aplicación web -2
+                                ###########################################################
+                                with metricas.paso("crear_factura_compra", cufe, index):
+                                    crear_factura_compra(
+                                        driver, fecha_formateada, nit_tercero, xpath_accion,)
+                                logging.info("Factura de compra creada correctamente.")
+
+                                ###########################################################
+                                # Registrar la cuenta en la aplicación web con los datos extraídos -3
+                                ###########################################################
+                                with metricas.paso("registrar_cuenta_en_web", cufe, index):
+                                    registrar_cuenta_en_web(
+                                        driver, datos_extraidos, nit_tercero, razon_social_vendedor,
+                                        registro_terceros, nit_cliente)
+                                logging.info(
+                                    "Cuenta registrada correctamente en la aplicación web.")
+
+                                ###########################################################
+                                # Ingresar datos de la factura en la aplicación web -4
+                                ###########################################################
+                                with metricas.paso("ingresar_datos_factura", cufe, index):
+                                    ingresar_datos_factura(
+                                        driver, prefijo, consecutivo, codigo_producto, nit_tercero, valor, iva, iva_cliente, centro_costo,plan.linea_iva,codigo_iva)
+                                logging.info(
+                                    "Datos de la factura ingresados correctamente.")
+
+                            ###########################################################
+                            # Obtener y mover la factura generada -5
+                            ###########################################################
+
+                            with metricas.paso("obtener_y_mover_factura", cufe, index):
+                                numero_factura, resultado,output_pdf_path = obtener_y_mover_factura(
+                                    driver=driver,
+                                    output_folder=output_folder,
+                                    pdf_routes=pdf_routes,
+                                    razon_social_vendedor=razon_social_vendedor,
+                                    factura=factura,
+                                    ruta_carpeta_log=ruta_carpeta_log,
+                                )
+
+                            if resultado:
+                                logging.info("La factura se procesó correctamente.")
+                                mensaje_error = ""
+                                progreso['filas_procesadas'] += 1
+                            else:
+                                logging.error(" Hubo un error al procesar la factura.")
+                                mensaje_error = "Error al procesar la factura"
+                                # El comprobante ya quedó guardado en Siigo: no se reintenta la fila
+                                raise FacturaGuardada(mensaje_error)
+                            # Registrar el resultado de la fila en la bitácora
+                            bitacora.registrar_en(df, index, {
+                                'PDF Generado': 'Sí',
+                                'Procesamiento Exitoso': 'Procesamiento Exitoso',
+                                'Forma de Pago': forma_de_pago,
+                                'Mensaje Error': mensaje_error,
+                                'Nombre PDF': numero_factura,
+                            })
+                            filas_exitosas += 1
+                            metricas.factura(cufe, index, True, time.perf_counter() - inicio_fila)
+                        except Exception as e:
+                                logging.error(
+                                    f"Error al procesar la fila {index + 1}: {e}")
+                                # Registrar la fila en la bitácora con estado fallido (o por
+                                # revisar si Siigo ya guardó el comprobante)
+                                forma_de_pago = "null"
+                                bitacora.registrar_en(df, index, {
+                                    'Forma de Pago': forma_de_pago,
+                                    'Mensaje Error': str(e),
+                                    'Nombre PDF': "",
+                                    'Procesamiento Exitoso': (
+                                        ESTADO_POR_REVISAR if isinstance(e, FacturaGuardada)
+                                        else "Fallido"),
+                                })
+                                filas_fallidas += 1
+                                metricas.factura(cufe, index, False, time.perf_counter() - inicio_fila)
+                                # Encolar la fila si el error es transitorio (p. ej. tiempo agotado)
+                                cola_reintentos.agregar(index, e)
+
+                    fijar_contexto(fila=None, cufe=None)
+                    # Actualizar progreso después de cada lote (los reintentos no cuentan)
+                    if lote_num is not None:
+                        progreso['ultimo_lote'] = lote_num
+                    with open(ARCHIVO_PROGRESO, 'w') as f:
+                        json.dump(progreso, f)
+
+                    # Materializar el Excel a partir de la bitácora
+                    with metricas.paso("guardar_excel"):
+                        bitacora.materializar(df, ruta_archivo)
+                    logging.info(
+                        f"Progreso guardado. Lote {'de reintentos' if lote_num is None else lote_num + 1} completado.")
+                    planificador.registrar_lote(filas_exitosas, filas_fallidas)
+
+                    # Verificar si se completó todo
+                    if len(df[df['PDF Generado'] != 'Sí']) == 0:
+                        todas_filas_procesadas = True
+                        if os.path.exists(ARCHIVO_PROGRESO):
+                            os.remove(ARCHIVO_PROGRESO)
+                        logging.info("¡Todo el archivo Excel ha sido procesado con éxito!")
+                    elif (lote_num is not None and lote_num + 1 < total_lotes) or cola_reintentos:
+                        ###########################################################
+                        # Esperar antes del siguiente lote solo si hubo fallos
+                        ###########################################################
+                        planificador.esperar()
+
+                # Las filas que siguen fallidas tienen errores no reintentables o agotaron
+                # sus intentos; no se repite el archivo completo por ellas
+                recorrido_completo = True
+
+            except Exception as e:
+                logging.error(f"Error durante la ejecución del lote: {str(e)}")
+                if ejecuciones_realizadas == ejecuciones_maximas:
+                    logging.error("Se alcanzó el máximo de intentos. Abortando.")
+                    raise
+    except Exception as e:
+        logging.error(f"Error en la ejecución principal: {e}")
+    logging.info(planificador.resumen())
+    logging.info(metricas.texto_resumen())
+
+    # Enviar correo electrónico al finalizar
+    # Extraer la lista de correos electrónicos
+    correos = config.get("correos", [])
+    enviar_correos(nombre_archivo,correos)
+
+    # Mover y renombrar el archivo
+    ahora = datetime.now()
+    ruta_carpeta_log = os.path.join(
+        config["paths"]["output"], str(nit_cliente), ahora.strftime("%Y"),
+        ahora.strftime("%m"), ahora.strftime("%d"))
+    os.makedirs(ruta_carpeta_log, exist_ok=True)
+    archivo_log = f"{ruta_carpeta_log}/{nit_cliente}.xlsx"
+    shutil.move(ruta_archivo, archivo_log)
+    logging.info(f"Excel movido a: {archivo_log}")
+    # 2. Proceso de consolidación mensual con logging
+    try:
+        df_nuevo = pd.read_excel(archivo_log)
+
+        # Validación de estructura
+        if 'Fecha Emisión' not in df_nuevo.columns:
+            logging.warning("El archivo no contiene columna 'Fecha'. No se puede clasificar por mes.")
+        else:
+            fecha = pd.to_datetime(df_nuevo['Fecha'].iloc[0])
+            nombre_mes = fecha.strftime("%Y-%m")
+            archivo_mes = f"facturas_{nombre_mes}.xlsx"
+            ruta_mes = os.path.join("facturas_mensuales", archivo_mes)
+
+            # Crear directorio si no existe
+            os.makedirs(os.path.dirname(ruta_mes), exist_ok=True)
+
+            # El consolidado mensual es compartido por todos los trabajadores
+            with _candado_consolidacion:
+                if os.path.exists(ruta_mes):
+                    df_existente = pd.read_excel(ruta_mes)
+
+                    df_final = pd.concat([df_existente, df_nuevo], ignore_index=True)
+                    logging.info(f"Archivo {archivo_mes} actualizado con {len(df_nuevo)} nuevos registros")
+                else:
+                    df_final = df_nuevo
+                    logging.info(f"Archivo mensual {archivo_mes} creado con {len(df_nuevo)} registros")
+
+                df_final.to_excel(ruta_mes, index=False)
+            logging.info(f"Consolidación mensual completada: {ruta_mes}")
+
+    except Exception as e:
+        logging.error(f"Error en consolidación mensual: {str(e)}", exc_info=True)
+    logging.info("Ejecución finalizada.")
+
+
+def agrupar_archivos_por_cliente(carpeta):
+    """
+    Agrupa los Excel de la carpeta de entrada por NIT del cliente. Un solo
+    trabajador procesa en orden todos los archivos de un cliente, para no abrir
+    dos sesiones de Siigo simultáneas con el mismo usuario.
+
+    Retorna:
+        list: Listas de rutas, una por cliente.
+    """
+    grupos = {}
+    for archivo in sorted(os.listdir(carpeta)):
+        if archivo.endswith('.xlsx') or archivo.endswith('.xls'):
+            nit = re.split(r'[_(.]', archivo)[0]
+            grupos.setdefault(nit, []).append(os.path.join(carpeta, archivo))
+    return list(grupos.values())
+
+
+def trabajador_archivos(cola, config, credenciales, config_clientes, procesos_pdf=None):
+    """
+    Toma grupos de archivos de la cola hasta vaciarla. Cada trabajador tiene sus
+    propios navegadores (uno por usuario de Siigo) y sus propias conexiones a la
+    caché de extracción y al registro de terceros. procesos_pdf limita los
+    procesos de la pre-extracción de PDFs de este trabajador.
+    """
+    # Outlook (COM) requiere inicializar COM en cada hilo
+    pythoncom.CoInitialize()
+    gestor_sesiones = GestorSesiones(
+        iniciar=lambda: iniciar_navegador(config["paths"]["web_driver"], crear_opciones_chrome()),
+        navegar=lambda driver: navegar_a_url(driver, config["urls"]["main"]),
+        autenticar=login,
+    )
+    cache_extraccion = CacheExtraccion(
+        os.path.join(config["paths"]["config"], "cache_extraccion.sqlite"),
+        **config.get("cache_extraccion", {}))
+    registro_terceros = RegistroTerceros(
+        os.path.join(config["paths"]["config"], "terceros.sqlite"))
+    try:
+        while True:
+            try:
+                grupo = cola.get_nowait()
+            except queue.Empty:
+                break
+            for ruta_archivo in grupo:
+                try:
+                    with contexto_log(archivo=os.path.basename(ruta_archivo), fila=None, cufe=None):
+                        procesar_archivo_excel(
+                            ruta_archivo, config, credenciales, config_clientes,
+                            gestor_sesiones, cache_extraccion, registro_terceros, procesos_pdf)
+                except Exception as e:
+                    logging.error(f"Error al procesar el archivo {ruta_archivo}: {e}")
+    finally:
+        ###########################################################
+        # Cerrar los navegadores al finalizar
+        ###########################################################
+        gestor_sesiones.cerrar_todas()
+        cache_extraccion.cerrar()
+        registro_terceros.cerrar()
+        pythoncom.CoUninitialize()
+
+
+def procesar_archivos(carpeta, config, credenciales, config_clientes, trabajadores=1):
+    """
+    Procesa los Excel de la carpeta de entrada con un pool de trabajadores. Cada
+    trabajador usa sus propios navegadores y toma de una cola compartida los
+    archivos de un cliente a la vez. Con un solo trabajador se procesa en el hilo
+    actual, igual que antes.
+
+    Parámetros:
+        carpeta (str): Carpeta con los Excel de entrada.
+        config (dict): Configuración general (config.json).
+        credenciales (dict): Credenciales de Siigo por NIT del cliente.
+        config_clientes (dict): Parámetros de cada cliente por NIT.
+        trabajadores (int): Número máximo de navegadores simultáneos.
+    """
+    grupos = agrupar_archivos_por_cliente(carpeta)
+    cola = queue.Queue()
+    for grupo in grupos:
+        cola.put(grupo)
+
+    trabajadores = max(1, min(int(trabajadores), len(grupos)))
+    # Los núcleos se reparten entre los trabajadores para que sus pre-extracciones
+    # simultáneas no lancen cada una un proceso por núcleo
+    procesos_pdf = max(1, (os.cpu_count() or 1) // trabajadores)
+    logging.info(
+        f"{len(grupos)} clientes por procesar con {trabajadores} trabajador(es) y "
+        f"{procesos_pdf} proceso(s) de extracción de PDFs por trabajador.")
+    if trabajadores == 1:
+        trabajador_archivos(cola, config, credenciales, config_clientes, procesos_pdf)
+        return
+
+    hilos = [
+        threading.Thread(
+            target=trabajador_archivos, name=f"trabajador-{numero}",
+            args=(cola, config, credenciales, config_clientes, procesos_pdf))
+        for numero in range(1, trabajadores + 1)
+    ]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
 
 
 # ----------------------------
@@ -1158,478 +1672,45 @@ if __name__ == "__main__":
     configurar_logging()
     logging.info("Iniciando la ejecución del script principal.")
 
-    # Contador de ejecuciones
-    ejecuciones_maximas = 3
-    ejecuciones_realizadas = 0
-    
     ###########################################################
     # Definir las rutas de los archivos de configuración y credenciales
     ###########################################################
     CONFIG_PATH = "config/config.json"
     CREDENCIALES_PATH = "config/credenciales.json"
-    DATOS_EXTRAIDOS_PATH = "config/datos_extraidos.json"
-    EXCEL_ROUTES_PATH = "config/ruta_excel.json"
     CONFIG_CLIENTES = "config/configuracion_usuarios.json"
     ###########################################################
-    # Cargar la configuración, credenciales y datos extraídos
+    # Cargar la configuración, credenciales y parámetros de los clientes
     ###########################################################
     
     # Obtener ruta base del proyecto (ACAFI/)
     BASE_DIR = Path(__file__).parent.parent
     
-    config, credenciales, datos_extraidos_pdf, excel_routes, config_clientes = cargar_configuracion(
-        CONFIG_PATH, CREDENCIALES_PATH, DATOS_EXTRAIDOS_PATH, EXCEL_ROUTES_PATH, CONFIG_CLIENTES, BASE_DIR
+    config, credenciales, config_clientes = cargar_configuracion(
+        CONFIG_PATH, CREDENCIALES_PATH, CONFIG_CLIENTES, BASE_DIR
     )
+    # Nivel de detalle y rotación del log (config["logging"], opcional), p. ej.
+    # {"nivel": "produccion", "max_mb": 10, "copias": 5}
+    if config.get("logging"):
+        configurar_logging(**config["logging"])
     logging.info(
         "Configuración y credenciales cargadas correctamente.")
 
+    # Perfil de esperas del formulario web (config["esperas"], opcional)
+    configurar_esperas(config.get("esperas"))
+
     
     carpeta = config["paths"]["inputs"]
     config_folder = config["paths"]["config"]
-    
-    try:
-        for archivo in os.listdir(carpeta):
-            if archivo.endswith('.xlsx') or archivo.endswith('.xls'):
-                ruta_archivo = os.path.join(carpeta, archivo)
-                try:
-                    df = pd.read_excel(ruta_archivo, engine="openpyxl")
-                    nombre_archivo = ruta_archivo.split("\\")[-1]
-                    # Extrae el NIT (todo antes del primer '(', '_' o '.')
-                    nit_receptor = re.split(r'[_(.]', nombre_archivo)[0]
-                    # Bandera para controlar si todas las filas han sido procesadas
-                    todas_filas_procesadas = False
-                    
-                    # Definir tamaño de lote
-                    TAMANO_LOTE = 5
-                    # Archivo para guardar progreso
-                    ARCHIVO_PROGRESO = os.path.join(config_folder, f"progreso.json")
-                    
-                     # Limpiar el archivo de progreso si existe
-                    if os.path.exists(ARCHIVO_PROGRESO):
-                        os.remove(ARCHIVO_PROGRESO)
-                        logging.warning("¡Se eliminó el archivo de progreso previo!")
-
-                    while ejecuciones_realizadas < ejecuciones_maximas and not todas_filas_procesadas:
-                        ejecuciones_realizadas += 1
-                        logging.info(f"Ejecución número {ejecuciones_realizadas}.")
-                        try:
-                            ###########################################################
-                            # Configurar las opciones de Chrome para el navegador
-                            ###########################################################
-                            options = Options()
-                            # Maximizar la ventana del navegador
-                            options.add_argument("--start-maximized")
-                            # Deshabilitar la política de mismo origen
-                            options.add_argument("--disable-web-security")
-                            # Deshabilitar notificaciones
-                            options.add_argument("--disable-notifications")
-                            # Evitar detección de automatización
-                            options.add_argument(
-                                "--disable-blink-features=AutomationControlled")
-                            # Ignorar errores de certificados SSL
-                            options.add_argument("--ignore-certificate-errors")
-                            # Permitir conexiones inseguras a localhost
-                            options.add_argument("--allow-insecure-localhost")
-                            # evitar que el navegador se cierre para ver el error
-                            options.add_experimental_option("detach", True)
-
-                            logging.info("Opciones del navegador configuradas correctamente.")
-
-                            ###########################################################
-                            # Iniciar el navegador Chrome con las opciones configuradas
-                            ###########################################################
-                            driver = iniciar_navegador(config["paths"]["web_driver"], options)
-                            logging.info("Navegador iniciado correctamente.")
 
-                            ###########################################################
-                            # Navegar a la URL de la página principal
-                            ###########################################################
-                            navegar_a_url(driver, config["urls"]["main"])
-                            logging.info(
-                                f"Navegado a la URL principal: {config['urls']['main']}")
-                            
-                            ###########################################################
-                            # Cargar el archivo Excel que contiene los datos a procesar
-                            ###########################################################
-                            df = cargar_excel(ruta_archivo)
-                            logging.info(
-                            f"Archivo Excel cargado correctamente: {ruta_archivo}")
-                            
-                            # Extraer solo el nombre del archivo sin la extensión
-                            nombre_archivo = excel_routes['ruta_archivo.excel'].split(
-                                "\\")[-1]
-                            nit_cliente  = re.split(r'[_(.]', nombre_archivo)[0]
-                            
-                            
-                            # Verificar si la columna 'PDF Generado' existe, si no, crearla
-                            if 'PDF Generado' not in df.columns:
-                                df['PDF Generado'] = 'No'
-                            # Definir las columnas necesarias
-                            columnas_necesarias = ['PDF Generado', 'Procesamiento Exitoso',
-                                                'Forma de Pago', 'Nombre PDF', 'Mensaje Error']
-
-                            # Verificar si las columnas existen, si no, crearlas con valores vacíos
-                            for col in columnas_necesarias:
-                                if col not in df.columns:
-                                    df[col] = ""  # Se inicializan vacías
-                                    
-                            # Verificar si todas las filas ya están procesadas
-                            if all(df['PDF Generado'] == 'Sí'):
-                                logging.info(
-                                    "Todas las filas ya están procesadas. Finalizando ejecución.")
-                                todas_filas_procesadas = True
-                                break
-                            else: 
-                                logging.info(
-                                    "todavia faltan documentos por generar"
-                                )
-                            ###########################################################
-                            # Iniciar sesión en la aplicación web
-                            ###########################################################
-                            login(driver, credenciales[nit_cliente ]["usuario"], credenciales[nit_cliente ]["contrasena"])
-                            logging.info("Sesión iniciada correctamente.")
-                            
-                            # Bandera para controlar si el ingreso ya se realizó
-                            ingreso_realizado = False
-                            
-                            # Cargar o inicializar progreso
-                            if os.path.exists(ARCHIVO_PROGRESO):
-                                with open(ARCHIVO_PROGRESO, 'r') as f:
-                                    progreso = json.load(f)
-                                lote_actual = progreso['ultimo_lote'] + 1
-                            else:
-                                progreso = {
-                                    'archivo': ruta_archivo,
-                                    'ultimo_lote': -1,
-                                    'filas_procesadas': 0
-                                }
-                                lote_actual = 0
-                                
-                            # Calcular lotes pendientes
-                            df_pendientes = df[df['PDF Generado'] != 'Sí']
-                            total_filas = len(df_pendientes)
-                            total_lotes = (total_filas + TAMANO_LOTE - 1) // TAMANO_LOTE
-                            
-                            # Procesar lotes pendientes
-                            for lote_num in range(lote_actual, total_lotes):
-                                inicio = lote_num * TAMANO_LOTE
-                                fin = min(inicio + TAMANO_LOTE, total_filas)
-                                lote = df_pendientes.iloc[inicio:fin]
-                                
-                                logging.info(f"Procesando lote {lote_num + 1}/{total_lotes} (filas {inicio+1}-{fin})")
-
-                                ###########################################################
-                                # Iterar sobre cada fila del DataFrame (archivo Excel)
-                                ###########################################################
-                                for index, row in lote.iterrows():  # Solo procesamos 10 filas por iteración
-                                    try:
-                                        logging.info(
-                                            f"Procesando fila {index + 1} del archivo Excel.")
-
-                                        ###########################################################
-                                        # Extraer y procesar los datos de la fila actual del Excel
-                                        ###########################################################
-                                        datos_fila = procesar_fila_excel(row)
-                                        if not datos_fila:
-                                            logging.warning(
-                                                f"Fila {index + 1} no procesada correctamente. Saltando...")
-                                            continue
-                                        # Desempaquetar los datos de la fila
-                                        cufe, factura, fecha, iva, codigo_producto, nit_tercero, razon_social_vendedor, nombre_receptor, prefijo, consecutivo, tipo_documento, centro_costo_excel,valor_total = datos_fila
-                                        logging.info("Datos extraídos correctamente de la fila.")
-
-                                        ###########################################################
-                                        # Verificar si el valor de "CUFE/CUDE" está vacío
-                                        ###########################################################
-                                        if pd.isna(cufe):
-                                            logging.warning(
-                                                f"Fila {index + 1} tiene datos incompletos (CUFE/CUDE vacío). Saltando...")
-
-                                        output_folder = config["paths"]["output"]
-                                        ##########################################################
-                                        # leer los parametros del cliente de el config
-                                        ####################################################
-                                        nombre, centro_costo, iva_cliente,codigo_iva = obtener_informacion_por_nit(
-                                            nit_cliente , config_clientes, centro_costo_excel)
-                                        # Verificar si se encontró la información
-                                        if nombre is not None:
-                                            print(f"Información para el NIT {config_clientes}:")
-                                            print("Nombre:", nombre)
-                                            print("Centro de costo:", centro_costo)
-                                            print("IVA:", iva_cliente)
-                                        else:
-                                            print(
-                                                f"El NIT {config_clientes} no existe en el JSON.")
-                                        ###########################################################
-                                        # Formatear la fecha para el formato requerido
-                                        ###########################################################
-                                        # Formatear la fecha antes de usarla
-                                        fecha_formateada = formatear_fecha(fecha)
-
-                                        # Verificar y registrar la fecha formateada
-                                        if fecha_formateada:
-                                            logging.info(f"Fecha formateada: {fecha_formateada}")
-                                        else:
-                                            logging.error(
-                                                f"No se pudo formatear la fecha: {fecha}")
-                                        # Obtener la fecha actual
-                                        ahora = datetime.now()
-                                        año = ahora.strftime("%Y")
-                                        mes = ahora.strftime("%m")
-                                        dia = ahora.strftime("%d")
-
-                                        ruta_carpeta_log = os.path.join(
-                                            output_folder, str(nit_cliente ), año, mes, dia)
-
-                                        ##########################################################
-                                        # Construir la ruta del archivo PDF asociado al CUFE/CUDE
-                                        # \
-                                        pdf_folder = os.path.join(
-                                            config["paths"]["output"]
-                                        )
-                                        pdf_routes = os.path.join(
-                                            config["paths"]["pdf"],nit_cliente , f"{cufe}.pdf")
-                                        pdf_routes_json_path = os.path.join(
-                                            config["paths"]["config"], "pdf_routes.json")
-
-                                        if not os.path.isfile(pdf_routes):
-                                            logging.warning(
-                                                f"El archivo PDF no existe en la ruta: {pdf_routes}")
-                                            raise FileNotFoundError(
-                                                f"El archivo PDF no existe en la ruta: {pdf_routes}")
-
-                                        logging.info(f"Procesando archivo PDF: {pdf_routes}")
-
-                                        ###########################################################
-                                        # Ejecutar el script de manejo de PDFs
-                                        ###########################################################
-                                        script_pdf_path = os.path.join(
-                                            BASE_DIR,"src","main_pdf.py")
-                                        ejecutar_script_pdf(
-                                            script_pdf_path, pdf_routes_json_path, pdf_routes)
-                                        logging.info(
-                                            "Script de manejo de PDFs ejecutado correctamente.")
-
-                                        ###########################################################
-                                        # Cargar el archivo JSON con los datos extraídos de los PDFs
-                                        ###########################################################
-                                        json_datos_extraidos = os.path.join(
-                                            config["paths"]["config"], "datos_extraidos.json")
-                                        with open(json_datos_extraidos, "r", encoding="utf-8") as file:
-                                            datos_extraidos = json.load(file)
-                                        logging.info("Datos extraídos cargados correctamente.")
-
-                                        # Verificar si datos_extraidos es una lista y tiene al menos un elemento
-                                        if isinstance(datos_extraidos, list) and len(datos_extraidos) > 0:
-                                            # Acceder al primer elemento de la lista (que es un diccionario)
-                                            primer_elemento = datos_extraidos[0]
-
-                                            # Obtener la forma de pago (usando un valor predeterminado si la clave no existe)
-                                            forma_de_pago = primer_elemento.get(
-                                                "Forma de Pago", "Desconocido")
-                                            logging.info(f"Forma de pago: {forma_de_pago}")
-                                            valor = primer_elemento.get(
-                                                "Total Bruto Factura", "Desconocido")
-                                            logging.info(f"Total Bruto Factura: {valor}")
-                                        else:
-                                            logging.error(
-                                                "El archivo JSON no contiene una lista válida o está vacío.")
-                                            
-                                        ### ------------------apartado web-------------------------###
-
-                                        ###########################################################
-                                        # Ingresar los datos del cliente receptor en la aplicación web - 1
-                                        ###########################################################
-                                        if not ingresar_cliente(driver, nit_cliente , ingreso_realizado):
-                                            logging.warning(
-                                                "El ingreso ya se había realizado o hubo un error.")
-
-                                        logging.info(
-                                            "Ingreso del cliente realizado correctamente.")
-                                        ingreso_realizado = True
-
-                                        ########################################################
-                                        # función para saber si es una nota o un credito
-                                        ########################################################
-
-                                        # Llamamos a la función y almacenamos los resultados en variables específicas
-                                        contiene_nota_resultado, xpath_accion, mensaje_resultado = contiene_nota(
-                                            tipo_documento)
-
-                                        # Imprimimos los resultados
-                                        logging.info(
-                                            f"¿Contiene la palabra 'nota'? {contiene_nota_resultado}")
-                                        logging.info(f"Mensaje: {mensaje_resultado}")
-                                        # Tomamos decisiones basadas en el resultado booleano
-                                        if contiene_nota_resultado:
-                                            # Si contiene la palabra "nota", ejecutamos la función relacionada con Nota débito
-                                            accion_nota_debito(
-                                                driver, fecha_formateada, nit_tercero, xpath_accion, pdf_routes, ruta_carpeta_log)
-
-                                        else:
-                                            # El resto del código continúa normalmente
-                                            logging.info(
-                                                "El resto del código continúa su ejecución...")
-                                            print("Continuando con el flujo normal del programa...")
-
-                                            ###########################################################
-                                            # Crear factura de compra en la aplicación web -2
-                                            ###########################################################
-                                            crear_factura_compra(
-                                                driver, fecha_formateada, nit_tercero, xpath_accion,)
-                                            logging.info("Factura de compra creada correctamente.")
-
-                                            ###########################################################
-                                            # Registrar la cuenta en la aplicación web con los datos extraídos -3
-                                            ###########################################################
-                                            registrar_cuenta_en_web(
-                                                driver, datos_extraidos, nit_tercero, razon_social_vendedor)
-                                            logging.info(
-                                                "Cuenta registrada correctamente en la aplicación web.")
-
-                                            ###########################################################
-                                            # Ingresar datos de la factura en la aplicación web -4
-                                            ###########################################################
-                                            ingresar_datos_factura(
-                                                driver, prefijo, consecutivo, codigo_producto, nit_tercero, valor, iva, iva_cliente, centro_costo,valor_total,codigo_iva)
-                                            logging.info(
-                                                "Datos de la factura ingresados correctamente.")
-
-                                        ###########################################################
-                                        # Obtener y mover la factura generada -5
-                                        ###########################################################
-
-                                        numero_factura, resultado,output_pdf_path = obtener_y_mover_factura(
-                                            driver=driver,
-                                            output_folder=output_folder,
-                                            pdf_routes=pdf_routes,
-                                            razon_social_vendedor=razon_social_vendedor,
-                                            factura=factura,
-                                            ruta_carpeta_log=ruta_carpeta_log,
-                                        )
-
-                                        if resultado:
-                                            logging.info("La factura se procesó correctamente.")
-                                            estado_procesamiento = "Exitoso"
-                                            mensaje_error = ""
-                                            # Actualizar la columna 'PDF Generado' a 'Sí'
-                                            df.at[index, 'PDF Generado'] = 'Sí'
-                                            progreso['filas_procesadas'] += 1
-                                            # "Exitoso" o "Fallido"
-                                            df.at[index, 'Procesamiento Exitoso'] = 'Procesamiento Exitoso'
-                                            # Guardar el archivo Excel después de cada actualización
-                                            df.to_excel(
-                                                excel_routes["ruta_archivo.excel"], index=False)
-                                            logging.info(
-                                                f"Archivo Excel actualizado en: {excel_routes['ruta_archivo.excel']}")
-                                        else:
-                                            logging.error(" Hubo un error al procesar la factura.")
-                                            estado_procesamiento = "Fallido"
-                                            mensaje_error = "Error al procesar la factura"
-                                            raise Exception(mensaje_error)
-                                        # Variable que ya tienes
-                                        df.at[index, 'Forma de Pago'] = forma_de_pago
-                                        # Mensaje de error si falló
-                                        df.at[index, 'Mensaje Error'] = mensaje_error
-                                        # Nombre del PDF generado
-                                        df.at[index, 'Nombre PDF'] = numero_factura
-                                        
-                                        # Guardar el archivo Excel después de cada actualización
-                                        df.to_excel(
-                                            excel_routes["ruta_archivo.excel"], index=False)
-                                    except Exception as e:
-                                            logging.error(
-                                                f"Error al procesar la fila {index + 1}: {e}")
-                                            # Agregar los datos de la fila procesada al DataFrame de control con estado fallido
-                                            forma_de_pago = "null"
-                                            # Variable que ya tienes
-                                            df.at[index, 'Forma de Pago'] = forma_de_pago
-                                            # Mensaje de error si falló
-                                            df.at[index, 'Mensaje Error'] = str(e)
-                                            # Nombre del PDF generado
-                                            df.at[index, 'Nombre PDF'] = ""
-                                            # procesamiento no exitoso
-                                            df.at[index, 'Procesamiento Exitoso'] = "Fallido"
-                                            # Guardar el archivo Excel después de cada actualización
-                                            df.to_excel(
-                                                excel_routes["ruta_archivo.excel"], index=False)
-                                                                # Actualizar progreso después de cada lote
-                                                                
-                                progreso['ultimo_lote'] = lote_num
-                                with open(ARCHIVO_PROGRESO, 'w') as f:
-                                    json.dump(progreso, f)    
-                                
-                                # Guardar cambios en el Excel
-                                df.to_excel(ruta_archivo, index=False)
-                                logging.info(f"Progreso guardado. Lote {lote_num + 1} completado.")
-                                
-                                # Verificar si se completó todo
-                                if len(df[df['PDF Generado'] != 'Sí']) == 0:
-                                    todas_filas_procesadas = True
-                                    if os.path.exists(ARCHIVO_PROGRESO):
-                                        os.remove(ARCHIVO_PROGRESO)
-                                    logging.info("¡Todo el archivo Excel ha sido procesado con éxito!")
-                                else:
-                                    ###########################################################
-                                    # Esperar 5 minutos antes de la siguiente iteración
-                                    ###########################################################
-                                    logging.info("Esperando 5 minutos antes de la siguiente iteración...")
-                                    time.sleep(300)  # 300 segundos = 5 minutos         
-                                    
-                        except Exception as e:
-                            logging.error(f"Error durante la ejecución del lote: {str(e)}")
-                            if ejecuciones_realizadas == ejecuciones_maximas:
-                                logging.error("Se alcanzó el máximo de intentos. Abortando.")
-                                raise
-                    ###########################################################
-                    # Cerrar el navegador al finalizar
-                    ###########################################################
-                    if 'driver' in locals():
-                        driver.quit()
-                        logging.info("Navegador cerrado correctamente.")
-                except Exception as e:
-                    logging.error(f"Error en la ejecución principal: {e}")
-                        
-                # Enviar correo electrónico al finalizar
-                # Extraer la lista de correos electrónicos
-                correos = config.get("correos", [])
-                enviar_correos(nombre_archivo,correos)
-
-                # Mover y renombrar el archivo
-                shutil.move(excel_routes["ruta_archivo.excel"], f"{ruta_carpeta_log}/{nit_cliente}.xlsx")
-                logging.info(f"PDF movido a: {output_pdf_path}")
-                # 2. Proceso de consolidación mensual con logging
-                try:
-                    archivo_log = f"{ruta_carpeta_log}/{nit_cliente}.xlsx"
-                    df_nuevo = pd.read_excel(archivo_log)
-                    
-                    # Validación de estructura
-                    if 'Fecha Emisión' not in df_nuevo.columns:
-                        logging.warning("El archivo no contiene columna 'Fecha'. No se puede clasificar por mes.")
-                    else:
-                        fecha = pd.to_datetime(df_nuevo['Fecha'].iloc[0])
-                        nombre_mes = fecha.strftime("%Y-%m")
-                        archivo_mes = f"facturas_{nombre_mes}.xlsx"
-                        ruta_mes = os.path.join("facturas_mensuales", archivo_mes)
-                        
-                        # Crear directorio si no existe
-                        os.makedirs(os.path.dirname(ruta_mes), exist_ok=True)
-                        
-                        if os.path.exists(ruta_mes):
-                            df_existente = pd.read_excel(ruta_mes)
-                            
-                            df_final = pd.concat([df_existente, df_nuevo], ignore_index=True)
-                            logging.info(f"Archivo {archivo_mes} actualizado con {len(df_nuevo)} nuevos registros")
-                        else:
-                            df_final = df_nuevo
-                            logging.info(f"Archivo mensual {archivo_mes} creado con {len(df_nuevo)} registros")
-                        
-                        df_final.to_excel(ruta_mes, index=False)
-                        logging.info(f"Consolidación mensual completada: {ruta_mes}")
-
-                except Exception as e:
-                    logging.error(f"Error en consolidación mensual: {str(e)}", exc_info=True)
-                logging.info("Ejecución finalizada.")
-
-    except Exception as e:
-        logging.error(f"Error al procesar el archivo {ruta_archivo}: {e}")
\ No newline at end of file
+    # Caché persistente de los datos extraídos de los PDFs (por CUFE y hash del archivo);
+    # cada trabajador abre su propia conexión
+    cache_extraccion = CacheExtraccion(
+        os.path.join(config_folder, "cache_extraccion.sqlite"),
+        **config.get("cache_extraccion", {}))
+    cache_extraccion.purgar()
+    cache_extraccion.cerrar()
+
+    # Número de navegadores simultáneos (config["trabajadores"], opcional)
+    procesar_archivos(
+        carpeta, config, credenciales, config_clientes,
+        trabajadores=config.get("trabajadores", 1))
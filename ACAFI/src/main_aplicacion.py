@@ -1,18 +1,25 @@
 import pytesseract
-import subprocess
-from PIL import ImageGrab
 import pyautogui
 import time
+import logging
 import re
 import json
 import pandas as pd
 import os
 import shutil
-import pdfplumber  # Biblioteca para extraer texto de PDFs
+from main_pdf import extract_description_column  # Extracción de datos de PDFs
+from bitacora_filas import BitacoraFilas
+from indice_productos import cargar_indice_productos, aplicar_indice_productos
+from ocr_pantalla import LocalizadorBotones
+from vigilante_descargas import VigilanteDescargas
+from aplicacion_kontalid import AplicacionKontalid
 import win32com.client as win32  # Para enviar correos con Outlook
 from pathlib import Path
 
 
+# Los módulos del bot (KONTALID, OCR, descargas) informan su avance con logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
 # Retrocede un nivel desde la carpeta de scripts
 # Usar Path en lugar de os.path para la ruta raíz
 ruta_raiz = Path(__file__).parent.parent
@@ -34,6 +41,15 @@ destino = carpeta
 # Obtener la lista de documentos a excluir
 documentos_excluir = config.get("tipo_documento_excluir", [])
 
+# OCR de los botones de KONTALID limitado a regiones de la pantalla (config["ocr"],
+# opcional); las posiciones encontradas se guardan para las siguientes ejecuciones
+localizador = LocalizadorBotones(
+    config.get("ocr"), config_folder / "ocr_botones.json")
+# Detección de cada PDF descargado (config["descargas"], opcional: estabilidad, sondeo)
+vigilante = VigilanteDescargas(carpeta_descargas, **config.get("descargas", {}))
+# KONTALID Tools se abre una sola vez por corrida y se reutiliza entre archivos
+kontalid = AplicacionKontalid(localizador)
+
 # Validación de rutas (opcional)
 if config["validation"]["check_paths"]:
     for key, path in config["paths"].items():
@@ -165,10 +181,12 @@ while ejecuciones_realizadas < max_ejecuciones:
                 df = pd.read_excel(ruta_archivo, engine="openpyxl")
                 # Extrae el NIT (todo antes del primer '(', '_' o '.')
                 nit_receptor = re.split(r'[_(.]', nombre_archivo)[0]
-                # cargar el archivo excel que contiene la base de datos con los codigos de producto
+                # cargar el índice compilado de la base de datos con los codigos de producto
+                # (se recompila solo si cambia config/<nit>.xlsx)
                 bd_terceros_path = os.path.join(
                     config_folder, f"{nit_receptor}.xlsx")
-                df2 = pd.read_excel(bd_terceros_path)
+                indice_productos = cargar_indice_productos(
+                    bd_terceros_path, config_folder / "indices")
                 # Si las columnas "Procesado" e "Información PDF" no existen, las creamos
                 if columna_procesado not in df.columns:
                     # Por defecto, marcamos como no procesado
@@ -177,6 +195,13 @@ while ejecuciones_realizadas < max_ejecuciones:
                     # Columna vacía para la información del PDF
                     df[columna_info_pdf] = ""
 
+                # Bitácora append-only con el resultado de cada descarga; el Excel
+                # solo se reescribe al terminar el archivo
+                bitacora = BitacoraFilas(
+                    ruta_archivo, config_folder / "bitacoras", prefijo="descargas")
+                # Recuperar resultados que no alcanzaron a guardarse en el Excel
+                bitacora.aplicar(df)
+
                 # Verificar si todas las filas ya están procesadas
                 if all(df[columna_procesado] == "Sí"):
                     print(
@@ -184,12 +209,12 @@ while ejecuciones_realizadas < max_ejecuciones:
                     continue  # Saltar este archivo y continuar con el siguiente
 
                 # Filtrar filas que NO estén en la lista de exclusión
+                # (el índice se reinicia para que coincida con las filas del Excel guardado)
                 df = df[~df["Tipo de documento"].astype(
-                    str).str.strip().isin(documentos_excluir)]
+                    str).str.strip().isin(documentos_excluir)].reset_index(drop=True)
 
                 # Sobrescribir el archivo original con el filtrado sin índice
-                df.to_excel(
-                    ruta_archivo, index=False, engine="openpyxl")
+                bitacora.materializar(df)
 
                 # Guardar la ruta en un JSON
                 ruta_archivo_json = {"ruta_archivo.excel": ruta_archivo}
@@ -217,37 +242,9 @@ while ejecuciones_realizadas < max_ejecuciones:
                 df['codigo de producto'] = df['codigo de producto'].astype(str)
                 df['centro de costos'] = df['centro de costos'].astype(str)
 
-                # Convertir columnas relevantes de df2 a tipo str
-                df2['Nit emisor'] = df2['Nit emisor'].astype(str)
-                df2['Nombre del producto'] = df2['Nombre del producto'].astype(
-                    str)
-                df2['Código del Producto'] = df2['Código del Producto'].fillna(
-                    0).astype(float).astype(int).astype(str)  # Manejar NaN
-                df2['Centro de Costo'] = df2['Centro de Costo'].astype(str)
-
-                # Paso 2: Recorrer cada fila del archivo principal (df)
-                for indice, fila in df.iterrows():
-                    # Obtener el NIT Emisor de la fila actual
-                    nit_amisor = fila['NIT Emisor']
-                    bd_nit_emisor = df2['Nit emisor'].astype(
-                        str)  # Asegurar que el NIT en df2 sea str
-
-                    # Buscar coincidencias en el archivo de búsqueda (df2)
-                    coincidencias = df2[bd_nit_emisor == str(nit_amisor)]
-
-                    # Si hay coincidencias, extraer los datos necesarios y actualizar las columnas en df
-                    if not coincidencias.empty:
-                        # Tomar la primera coincidencia
-                        primera_coincidencia = coincidencias.iloc[0]
-                        df.at[indice, 'Nombre del producto'] = primera_coincidencia['Nombre del producto']
-                        # Ya es str
-                        df.at[indice, 'codigo de producto'] = primera_coincidencia['Código del Producto']
-                        df.at[indice, 'centro de costos'] = primera_coincidencia['Centro de Costo']
-                    else:
-                        # Si no hay coincidencias, asignar "sin coincidencia" y dejar las otras columnas en blanco
-                        df.at[indice, 'Nombre del producto'] = 'sin coincidencia'
-                        df.at[indice, 'codigo de producto'] = ''  # Ya es str
-                        df.at[indice, 'centro de costos'] = ''
+                # Paso 2: Asignar producto, código y centro de costo con un solo join por NIT Emisor
+                coincidencias = aplicar_indice_productos(df, indice_productos)
+                print(f"Filas con coincidencia en la base de terceros: {coincidencias}/{len(df)}")
 
                 # Paso 3: Verificar si la columna "CUFE/CUDE" existe
                 if 'CUFE/CUDE' in df.columns:
@@ -256,43 +253,14 @@ while ejecuciones_realizadas < max_ejecuciones:
                     print("La columna 'CUFE/CUDE' no existe en el DataFrame.")
 
                 # Paso 4: Guardar el DataFrame actualizado en un archivo Excel
-                # Usar index=False para evitar guardar el índice
-                df.to_excel(ruta_archivo, index=False)
+                bitacora.materializar(df)
                 # Verificar si la columna "CUFE/CUDE" existe en el archivo
                 if columna_a_iterar in df.columns:
-                    # Iniciar la aplicación que se usará para la automatización
-                    app_id = "shell:AppsFolder\\57778KONTALID.KONTALIDTools_1crwx9b2rpxma!com.embarcadero.KONTALIDTools"
-                    process = subprocess.Popen(
-                        ["explorer.exe", app_id], shell=True)
-
-                    # Esperar a que la aplicación se inicie
-                    time.sleep(5)
-
-                    # Capturar la pantalla y extraer texto con OCR
-                    screenshot = ImageGrab.grab()
-                    text = pytesseract.image_to_string(screenshot)
-
-                    # Buscar un texto específico en la pantalla
-                    search_text = "Documento"
-                    if search_text in text:
-                        print(
-                            "Texto encontrado. Haciendo clic en el área correspondiente...")
-                        data = pytesseract.image_to_data(
-                            screenshot, output_type=pytesseract.Output.DICT)
-
-                        for i, word in enumerate(data['text']):
-                            if word.strip() == search_text:
-                                x1, y1, x2, y2 = data['left'][i], data['top'][i], data['left'][i] + \
-                                    data['width'][i], data['top'][i] + \
-                                    data['height'][i]
-                                click_x = (x1 + x2) // 2
-                                click_y = (y1 + y2) // 2
-                                time.sleep(2)
-                                pyautogui.click(click_x, click_y)
-                                print(
-                                    f"Haciendo clic en ({click_x}, {click_y})")
-                                time.sleep(3)
-                                pyautogui.press('tab')
+                    # Abrir KONTALID Tools si hace falta (o reiniciarla si se colgó)
+                    # y dejar el foco en el campo de búsqueda
+                    if not kontalid.preparar_busqueda():
+                        print(f"KONTALID Tools no está lista. Saltando el archivo {archivo}...")
+                        continue
 
                     # Iterar sobre los valores de la columna del Excel
                     for index, row in df.iterrows():
@@ -312,64 +280,22 @@ while ejecuciones_realizadas < max_ejecuciones:
                         pyautogui.press('enter')
                         time.sleep(5)
 
-                        # Buscar el botón "Descargar" en pantalla
+                        # Buscar el botón "Descargar" en pantalla (posición guardada o
+                        # un OCR de su región) y hacer clic
                         search_text = "Descargar"
-                        text_found = False
-                        timeout = 30
-                        start_time = time.time()
-
-                        while not text_found:
-                            screenshot = ImageGrab.grab()
-                            text = pytesseract.image_to_string(screenshot)
-                            if search_text in text:
-                                text_found = True
-                                print(f"Texto '{search_text}' encontrado.")
-                            elif time.time() - start_time > timeout:
-                                print(
-                                    "Se alcanzó el tiempo de espera máximo sin encontrar el texto.")
-                                break
-                            else:
-                                print("Texto no encontrado, esperando...")
-                                time.sleep(1)
-
-                        if text_found:
-                            data = pytesseract.image_to_data(
-                                screenshot, output_type=pytesseract.Output.DICT)
-                            for i, word in enumerate(data['text']):
-                                if word.strip() == search_text:
-                                    time.sleep(2)
-                                    x1, y1 = data['left'][i], data['top'][i]
-                                    x2, y2 = x1 + \
-                                        data['width'][i], y1 + \
-                                        data['height'][i]
-                                    click_x = (x1 + x2) // 2
-                                    click_y = (y1 + y2) // 2
-                                    time.sleep(1)
-                                    pyautogui.click(click_x, click_y)
-                                    print(
-                                        f"Haciendo clic en ({click_x}, {click_y})")
-                                    time.sleep(2)
-                                    break
+                        # Foto de la carpeta de descargas: solo cuenta el PDF que llegue después del clic
+                        vigilante.marcar()
+                        posicion = localizador.hacer_clic(search_text, maximo=30)
+                        if posicion:
+                            print(f"Texto '{search_text}' encontrado. Haciendo clic en {posicion}")
                         else:
+                            print(
+                                "Se alcanzó el tiempo de espera máximo sin encontrar el texto.")
                             df.at[index, columna_procesado] = "No"
                             break
 
-                        # Esperar la descarga del archivo PDF
-                        tiempo_max_espera = 60
-                        tiempo_transcurrido = 0
-                        intervalo_espera = 2
-                        archivo_descargado = None
-                        intentos = 0
-                        while tiempo_transcurrido < tiempo_max_espera:
-                            archivos = [os.path.join(carpeta_descargas, archivo) for archivo in os.listdir(
-                                carpeta_descargas) if archivo.endswith(".pdf")]
-                            if archivos:
-                                archivo_descargado = max(
-                                    archivos, key=os.path.getmtime)
-                                break
-                            time.sleep(intervalo_espera)
-                            tiempo_transcurrido += intervalo_espera
-                        time.sleep(2)
+                        # Esperar a que el PDF de este CUFE termine de escribirse
+                        archivo_descargado = vigilante.esperar(valor, maximo=60)
 
                         # Mover el archivo descargado a la carpeta destino
                         if archivo_descargado:
@@ -414,55 +340,27 @@ while ejecuciones_realizadas < max_ejecuciones:
 
                         # Extraer información del PDF
                         try:
-                            with pdfplumber.open(destino_final) as pdf:
-                                descripcion = ""  # Variable para almacenar la descripción encontrada
-                                for page in pdf.pages:
-                                    tables = page.extract_tables()  # Extraer todas las tablas de la página
-                                    for table in tables:
-                                        # Verificar que la tabla no esté vacía y tenga al menos 2 filas
-                                        if table and len(table) > 1:
-                                            # Buscar la columna que contiene "descri" en los encabezados (segunda fila)
-                                            encabezados = table[1]
-                                            columna_descripcion = None
-                                            for i, encabezado in enumerate(encabezados):
-                                                if encabezado and "descri" in encabezado.lower():
-                                                    columna_descripcion = i
-                                                    print(
-                                                        f"Columna 'Descripción' encontrada en el índice: {columna_descripcion}")
-                                                    break
-
-                                            # Si se encontró la columna, buscar el valor en las filas siguientes
-                                            if columna_descripcion is not None:
-                                                # Ignorar las filas de encabezados
-                                                for row in table[2:]:
-                                                    if len(row) > columna_descripcion and row[columna_descripcion]:
-                                                        # Unir las líneas de la descripción si está dividida
-                                                        descripcion = " ".join(
-                                                            str(row[columna_descripcion]).split("\n"))
-                                                        print(
-                                                            f"Descripción extraída: {descripcion}")
-                                                        break
-                                                if descripcion:
-                                                    break  # Salir del bucle si se encontró la descripción
-                                        if descripcion:
-                                            break  # Salir del bucle de páginas si se encontró la descripción
-
-                                # Mostrar la descripción encontrada
-                                if descripcion:
-                                    print(
-                                        f"Descripción encontrada: {descripcion}")
-                                else:
-                                    print(
-                                        "No se encontró la columna 'Descripción' o variantes en el PDF.")
-
-                                # Guardar la información en la nueva columna
-                                df.at[index, columna_info_pdf] = descripcion if descripcion else "Descripción no encontrada"
+                            descripcion = extract_description_column(destino_final)
+
+                            # Mostrar la descripción encontrada
+                            if descripcion:
+                                print(
+                                    f"Descripción encontrada: {descripcion}")
+                            else:
+                                print(
+                                    "No se encontró la columna 'Descripción' o variantes en el PDF.")
+
+                            # Guardar la información en la nueva columna
+                            df.at[index, columna_info_pdf] = descripcion if descripcion else "Descripción no encontrada"
                         except Exception as e:
                             print(f"Error al extraer información del PDF: {e}")
                             df.at[index, columna_info_pdf] = "Error al extraer información"
 
-                        # Guardar el DataFrame actualizado en el archivo Excel
-                        df.to_excel(ruta_archivo, index=False)
+                        # Registrar el resultado de la fila en la bitácora
+                        bitacora.registrar(index, {
+                            columna_procesado: df.at[index, columna_procesado],
+                            columna_info_pdf: df.at[index, columna_info_pdf],
+                        })
 
                         # Salir del modo de descarga y limpiar la barra de búsqueda
                         pyautogui.press('esc')
@@ -472,12 +370,10 @@ while ejecuciones_realizadas < max_ejecuciones:
                         # Simula la pulsación de la tecla Delete
                         pyautogui.press('delete')
 
-                    # Cerrar la aplicación después de procesar el archivo
-                    app_name = "KONTALIDTools.exe"  # Reemplaza con el nombre real del ejecutable
-                    subprocess.run(
-                        ["taskkill", "/f", "/im", app_name], shell=True)
-                    print(
-                        f"La aplicación se ha cerrado después de procesar el archivo: {archivo}")
+                    # Materializar el Excel a partir de la bitácora al terminar el archivo
+                    bitacora.materializar(df)
+
+                    print(f"Archivo procesado: {archivo}")
                 else:
                     print(
                         f"La columna '{columna_a_iterar}' no existe en el archivo.")
@@ -495,11 +391,8 @@ while ejecuciones_realizadas < max_ejecuciones:
 
     except Exception as e:
         print(f"Ocurrió un error al procesar el archivo: {e}")
-        # Cerrar la aplicación después de procesar el archivo
-        app_name = "KONTALIDTools.exe"  # Reemplaza con el nombre real del ejecutable
-        subprocess.run(
-            ["taskkill", "/f", "/im", app_name], shell=True)
-        print(
-            f"La aplicación se ha cerrado después de procesar el archivo: {archivo}")
+        # La aplicación sigue abierta; el siguiente archivo la reinicia solo si se colgó
 
+# Cerrar la aplicación al terminar la corrida
+kontalid.cerrar()
 print("El bot ha finalizado.")
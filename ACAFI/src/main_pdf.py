@@ -1,70 +1,119 @@
 import os
+import sys
 import json
+import logging
 import pdfplumber
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+
+class DocumentoPDF:
+    """
+    PDF abierto una sola vez y compartido por todos los extractores.
+
+    El texto y las tablas se extraen por página solo cuando se piden y se
+    guardan como cadenas; la caché de objetos de pdfplumber de cada página se
+    libera apenas se lee. Se puede usar como context manager (anidable): el
+    archivo se cierra al salir del bloque más externo, pero lo ya extraído
+    sigue disponible sin volver a abrirlo.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._pdf = None
+        self._aperturas = 0
+        self._num_paginas = None
+        self._textos = {}
+        self._tablas = {}
+
+    def __enter__(self):
+        if self._pdf is None:
+            self._pdf = pdfplumber.open(self.ruta)
+            self._num_paginas = len(self._pdf.pages)
+        self._aperturas += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._aperturas -= 1
+        if self._aperturas <= 0:
+            self.cerrar()
+        return False
+
+    def cerrar(self):
+        """Cierra el archivo (necesario antes de mover el PDF en Windows)."""
+        self._aperturas = 0
+        if self._pdf is not None:
+            self._pdf.close()
+            self._pdf = None
+
+    @property
+    def num_paginas(self):
+        if self._num_paginas is None:
+            with self:
+                pass
+        return self._num_paginas
+
+    def leer_pagina(self, numero, tablas=False):
+        """
+        Extrae el texto (y opcionalmente las tablas) de una página en una sola
+        lectura y libera la caché de la página.
+        """
+        if numero in self._textos and (not tablas or numero in self._tablas):
+            return
+        with self:
+            pagina = self._pdf.pages[numero]
+            if numero not in self._textos:
+                self._textos[numero] = pagina.extract_text() or ""
+            if tablas and numero not in self._tablas:
+                self._tablas[numero] = pagina.extract_tables()
+            pagina.flush_cache()
+
+    def texto_pagina(self, numero):
+        self.leer_pagina(numero)
+        return self._textos[numero]
+
+    def tablas_pagina(self, numero):
+        self.leer_pagina(numero, tablas=True)
+        return self._tablas[numero]
+
+    def paginas(self):
+        return range(self.num_paginas)
+
+
+def abrir_documento(fuente):
+    """Devuelve un DocumentoPDF para una ruta, o el mismo documento si ya lo es."""
+    if isinstance(fuente, DocumentoPDF):
+        return fuente
+    return DocumentoPDF(fuente)
 
 
 def extract_vendor_info(text):
-    vendor_info = {
-        "Tipo de contribuyente": None,
-        "Departamento": None,
-        "Régimen fiscal": None
-    }
-
-    vendor_section = re.search(
-        r"Datos del (Emisor / Vendedor|vendedor)(.*?)(Datos del Adquiriente / Comprador|$)",
-        text,
-        re.DOTALL | re.IGNORECASE,
-    )
-    if vendor_section:
-        vendor_text = vendor_section.group(2)
-        lines = vendor_text.split("\n")
-        for line in lines:
-            if re.search(r"tipo\s*de\s*contribuyente", line, re.IGNORECASE):
-                parts = re.split(r":\s*", line, maxsplit=1)
-                if len(parts) > 1:
-                    tipo_contribuyente = parts[1].strip()
-                    if re.search(r"natural", tipo_contribuyente, re.IGNORECASE):
-                        vendor_info["Tipo de contribuyente"] = "Persona Natural"
-                    elif re.search(r"jur[ií]dica", tipo_contribuyente, re.IGNORECASE):
-                        vendor_info["Tipo de contribuyente"] = "Persona Jurídica"
-                    else:
-                        vendor_info["Tipo de contribuyente"] = tipo_contribuyente
-
-            if re.search(r"departamento", line, re.IGNORECASE):
-                parts = re.split(r":\s*", line, maxsplit=1)
-                if len(parts) > 1:
-                    vendor_info["Departamento"] = parts[1].strip()
-
-            if re.search(r"r[eé]g[ií]men\s*(f[ií]scal|tributario)?", line, re.IGNORECASE):
-                parts = re.split(r":\s*", line, maxsplit=1)
-                if len(parts) > 1:
-                    regimen_fiscal = parts[1].strip()
-                    match = re.search(
-                        r"([A-Za-z]-\d+(-[A-Za-z]+)?)", regimen_fiscal)
-                    if match:
-                        vendor_info["Régimen fiscal"] = match.group(1)
-                    else:
-                        vendor_info["Régimen fiscal"] = regimen_fiscal
-    return vendor_info
+    """Tipo de contribuyente, departamento y régimen fiscal de la sección del vendedor."""
+    return MOTOR_CAMPOS.extraer(text, (CAMPO_VENDEDOR,))[CAMPO_VENDEDOR]
 
 
 def extract_payment_method(text):
-    match = re.search(r"Forma de pago:\s*(.*)\n", text, re.IGNORECASE)
-    return match.group(1).strip() if match else None
+    return MOTOR_CAMPOS.extraer(text, (CAMPO_FORMA_PAGO,))[CAMPO_FORMA_PAGO]
+
+
+def _descripcion_en_tablas(tables):
+    for table in tables:
+        for row in table:
+            if row and len(row) > 2:
+                if row[2] and "Descri" in row[2]:
+                    description_index = table.index(row) + 1
+                    if description_index < len(table):
+                        return table[description_index][2]
+    return None
 
 
 def extract_product_description(pdf_path):
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            tables = page.extract_tables()
-            for table in tables:
-                for row in table:
-                    if row and len(row) > 2:
-                        if row[2] and "Descri" in row[2]:
-                            description_index = table.index(row) + 1
-                            if description_index < len(table):
-                                return table[description_index][2]
+    documento = abrir_documento(pdf_path)
+    with documento:
+        for numero in documento.paginas():
+            descripcion = _descripcion_en_tablas(documento.tablas_pagina(numero))
+            if descripcion is not None:
+                return descripcion
     return None
 
 
@@ -72,56 +121,413 @@ def extract_total_bruto_factura(text):
     """
     Extrae el valor de "Total Bruto Factura" del texto del PDF.
     """
-    total_bruto_match = re.search(
-        r"Total Bruto Factura\s*([\d.,]+)", text, re.IGNORECASE
-    )
-    if total_bruto_match:
-        return total_bruto_match.group(1).replace(".", "").replace(",", ".")
+    return MOTOR_CAMPOS.extraer(text, (CAMPO_TOTAL_BRUTO,))[CAMPO_TOTAL_BRUTO]
+
+
+def extract_reference_invoice(pdf_path, campo_fijo="Factura Electrónica", lineas_a_ignorar=2):
+    """
+    Busca en el PDF de una nota el número de la factura electrónica que referencia.
+
+    Parámetros:
+    - pdf_path: Ruta del PDF de la nota o DocumentoPDF ya abierto.
+    - campo_fijo: Texto fijo que antecede al número de factura.
+    - lineas_a_ignorar: Número de líneas del banner que se ignoran en cada página.
+
+    Retorno:
+    - str: Primer valor a la derecha del campo fijo, o None si no se encontró.
+    """
+    documento = abrir_documento(pdf_path)
+    with documento:
+        for numero_pagina in documento.paginas():
+            texto_pagina = documento.texto_pagina(numero_pagina)
+            if campo_fijo not in texto_pagina:
+                continue
+            for linea in texto_pagina.split("\n")[lineas_a_ignorar:]:
+                if campo_fijo in linea:
+                    partes = linea.split(campo_fijo)
+                    if len(partes) > 1 and partes[1].strip():
+                        valor = partes[1].strip().split()[0]
+                        logging.debug(
+                            f"Factura referenciada {valor} en la página {numero_pagina + 1}.")
+                        return valor
+                    break
     return None
 
 
-def process_pdf(pdf_file_path):
-    with pdfplumber.open(pdf_file_path) as pdf:
-        text = "".join(page.extract_text() or "" for page in pdf.pages)
+def extract_description_column(pdf_path):
+    """
+    Extrae la descripción del primer ítem buscando la columna cuyo encabezado
+    (segunda fila de la tabla) contiene "descri".
+
+    Retorno:
+    - str: Descripción con los saltos de línea unidos, o None si no se encontró.
+    """
+    documento = abrir_documento(pdf_path)
+    with documento:
+        for numero in documento.paginas():
+            for table in documento.tablas_pagina(numero):
+                if not table or len(table) <= 1:
+                    continue
+                columna_descripcion = None
+                for i, encabezado in enumerate(table[1]):
+                    if encabezado and "descri" in encabezado.lower():
+                        columna_descripcion = i
+                        break
+                if columna_descripcion is None:
+                    continue
+                for row in table[2:]:
+                    if len(row) > columna_descripcion and row[columna_descripcion]:
+                        return " ".join(str(row[columna_descripcion]).split("\n"))
+    return None
+
+
+# Claves de los datos extraídos (las mismas que se guardan en datos_extraidos.json)
+CAMPO_VENDEDOR = "Información del vendedor"
+CAMPO_FORMA_PAGO = "Forma de Pago"
+CAMPO_DESCRIPCION = "Descripción del producto"
+CAMPO_TOTAL_BRUTO = "Total Bruto Factura"
+CAMPO_NIT_EMISOR = "NIT Emisor"
+CAMPO_FECHA_EMISION = "Fecha de Emisión"
+CAMPO_TOTAL_IVA = "Total IVA"
+
+# Versión de lo que retorna process_pdf. Se sube cuando cambian los campos o cómo
+# se extraen; las entradas de la caché de extracción de otra versión no se usan.
+VERSION_EXTRACCION = 3
+
+
+def _tipo_contribuyente(valor):
+    if re.search(r"natural", valor, re.IGNORECASE):
+        return "Persona Natural"
+    if re.search(r"jur[ií]dica", valor, re.IGNORECASE):
+        return "Persona Jurídica"
+    return valor
+
+
+def _codigo_regimen(valor):
+    match = re.search(r"([A-Za-z]-\d+(-[A-Za-z]+)?)", valor)
+    return match.group(1) if match else valor
+
+
+def _valor_moneda(valor):
+    # 1.234.567,89 -> 1234567.89
+    return valor.replace(".", "").replace(",", ".")
+
+
+def _nit(valor):
+    # 900.123.456-7 -> 900123456 (sin dígito de verificación)
+    return valor.split("-")[0].replace(".", "")
+
+
+def _fecha(valor):
+    # 2025-01-15 -> 15/01/2025; las fechas dd/mm/aaaa o dd-mm-aaaa se dejan con "/"
+    partes = re.split(r"[/-]", valor)
+    if len(partes[0]) == 4:
+        partes.reverse()
+    return "/".join(parte.zfill(2) for parte in partes)
+
+
+# Secciones del texto de la factura: patrón del encabezado con el que empiezan
+SECCIONES_TEXTO = {
+    "vendedor": r"Datos del (?:Emisor / Vendedor|vendedor)",
+    "comprador": r"Datos del Adquiriente / Comprador",
+}
+
+# Valor en el resto de la línea, después de los dos puntos que siguen a la etiqueta
+VALOR_EN_LINEA = r"[^:\n]*:[ \t]*(?P<valor>[^\n]*)"
+# Primer monto que no es un porcentaje: en "IVA 19% 38.000,00" o "IVA (19%) 38.000,00"
+# se salta la tarifa y se toma 38.000,00
+VALOR_MONEDA = r"(?:[^\d\n]|\d[\d.,]*[ \t]*%)*?(?P<valor>\d[\d.,]*)(?![\d.,]*[ \t]*%)"
 
-    vendor_info = extract_vendor_info(text)
-    payment_method = extract_payment_method(text)
-    product_description = extract_product_description(pdf_file_path)
-    total_bruto_factura = extract_total_bruto_factura(text)
+# Campos que se extraen del texto en una sola pasada. Cada campo declara:
+#   destino: clave del resultado y, si va dentro de un grupo, la subclave
+#   seccion: sección donde debe estar la etiqueta (None: en cualquier parte)
+#   etiqueta: patrón de la etiqueta (debe empezar con una letra)
+#   valor: patrón de lo que sigue a la etiqueta, con el grupo (?P<valor>...)
+#   convertir: normalización del valor capturado (opcional)
+#   ultimo: si la etiqueta aparece varias veces en su sección gana la última, como
+#     en la lectura original de la sección del vendedor (opcional; por defecto gana
+#     la primera). El campo queda pendiente hasta que su sección termina.
+# Un campo nuevo es una entrada más: se compila en el mismo patrón y no agrega
+# otra pasada sobre el texto.
+CAMPOS_TEXTO = {
+    "tipo_contribuyente": {
+        "destino": (CAMPO_VENDEDOR, "Tipo de contribuyente"),
+        "seccion": "vendedor",
+        "etiqueta": r"tipo\s*de\s*contribuyente",
+        "valor": VALOR_EN_LINEA,
+        "convertir": _tipo_contribuyente,
+        "ultimo": True,
+    },
+    "departamento": {
+        "destino": (CAMPO_VENDEDOR, "Departamento"),
+        "seccion": "vendedor",
+        "etiqueta": r"departamento",
+        "valor": VALOR_EN_LINEA,
+        "ultimo": True,
+    },
+    "regimen_fiscal": {
+        "destino": (CAMPO_VENDEDOR, "Régimen fiscal"),
+        "seccion": "vendedor",
+        "etiqueta": r"r[eé]g[ií]men\s*(?:f[ií]scal|tributario)?",
+        "valor": VALOR_EN_LINEA,
+        "convertir": _codigo_regimen,
+        "ultimo": True,
+    },
+    "nit_emisor": {
+        "destino": (CAMPO_NIT_EMISOR,),
+        "seccion": "vendedor",
+        "etiqueta": r"\bnit\b",
+        "valor": r"[^:\n]*:[ \t]*(?P<valor>\d[\d.]*(?:-\d)?)",
+        "convertir": _nit,
+    },
+    "forma_de_pago": {
+        "destino": (CAMPO_FORMA_PAGO,),
+        "seccion": None,
+        "etiqueta": r"forma de pago:",
+        "valor": r"\s*(?P<valor>[^\n]*)",
+    },
+    "fecha_emision": {
+        "destino": (CAMPO_FECHA_EMISION,),
+        "seccion": None,
+        "etiqueta": r"fecha\s*(?:de\s*)?emisi[oó]n",
+        "valor": r"[^:\n]*:[ \t]*(?P<valor>\d{1,4}[/-]\d{1,2}[/-]\d{1,4})",
+        "convertir": _fecha,
+    },
+    "total_bruto": {
+        "destino": (CAMPO_TOTAL_BRUTO,),
+        "seccion": None,
+        "etiqueta": r"total bruto factura",
+        "valor": r"\s*(?P<valor>[\d.,]+)",
+        "convertir": _valor_moneda,
+    },
+    "total_iva": {
+        "destino": (CAMPO_TOTAL_IVA,),
+        "seccion": None,
+        # Línea de totales que empieza con IVA (no la columna IVA de los ítems)
+        "etiqueta": r"^[ \t]*(?:total[ \t]+)?iva\b",
+        "valor": VALOR_MONEDA,
+        "convertir": _valor_moneda,
+    },
+}
 
-    extracted_data = {
-        "Archivo": pdf_file_path,
-        "Información del vendedor": vendor_info,
-        "Forma de Pago": payment_method,
-        "Descripción del producto": product_description,
-        "Total Bruto Factura": total_bruto_factura  # Nuevo campo agregado
-    }
+
+class MotorCampos:
+    """
+    Extrae todos los campos de CAMPOS_TEXTO con un solo patrón compilado: las
+    etiquetas de todos los campos y los encabezados de sección son alternativas
+    de la misma expresión, que recorre el texto una sola vez.
+
+    Cada coincidencia consume solo la etiqueta (el valor se captura con un
+    lookahead), así que dos campos en la misma línea también se encuentran.
+    """
+
+    def __init__(self, campos=CAMPOS_TEXTO, secciones=SECCIONES_TEXTO):
+        self.campos = dict(campos)
+        self.secciones = dict(secciones)
+        alternativas = [
+            f"(?P<s{i}>{patron})" for i, patron in enumerate(self.secciones.values())]
+        for i, espec in enumerate(self.campos.values()):
+            valor = espec["valor"].replace("(?P<valor>", f"(?P<v{i}>")
+            alternativas.append(f"(?P<c{i}>{espec['etiqueta']})(?={valor})")
+        # Las etiquetas empiezan en el inicio de una palabra con una letra: probar
+        # eso primero evita intentar todas las alternativas en cada carácter
+        self.patron = re.compile(
+            r"\b(?=[^\W\d_])(?:" + "|".join(alternativas) + ")",
+            re.IGNORECASE | re.MULTILINE)
+        self._nombres_secciones = list(self.secciones)
+        self._nombres_campos = list(self.campos)
+
+    def escaneo(self, claves=None):
+        """EscaneoCampos para los campos cuyo destino está en claves (None: todos)."""
+        return EscaneoCampos(self, claves)
+
+    def extraer(self, texto, claves=None):
+        """Extrae los campos de un texto completo."""
+        escaneo = self.escaneo(claves)
+        escaneo.agregar(texto)
+        return escaneo.resultados()
+
+
+class EscaneoCampos:
+    """
+    Estado de una extracción que recibe el texto por partes (una página a la
+    vez). Un campo queda resuelto cuando se encuentra (o, si gana la última
+    etiqueta, cuando su sección termina) o cuando su sección ya terminó; con
+    todos resueltos no hace falta leer más páginas.
+    """
+
+    def __init__(self, motor, claves=None):
+        self.motor = motor
+        self.pendientes = {
+            nombre for nombre, espec in motor.campos.items()
+            if claves is None or espec["destino"][0] in claves}
+        self.claves = claves
+        self.valores = {}
+        self.seccion = None
+        self.secciones_cerradas = set()
+
+    @property
+    def completo(self):
+        return not self.pendientes
+
+    def agregar(self, texto):
+        motor = self.motor
+        for coincidencia in motor.patron.finditer(texto):
+            if not self.pendientes:
+                break
+            grupo = coincidencia.lastgroup
+            indice = int(grupo[1:])
+            if grupo[0] == "s":
+                # Empieza otra sección: la anterior ya no puede aportar valores
+                if self.seccion is not None:
+                    self.secciones_cerradas.add(self.seccion)
+                self.seccion = motor._nombres_secciones[indice]
+                self._descartar_secciones_cerradas()
+                continue
+            nombre = motor._nombres_campos[indice]
+            espec = motor.campos[nombre]
+            if nombre not in self.pendientes or espec["seccion"] not in (None, self.seccion):
+                continue
+            valor = coincidencia.group(f"v{indice}").strip()
+            convertir = espec.get("convertir")
+            self.valores[nombre] = convertir(valor) if convertir else valor
+            if not espec.get("ultimo"):
+                self.pendientes.discard(nombre)
+
+    def _descartar_secciones_cerradas(self):
+        for nombre in list(self.pendientes):
+            if self.motor.campos[nombre]["seccion"] in self.secciones_cerradas:
+                self.pendientes.discard(nombre)
+
+    def resultados(self):
+        """Valores por clave de destino; los campos agrupados quedan en un dict."""
+        resultados = {}
+        for nombre, espec in self.motor.campos.items():
+            clave = espec["destino"][0]
+            if self.claves is not None and clave not in self.claves:
+                continue
+            valor = self.valores.get(nombre)
+            if len(espec["destino"]) > 1:
+                resultados.setdefault(clave, {})[espec["destino"][1]] = valor
+            else:
+                resultados[clave] = valor
+        return resultados
+
+
+# Patrón compilado una sola vez para todo el proceso
+MOTOR_CAMPOS = MotorCampos()
+
+CAMPOS_FACTURA = (CAMPO_VENDEDOR, CAMPO_FORMA_PAGO, CAMPO_DESCRIPCION, CAMPO_TOTAL_BRUTO,
+                  CAMPO_NIT_EMISOR, CAMPO_FECHA_EMISION, CAMPO_TOTAL_IVA)
+
+
+def process_pdf(pdf_file_path, campos=CAMPOS_FACTURA):
+    """
+    Extrae en el mismo proceso los campos de una factura PDF en una sola pasada.
+
+    Las páginas se leen en orden (texto y, mientras falte la descripción, tablas);
+    el texto de cada página se recorre una sola vez con MOTOR_CAMPOS y la lectura
+    se detiene en cuanto todos los campos pedidos están resueltos.
+
+    Parámetros:
+    - pdf_file_path: Ruta del PDF de la factura o DocumentoPDF compartido.
+    - campos: Campos a extraer (por defecto todos los de CAMPOS_FACTURA).
+
+    Retorno:
+    - dict: Datos extraídos con las mismas claves que se guardan en datos_extraidos.json.
+    """
+    documento = abrir_documento(pdf_file_path)
+    escaneo = MOTOR_CAMPOS.escaneo(campos)
+    buscar_descripcion = CAMPO_DESCRIPCION in campos
+    descripcion = None
+
+    with documento:
+        for numero in documento.paginas():
+            if escaneo.completo and not buscar_descripcion:
+                break
+
+            documento.leer_pagina(numero, tablas=buscar_descripcion)
+            escaneo.agregar(documento.texto_pagina(numero))
+
+            if buscar_descripcion:
+                descripcion = _descripcion_en_tablas(documento.tablas_pagina(numero))
+                if descripcion is not None:
+                    buscar_descripcion = False
+
+    resultados = escaneo.resultados()
+    resultados[CAMPO_DESCRIPCION] = descripcion
+    extracted_data = {"Archivo": documento.ruta}
+    extracted_data.update({campo: resultados.get(campo) for campo in campos})
     return extracted_data
 
 
-config_folder = r"C:\Users\santi\OneDrive\Escritorio\Swith_bots\Swith_bots\ACAFI\config"
-json_path = os.path.join(config_folder, 'pdf_routes.json')
-output_json_path = os.path.join(config_folder, 'datos_extraidos.json')
+def _process_pdf_seguro(pdf_file_path):
+    """Versión de process_pdf para los procesos del pool: nunca lanza excepciones."""
+    try:
+        return pdf_file_path, process_pdf(pdf_file_path), None
+    except Exception as e:
+        return pdf_file_path, None, f"{type(e).__name__}: {e}"
+
+
+def process_pdfs(pdf_file_paths, max_workers=None):
+    """
+    Ejecuta process_pdf sobre varios PDFs en un pool de procesos.
+
+    Parámetros:
+    - pdf_file_paths: Rutas de los PDFs a procesar.
+    - max_workers: Número de procesos (por defecto, los núcleos de la máquina).
+
+    Retorno:
+    - dict: {ruta: (datos_extraidos, error)}; datos_extraidos es None si hubo error.
+    """
+    pdf_file_paths = list(pdf_file_paths)
+    if not pdf_file_paths:
+        return {}
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(pdf_file_paths))
+    if max_workers == 1:
+        resultados = map(_process_pdf_seguro, pdf_file_paths)
+        return {ruta: (datos, error) for ruta, datos, error in resultados}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        resultados = executor.map(_process_pdf_seguro, pdf_file_paths)
+        return {ruta: (datos, error) for ruta, datos, error in resultados}
+
+
+def main(config_folder=None):
+    """
+    Punto de entrada por línea de comandos (compatibilidad con el flujo anterior):
+    lee las rutas de pdf_routes.json y guarda el resultado en datos_extraidos.json.
+    """
+    if config_folder is None:
+        config_folder = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "config")
+    json_path = os.path.join(config_folder, 'pdf_routes.json')
+    output_json_path = os.path.join(config_folder, 'datos_extraidos.json')
+
+    with open(json_path, 'r') as file:
+        pdf_routes = json.load(file)
+
+    pdf_file_paths = pdf_routes.get('path_pdf', [])
+    if isinstance(pdf_file_paths, str):
+        pdf_file_paths = [pdf_file_paths]
 
-with open(json_path, 'r') as file:
-    pdf_routes = json.load(file)
+    all_extracted_data = []
+    for pdf_file_path in pdf_file_paths:
+        if os.path.exists(pdf_file_path):
+            try:
+                extracted_data = process_pdf(pdf_file_path)
+                all_extracted_data.append(extracted_data)
+            except Exception as e:
+                print(f"Error al procesar el archivo {pdf_file_path}: {str(e)}")
+        else:
+            print(f"El archivo {pdf_file_path} no existe.")
 
-pdf_file_paths = pdf_routes.get('path_pdf', [])
-if isinstance(pdf_file_paths, str):
-    pdf_file_paths = [pdf_file_paths]
+    with open(output_json_path, 'w', encoding='utf-8') as output_file:
+        json.dump(all_extracted_data, output_file, ensure_ascii=False, indent=4)
 
-all_extracted_data = []
-for pdf_file_path in pdf_file_paths:
-    if os.path.exists(pdf_file_path):
-        try:
-            extracted_data = process_pdf(pdf_file_path)
-            all_extracted_data.append(extracted_data)
-        except Exception as e:
-            print(f"Error al procesar el archivo {pdf_file_path}: {str(e)}")
-    else:
-        print(f"El archivo {pdf_file_path} no existe.")
+    print(f"Datos extraídos guardados en {output_json_path}")
 
-with open(output_json_path, 'w', encoding='utf-8') as output_file:
-    json.dump(all_extracted_data, output_file, ensure_ascii=False, indent=4)
 
-print(f"Datos extraídos guardados en {output_json_path}")
\ No newline at end of file
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import logging
+import threading
+from datetime import datetime
+from contextlib import contextmanager
+
+from esperas import tiempos_hilo
+from estadisticas import percentil
+from registro_eventos import contexto_log
+
+# Todos los trabajadores agregan líneas al mismo archivo JSONL
+_candado_archivo = threading.Lock()
+
+
+class MetricasPasos:
+    """
+    Mide la duración de cada paso del procesamiento de un archivo Excel (login,
+    ingreso del cliente, extracción de PDFs, pasos web de cada factura y
+    guardados del Excel) y la registra, una línea por paso, en un archivo JSONL.
+
+    Cada medición incluye, además de la duración total, cuánto de ese tiempo se
+    pasó en esperas de condiciones de la política de esperas y cuánto en pausas
+    fijas (sleep), tomados de los contadores por hilo de esperas.py.
+
+    Parámetros:
+        ruta_jsonl (str): Archivo JSONL de métricas (se agregan líneas).
+        archivo (str): Nombre del Excel al que pertenecen las mediciones.
+    """
+
+    def __init__(self, ruta_jsonl, archivo):
+        self.ruta_jsonl = ruta_jsonl
+        self.archivo = archivo
+        self.mediciones = []
+        self.facturas = []
+        self._inicio = time.perf_counter()
+        self._espera_inicial, self._pausa_inicial = tiempos_hilo()
+        carpeta = os.path.dirname(ruta_jsonl)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+    @contextmanager
+    def paso(self, nombre, cufe=None, fila=None, **datos):
+        """
+        Mide el bloque como el paso indicado. La medición se registra también si
+        el bloque lanza una excepción (con "ok": false) y la excepción se propaga.
+        Los mensajes de log emitidos dentro del bloque llevan el nombre del paso.
+        """
+        espera_inicial, pausa_inicial = tiempos_hilo()
+        inicio = time.perf_counter()
+        ok = False
+        try:
+            with contexto_log(paso=nombre):
+                yield
+            ok = True
+        finally:
+            espera, pausa = tiempos_hilo()
+            self._registrar({
+                "paso": nombre,
+                "cufe": cufe,
+                "fila": fila,
+                "segundos": round(time.perf_counter() - inicio, 4),
+                "espera": round(espera - espera_inicial, 4),
+                "pausa": round(pausa - pausa_inicial, 4),
+                "ok": ok,
+                **datos,
+            })
+
+    def factura(self, cufe, fila, exitosa, segundos):
+        """
+        Registra el resultado completo de una factura (todos sus pasos web) y lo
+        escribe en el log como el registro de resumen de la fila, el único INFO
+        de la fila que queda con el nivel de detalle "produccion".
+        """
+        self.facturas.append(exitosa)
+        logging.info(
+            f"Factura {cufe} {'exitosa' if exitosa else 'fallida'} en {segundos:.1f} s.",
+            extra={"resumen": True})
+        self._registrar({
+            "paso": "factura",
+            "cufe": cufe,
+            "fila": fila,
+            "segundos": round(segundos, 4),
+            "ok": exitosa,
+        })
+
+    def _registrar(self, medicion):
+        medicion = {
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+            "archivo": self.archivo,
+            "hilo": threading.current_thread().name,
+            **medicion,
+        }
+        if medicion["paso"] != "factura":
+            self.mediciones.append(medicion)
+        with _candado_archivo:
+            try:
+                with open(self.ruta_jsonl, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(medicion, ensure_ascii=False, default=str) + "\n")
+            except OSError as e:
+                logging.warning(f"No se pudo escribir la métrica en {self.ruta_jsonl}: {e}")
+
+    def resumen(self):
+        """
+        Resumen del archivo: p50/p95 por paso, parte del tiempo total en pausas
+        fijas y en esperas de condiciones, y facturas exitosas por hora.
+        """
+        total = time.perf_counter() - self._inicio
+        espera, pausa = tiempos_hilo()
+        espera -= self._espera_inicial
+        pausa -= self._pausa_inicial
+
+        duraciones = {}
+        for medicion in self.mediciones:
+            duraciones.setdefault(medicion["paso"], []).append(medicion["segundos"])
+        pasos = {
+            nombre: {
+                "n": len(valores),
+                "p50": percentil(valores, 50),
+                "p95": percentil(valores, 95),
+                "total": round(sum(valores), 2),
+            }
+            for nombre, valores in duraciones.items()
+        }
+        exitosas = sum(1 for exitosa in self.facturas if exitosa)
+        return {
+            "archivo": self.archivo,
+            "segundos": round(total, 2),
+            "pasos": pasos,
+            "pausas_s": round(pausa, 2),
+            "esperas_s": round(espera, 2),
+            "pausas_pct": round(pausa / total * 100, 1) if total > 0 else 0.0,
+            "esperas_pct": round(espera / total * 100, 1) if total > 0 else 0.0,
+            "facturas": len(self.facturas),
+            "facturas_exitosas": exitosas,
+            "facturas_por_hora": round(exitosas * 3600 / total, 1) if total > 0 else 0.0,
+        }
+
+    def texto_resumen(self):
+        """Resumen en líneas de texto para el log."""
+        resumen = self.resumen()
+        lineas = [f"Métricas de {resumen['archivo']} ({resumen['segundos']:.0f} s):"]
+        for nombre, paso in resumen["pasos"].items():
+            lineas.append(
+                f"  {nombre}: n={paso['n']} p50={paso['p50']:.2f} s "
+                f"p95={paso['p95']:.2f} s total={paso['total']:.1f} s")
+        lineas.append(
+            f"  Pausas fijas {resumen['pausas_s']:.1f} s ({resumen['pausas_pct']:.1f} %), "
+            f"esperas de condiciones {resumen['esperas_s']:.1f} s ({resumen['esperas_pct']:.1f} %).")
+        lineas.append(
+            f"  Facturas: {resumen['facturas_exitosas']}/{resumen['facturas']} exitosas, "
+            f"{resumen['facturas_por_hora']:.1f} por hora.")
+        return "\n".join(lineas)
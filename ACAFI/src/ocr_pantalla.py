@@ -0,0 +1,190 @@
+import os
+import json
+import time
+import pytesseract
+import pyautogui
+from PIL import Image, ImageChops, ImageGrab, ImageStat
+
+# Parámetros por defecto de config["ocr"]:
+#   regiones: {texto: [izquierda, arriba, derecha, abajo]} en píxeles de pantalla
+#             donde se busca cada botón (sin región: pantalla completa)
+#   escala: factor de reducción de la captura antes del OCR (1 = sin reducir)
+#   tesseract_config: opciones de Tesseract (psm 11: texto disperso, como una interfaz)
+#   sondeo: cada cuánto se verifica el botón guardado con la comparación de píxeles (s)
+#   intervalo_ocr: cada cuánto se repite el OCR mientras el botón no aparece (s)
+#   tolerancia: diferencia media de gris (0-255) aceptada en la comparación de píxeles
+OCR_POR_DEFECTO = {
+    "regiones": {},
+    "escala": 0.75,
+    "tesseract_config": "--psm 11",
+    "sondeo": 0.25,
+    "intervalo_ocr": 1.0,
+    "tolerancia": 12,
+}
+
+
+def preprocesar(imagen, escala=1.0):
+    """Escala de grises y reducción de la captura para que Tesseract procese menos píxeles."""
+    imagen = imagen.convert("L")
+    if escala and escala != 1:
+        ancho, alto = imagen.size
+        imagen = imagen.resize(
+            (max(int(ancho * escala), 1), max(int(alto * escala), 1)), Image.LANCZOS)
+    return imagen
+
+
+def buscar_palabras(imagen, textos, escala=1.0, desplazamiento=(0, 0), config=""):
+    """
+    Ejecuta Tesseract una sola vez (image_to_data, con las cajas de cada palabra)
+    y retorna {texto: (izquierda, arriba, derecha, abajo)} en coordenadas de
+    pantalla para los textos encontrados (la primera aparición de cada uno).
+    """
+    datos = pytesseract.image_to_data(
+        preprocesar(imagen, escala), config=config, output_type=pytesseract.Output.DICT)
+    x0, y0 = desplazamiento
+    cajas = {}
+    for i, palabra in enumerate(datos["text"]):
+        palabra = palabra.strip()
+        if palabra in textos and palabra not in cajas:
+            izquierda = x0 + int(datos["left"][i] / escala)
+            arriba = y0 + int(datos["top"][i] / escala)
+            cajas[palabra] = (
+                izquierda, arriba,
+                izquierda + int(datos["width"][i] / escala),
+                arriba + int(datos["height"][i] / escala))
+    return cajas
+
+
+class LocalizadorBotones:
+    """
+    Encuentra botones de KONTALID por su texto con OCR limitado a una región
+    de la pantalla y guarda su posición para las siguientes filas.
+
+    Una vez encontrado un botón se guarda la caja de su texto y una muestra en
+    gris de esos píxeles (en memoria y en ruta_cache). Las siguientes búsquedas
+    solo capturan esa caja y la comparan con la muestra; el OCR se repite solo
+    si la comparación falla (el botón no está visible o la ventana se movió).
+
+    Parámetros:
+        config_ocr (dict): config["ocr"] (ver OCR_POR_DEFECTO).
+        ruta_cache (str): Archivo JSON con las posiciones guardadas (opcional).
+    """
+
+    def __init__(self, config_ocr=None, ruta_cache=None):
+        valores = dict(OCR_POR_DEFECTO)
+        valores.update(config_ocr or {})
+        self.regiones = {texto: tuple(region) for texto, region in valores["regiones"].items()}
+        self.escala = float(valores["escala"])
+        self.tesseract_config = valores["tesseract_config"]
+        self.sondeo = float(valores["sondeo"])
+        self.intervalo_ocr = float(valores["intervalo_ocr"])
+        self.tolerancia = float(valores["tolerancia"])
+        self.ruta_cache = ruta_cache
+        self.botones = self._cargar_cache()
+
+    # ------------------------------------------------------------------
+    # Posiciones guardadas
+    # ------------------------------------------------------------------
+
+    def _cargar_cache(self):
+        if not self.ruta_cache or not os.path.exists(self.ruta_cache):
+            return {}
+        try:
+            with open(self.ruta_cache, "r", encoding="utf-8") as f:
+                guardado = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Las posiciones solo sirven con la misma resolución de pantalla
+        if guardado.get("pantalla") != list(pyautogui.size()):
+            return {}
+        return guardado.get("botones", {})
+
+    def _guardar_cache(self):
+        if not self.ruta_cache:
+            return
+        carpeta = os.path.dirname(self.ruta_cache)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with open(self.ruta_cache, "w", encoding="utf-8") as f:
+            json.dump({"pantalla": list(pyautogui.size()), "botones": self.botones}, f)
+
+    def _recordar(self, texto, caja):
+        muestra = ImageGrab.grab(bbox=caja).convert("L")
+        self.botones[texto] = {
+            "caja": list(caja), "tamano": list(muestra.size), "muestra": list(muestra.tobytes())}
+        self._guardar_cache()
+
+    def olvidar(self, texto):
+        """Descarta la posición guardada de un botón (p. ej. si el clic no tuvo efecto)."""
+        if self.botones.pop(texto, None) is not None:
+            self._guardar_cache()
+
+    def sigue_visible(self, texto):
+        """Comparación de píxeles: el botón guardado se ve igual que cuando se encontró."""
+        boton = self.botones.get(texto)
+        if boton is None:
+            return False
+        actual = ImageGrab.grab(bbox=tuple(boton["caja"])).convert("L")
+        if list(actual.size) != boton["tamano"]:
+            return False
+        muestra = Image.frombytes("L", actual.size, bytes(boton["muestra"]))
+        diferencia = ImageStat.Stat(ImageChops.difference(actual, muestra)).mean[0]
+        return diferencia <= self.tolerancia
+
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+
+    def buscar(self, texto):
+        """OCR de la región del texto; retorna la caja en pantalla o None."""
+        region = self.regiones.get(texto)
+        captura = ImageGrab.grab(bbox=region)
+        desplazamiento = region[:2] if region else (0, 0)
+        caja = buscar_palabras(
+            captura, {texto}, self.escala, desplazamiento, self.tesseract_config).get(texto)
+        if caja is not None:
+            self._recordar(texto, caja)
+        return caja
+
+    def esperar(self, texto, maximo=30):
+        """
+        Espera a que el botón esté en pantalla y retorna el centro (x, y) de su
+        texto, o None si no aparece dentro del máximo (s).
+
+        Con la posición guardada se sondea con la comparación de píxeles y el
+        OCR se repite cada intervalo_ocr por si la ventana cambió de lugar.
+        """
+        inicio = time.monotonic()
+        ultimo_ocr = None
+        while True:
+            if self.sigue_visible(texto):
+                return self.centro(texto)
+            ahora = time.monotonic()
+            if ultimo_ocr is None or ahora - ultimo_ocr >= self.intervalo_ocr:
+                ultimo_ocr = ahora
+                if self.buscar(texto) is not None:
+                    return self.centro(texto)
+            if time.monotonic() - inicio > maximo:
+                return None
+            time.sleep(self.sondeo if texto in self.botones else self.intervalo_ocr)
+
+    def centro(self, texto):
+        izquierda, arriba, derecha, abajo = self.botones[texto]["caja"]
+        return (izquierda + derecha) // 2, (arriba + abajo) // 2
+
+    def hacer_clic(self, texto, maximo=30):
+        """
+        Espera el botón y hace clic en el centro de su texto. El puntero vuelve a
+        su posición anterior para que el resaltado del botón no altere la
+        comparación de píxeles de la siguiente fila.
+
+        Retorno:
+            tuple: (x, y) del clic, o None si el botón no apareció.
+        """
+        posicion = self.esperar(texto, maximo)
+        if posicion is None:
+            return None
+        anterior = pyautogui.position()
+        pyautogui.click(*posicion)
+        pyautogui.moveTo(*anterior)
+        return posicion
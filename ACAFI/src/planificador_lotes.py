@@ -0,0 +1,72 @@
+import time
+import logging
+
+from esperas import pausar
+
+
+class PlanificadorLotes:
+    """
+    Decide cuánto esperar entre lotes de filas.
+
+    Mientras las filas se procesan sin errores se continúa de inmediato con el
+    siguiente lote. Solo después de un lote con filas fallidas se espera, con un
+    retroceso exponencial acotado (espera_inicial, espera_inicial * factor, ...
+    hasta espera_maxima) que se reinicia con el primer lote sin fallos. El tiempo
+    dormido se acumula aparte para poder ver su costo en el log.
+
+    Parámetros:
+        tamano_lote (int): Filas por lote (entre puntos de control del Excel).
+        espera_inicial (float): Espera tras el primer lote con fallos (s).
+        espera_maxima (float): Tope de la espera (s).
+        factor (float): Multiplicador de la espera por cada lote fallido seguido.
+    """
+
+    def __init__(self, tamano_lote=5, espera_inicial=30, espera_maxima=300, factor=2):
+        if int(tamano_lote) < 1:
+            raise ValueError(f"Tamaño de lote no válido: {tamano_lote}")
+        self.tamano_lote = int(tamano_lote)
+        self.espera_inicial = float(espera_inicial)
+        self.espera_maxima = float(espera_maxima)
+        self.factor = float(factor)
+        self.fallos_consecutivos = 0
+        self.tiempo_inactivo = 0.0
+        self.esperas_realizadas = 0
+        self._inicio = time.monotonic()
+
+    def registrar_lote(self, exitosas, fallidas):
+        """Registra el resultado de un lote y retorna la espera que corresponde (s)."""
+        if fallidas:
+            self.fallos_consecutivos += 1
+        else:
+            self.fallos_consecutivos = 0
+        espera = self.espera_siguiente()
+        logging.info(
+            f"Lote terminado: {exitosas} exitosas, {fallidas} fallidas; "
+            f"espera antes del siguiente lote: {espera:.0f} s.")
+        return espera
+
+    def espera_siguiente(self):
+        """Espera que corresponde según los lotes fallidos seguidos (0 si no hay)."""
+        if not self.fallos_consecutivos:
+            return 0.0
+        espera = self.espera_inicial * self.factor ** (self.fallos_consecutivos - 1)
+        return min(espera, self.espera_maxima)
+
+    def esperar(self):
+        """Duerme la espera que corresponde y la suma al tiempo inactivo."""
+        espera = self.espera_siguiente()
+        if espera <= 0:
+            return 0.0
+        logging.info(f"Esperando {espera:.0f} s antes del siguiente lote...")
+        pausar(espera)
+        self.tiempo_inactivo += espera
+        self.esperas_realizadas += 1
+        return espera
+
+    def resumen(self):
+        """Texto con el tiempo total y la parte que se pasó esperando entre lotes."""
+        total = time.monotonic() - self._inicio
+        porcentaje = (self.tiempo_inactivo / total * 100) if total > 0 else 0.0
+        return (
+            f"Tiempo total {total:.0f} s; inactivo entre lotes {self.tiempo_inactivo:.0f} s "
+            f"({porcentaje:.1f} %) en {self.esperas_realizadas} esperas.")
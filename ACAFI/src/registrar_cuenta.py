@@ -1,25 +1,39 @@
-import time
 import logging
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver import ActionChains
 from selenium.webdriver.common.keys import Keys
 from nameparser import HumanName
+from esperas import obtener_politica
 
-def registrar_cuenta_en_web(driver, datos_extraidos, nit_emisor, razon_social_vendedor):
+XPATH_MODAL_TERCERO = '//*[@class="modal-content"]'
+
+
+def registrar_cuenta_en_web(driver, datos_extraidos, nit_emisor, razon_social_vendedor,
+                            registro_terceros=None, empresa=None):
     """
     Función para registrar una cuenta en la aplicación web.
 
+    Si el tercero ya está en el registro de terceros de la empresa no se espera
+    el modal de creación. Si no está, se espera el modal: si aparece se crea el
+    tercero y si no aparece es porque Siigo ya lo tenía. En ambos casos queda
+    en el registro.
+
     Parámetros:
     - driver: Objeto de Selenium WebDriver.
     - datos_extraidos: Lista de diccionarios con los datos extraídos.
     - nit_emisor: NIT del emisor.
     - razon_social_vendedor: Razón social del vendedor.
+    - registro_terceros: RegistroTerceros con los terceros conocidos (opcional).
+    - empresa: NIT de la empresa de Siigo en la que se registra el tercero.
 
     Retorno:
     - None
     """
+    espera = obtener_politica()
+    tercero_conocido = (
+        registro_terceros is not None and registro_terceros.existe(empresa, nit_emisor))
+
     # Validar datos_extraidos
     if not datos_extraidos or not isinstance(datos_extraidos, list):
         logging.error("Datos extraídos no válidos o vacíos.")
@@ -43,30 +57,45 @@ def registrar_cuenta_en_web(driver, datos_extraidos, nit_emisor, razon_social_ve
             logging.error(f"Faltan datos obligatorios en el registro: {dato}")
             continue
 
+        if tercero_conocido:
+            # El modal solo aparece si Siigo no tiene el tercero
+            if not driver.find_elements(By.XPATH, XPATH_MODAL_TERCERO):
+                logging.info(f"El tercero {nit_emisor} ya existe; no es necesario crearlo.")
+                continue
+            logging.warning(
+                f"El tercero {nit_emisor} estaba en el registro pero Siigo pide crearlo.")
+            registro_terceros.olvidar(empresa, nit_emisor)
+        else:
+            # Esperar a que el modal esté presente en el DOM (si no aparece, Siigo ya tiene el tercero).
+            # El máximo es el de las esperas normales y no el de respaldo: un modal lento
+            # dejaría el tercero en el registro como existente sin haberlo creado
+            modal = espera.esperar_o_continuar(driver, EC.presence_of_element_located(
+                (By.XPATH, XPATH_MODAL_TERCERO)), maximo=espera.maximo,
+                descripcion="el modal de creación del tercero")
+            if modal is None:
+                logging.info("no es necesario crear un tercero")
+                if registro_terceros is not None:
+                    registro_terceros.registrar(empresa, nit_emisor, "busqueda")
+                continue
+
         try:
-            # Esperar a que el modal esté presente en el DOM
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '//*[@class="modal-content"]')))
             logging.info("Creando un nuevo usuario...")
 
             # Ingresar el tipo de contribuyente (Empresa o Persona Natural)
             try:
-                shadow_tipo = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "#CO-CL-MX > div > siigo-dropdownlist-web"))
-                )
+                shadow_tipo = espera.esperar(driver, EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "#CO-CL-MX > div > siigo-dropdownlist-web")))
                 shadow_tipo_contribuyente = shadow_tipo.shadow_root
 
                 # Hacer clic en el menú desplegable para abrirlo
                 dropdown = shadow_tipo_contribuyente.find_element(
                     By.CSS_SELECTOR, '.mdc-select')
                 dropdown.click()
-                time.sleep(1)  # Esperar a que el menú se abra
 
-                # Seleccionar la opción correcta según el tipo de contribuyente
-                opciones = shadow_tipo_contribuyente.find_elements(
-                    By.CSS_SELECTOR, 'span.mdc-list-item__text')
+                # Esperar a que el menú se abra y muestre sus opciones
+                opciones = espera.esperar(
+                    driver, lambda d: shadow_tipo_contribuyente.find_elements(
+                        By.CSS_SELECTOR, 'span.mdc-list-item__text'))
                 for opcion in opciones:
                     if tipo_contribuyente == "Persona Jurídica" and "Empresa" in opcion.text:
                         nombre_selector = "#MX_MR_EX-CO_E-1 > div > siigo-textfield-web"
@@ -76,15 +105,13 @@ def registrar_cuenta_en_web(driver, datos_extraidos, nit_emisor, razon_social_ve
                         nombre_selector = "#MX_FS-CO_P-1 > div > siigo-textfield-web"
                         nombre_completo = razon_social_vendedor
                         nombre = HumanName(nombre_completo)
-                        print("Nombre:", nombre.first)
-                        print("Apellido:", nombre.last)
+                        logging.info(f"Nombre: {nombre.first}; apellido: {nombre.last}")
                         razon_social_vendedor = nombre.first
                         opcion.click()
                         break
 
                 logging.info(
                     "Tipo de contribuyente seleccionado correctamente.")
-                time.sleep(1)
             except Exception as e:
                 logging.error(
                     f"Error al seleccionar el tipo de contribuyente: {e}")
@@ -92,30 +119,24 @@ def registrar_cuenta_en_web(driver, datos_extraidos, nit_emisor, razon_social_ve
 
             # Campo de identificación (NIT)
             try:
-                campo_identificacion = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "#CO_P_E-2 > div > siigo-identification-input-web"))
-                )
+                campo_identificacion = espera.esperar(driver, EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "#CO_P_E-2 > div > siigo-identification-input-web")))
                 shadow_identificacion = campo_identificacion.shadow_root
                 shadow_identificacion.find_element(
                     By.CSS_SELECTOR, "#identification > input").send_keys(nit_emisor)
                 logging.info("Identificación ingresada correctamente.")
-                time.sleep(1)
             except Exception as e:
                 logging.error(f"Error al ingresar la identificación: {e}")
                 raise
 
             # Campo de razón social
             try:
-                campo_razon_social = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, nombre_selector))
-                )
+                campo_razon_social = espera.esperar(driver, EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, nombre_selector)))
                 shadow_razon_social = campo_razon_social.shadow_root
                 shadow_razon_social.find_element(
                     By.CSS_SELECTOR, ".mdc-text-field__input").send_keys(razon_social_vendedor)
                 logging.info("Razón social ingresada correctamente.")
-                time.sleep(1)
             except Exception as e:
                 logging.error(f"Error al ingresar la razón social: {e}")
                 raise
@@ -123,15 +144,15 @@ def registrar_cuenta_en_web(driver, datos_extraidos, nit_emisor, razon_social_ve
 
              # Campo apellido (si aplica)
             try:
-                campo_apellido = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "#MX_FS-CO_P2 > div > siigo-textfield-web"))
-                )
+                # Solo existe para persona natural
+                if tipo_contribuyente != "Persona Natural":
+                    raise ValueError("El tercero no es persona natural")
+                campo_apellido = espera.esperar(driver, EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "#MX_FS-CO_P2 > div > siigo-textfield-web")))
                 shadow_campo_apellido  = campo_apellido .shadow_root
                 shadow_campo_apellido.find_element(
                     By.CSS_SELECTOR, ".mdc-text-field__input").send_keys(nombre.last)
                 logging.info("apellido ingresado")
-                time.sleep(1)
             except Exception as e:
                 logging.error(f"no hay que ingresar apellido")
             
@@ -150,27 +171,29 @@ def registrar_cuenta_en_web(driver, datos_extraidos, nit_emisor, razon_social_ve
 
             # Guardar los cambios
             try:
-                guardar_shadow = WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "body > modal-container > div > div > div > div.modal-footer > div > siigo-button-atom:nth-child(2)"))
-                )
+                guardar_shadow = espera.esperar(driver, EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, "body > modal-container > div > div > div > div.modal-footer > div > siigo-button-atom:nth-child(2)")))
                 guardar_shadow = guardar_shadow.shadow_root
                 guardar_shadow.find_element(By.CSS_SELECTOR, "button").click()
                 logging.info("Cambios guardados correctamente.")
             except Exception as e:
-                logging.error("Error al hacer clic en 'Guardar'.")
-            time.sleep(3)
+                logging.error(f"Error al hacer clic en 'Guardar': {e}")
+                raise
+            # Esperar a que el modal se cierre: solo entonces Siigo guardó el tercero
+            modal_cerrado = espera.esperar_o_continuar(driver, EC.invisibility_of_element_located(
+                (By.XPATH, XPATH_MODAL_TERCERO)), descripcion="el cierre del modal")
             # Ingresar el proveedor
             logging.info("Ingresando el NIT del proveedor...")
             action = ActionChains(driver)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[1]'))
+            espera.esperar(driver, EC.element_to_be_clickable(
+                (By.XPATH, '(//*[@class="autocompletecontainer"]/div/input)[1]'))
             ).send_keys(nit_emisor)
-            time.sleep(1)
+            espera.resultados_autocompletado(driver)
             action.send_keys(Keys.ENTER).perform()
-            time.sleep(5)
+            espera.cierre_autocompletado(driver)
             logging.info("Proveedor ingresado correctamente.")
+            if registro_terceros is not None and modal_cerrado:
+                registro_terceros.registrar(empresa, nit_emisor, "creado")
 
         except Exception as e:
-            logging.info(f"no es necesario crear un tercero")
+            logging.error(f"Error al crear el tercero {nit_emisor}: {e}")
@@ -0,0 +1,202 @@
+import os
+import copy
+import gzip
+import json
+import queue
+import atexit
+import shutil
+import logging
+import threading
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Niveles de detalle del log:
+#   depuracion: todo, incluido DEBUG
+#   detalle: todos los mensajes INFO de cada fila (comportamiento anterior)
+#   produccion: por fila solo el registro de resumen, advertencias y errores
+NIVELES_DETALLE = {
+    "depuracion": logging.DEBUG,
+    "detalle": logging.INFO,
+    "produccion": logging.INFO,
+}
+
+# Campos de contexto que se agregan a cada registro
+CAMPOS_CONTEXTO = ("archivo", "cufe", "fila", "paso")
+
+_contexto = threading.local()
+_listener = None
+
+
+@contextmanager
+def contexto_log(**campos):
+    """
+    Agrega campos de contexto (archivo, cufe, fila, paso) a todos los registros
+    que emita el hilo actual dentro del bloque; al salir se restauran los
+    valores anteriores, así que los contextos se pueden anidar.
+    """
+    anteriores = {campo: getattr(_contexto, campo, None) for campo in campos}
+    for campo, valor in campos.items():
+        setattr(_contexto, campo, valor)
+    try:
+        yield
+    finally:
+        for campo, valor in anteriores.items():
+            setattr(_contexto, campo, valor)
+
+
+def fijar_contexto(**campos):
+    """
+    Fija campos de contexto del hilo actual sin bloque (p. ej. la fila en curso
+    dentro del ciclo de filas); quedan hasta que se vuelvan a fijar.
+    """
+    for campo, valor in campos.items():
+        setattr(_contexto, campo, valor)
+
+
+class FiltroContexto(logging.Filter):
+    """
+    Copia el contexto del hilo en el registro. Corre en el hilo que emite el
+    registro (antes de la cola), que es el único que conoce su contexto.
+
+    Con solo_resumen, los mensajes INFO emitidos dentro de una fila (con fila en
+    el contexto) se descartan salvo los marcados con extra={"resumen": True}.
+    """
+
+    def __init__(self, solo_resumen=False):
+        super().__init__()
+        self.solo_resumen = solo_resumen
+
+    def filter(self, record):
+        for campo in CAMPOS_CONTEXTO:
+            if not hasattr(record, campo):
+                setattr(record, campo, getattr(_contexto, campo, None))
+        if (self.solo_resumen and record.levelno <= logging.INFO and record.fila is not None
+                and not getattr(record, "resumen", False)):
+            return False
+        return True
+
+
+class ManejadorCola(QueueHandler):
+    """
+    QueueHandler que conserva la traza de la excepción aparte del mensaje, para
+    que el formato JSON la guarde en su propio campo.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class FormatoJSON(logging.Formatter):
+    """Un objeto JSON por línea con la fecha, el nivel, el hilo, el contexto y el mensaje."""
+
+    def format(self, record):
+        evento = {
+            "fecha": self.formatTime(record, "%Y-%m-%d %H:%M:%S")
+                     + f",{int(record.msecs):03d}",
+            "nivel": record.levelname,
+            "hilo": record.threadName,
+            "mensaje": record.getMessage(),
+        }
+        for campo in CAMPOS_CONTEXTO:
+            valor = getattr(record, campo, None)
+            if valor is not None:
+                evento[campo] = valor
+        if getattr(record, "resumen", False):
+            evento["resumen"] = True
+        if record.exc_text:
+            evento["excepcion"] = record.exc_text
+        return json.dumps(evento, ensure_ascii=False, default=str)
+
+
+def _comprimir(origen, destino):
+    # Rotación: el archivo que se cierra se guarda comprimido (script.jsonl.1.gz, ...)
+    with open(origen, "rb") as f_origen, gzip.open(destino, "wb") as f_destino:
+        shutil.copyfileobj(f_origen, f_destino)
+    os.remove(origen)
+
+
+def crear_manejador_archivo(log_file, max_mb=10, copias=5):
+    """RotatingFileHandler en JSON que comprime con gzip los archivos rotados."""
+    manejador = RotatingFileHandler(
+        log_file, maxBytes=int(max_mb * 1024 * 1024), backupCount=copias, encoding="utf-8")
+    manejador.namer = lambda nombre: f"{nombre}.gz"
+    manejador.rotator = _comprimir
+    manejador.setFormatter(FormatoJSON())
+    return manejador
+
+
+def configurar_logging(log_file="logs/script.jsonl", nivel="detalle", max_mb=10, copias=5,
+                       consola=True):
+    """
+    Configura el logging con una cola: los hilos de la automatización solo
+    encolan los registros y un hilo aparte (QueueListener) los escribe en el
+    archivo JSONL rotativo y en la consola.
+
+    Se puede llamar de nuevo (p. ej. con config["logging"] ya cargado); la
+    configuración anterior se detiene y se reemplaza.
+
+    Parámetros:
+        log_file (str): Archivo JSONL del log (rota por tamaño y comprime con gzip).
+        nivel (str): Nivel de detalle (ver NIVELES_DETALLE).
+        max_mb (float): Tamaño máximo del archivo antes de rotar (MB).
+        copias (int): Archivos rotados que se conservan.
+        consola (bool): Mostrar también los mensajes en la consola (texto).
+
+    Raises:
+        ValueError: Si el nivel de detalle no es válido.
+        OSError: Si no se puede crear la carpeta o el archivo de logs.
+    """
+    global _listener
+    if nivel not in NIVELES_DETALLE:
+        raise ValueError(f"Nivel de detalle de logging no válido: {nivel}")
+    try:
+        # Crear la carpeta del log si no existe
+        log_dir = os.path.dirname(log_file)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+
+        manejadores = [crear_manejador_archivo(log_file, max_mb, copias)]
+        if consola:
+            manejador_consola = logging.StreamHandler()
+            manejador_consola.setFormatter(logging.Formatter(
+                '%(asctime)s - %(levelname)s - %(threadName)s - %(message)s'))
+            manejadores.append(manejador_consola)
+
+        detener_logging()
+        cola = queue.SimpleQueue()
+        manejador_cola = ManejadorCola(cola)
+        manejador_cola.addFilter(FiltroContexto(solo_resumen=nivel == "produccion"))
+
+        raiz = logging.getLogger()
+        for manejador in list(raiz.handlers):
+            raiz.removeHandler(manejador)
+            manejador.close()
+        raiz.addHandler(manejador_cola)
+        raiz.setLevel(NIVELES_DETALLE[nivel])
+
+        _listener = QueueListener(cola, *manejadores, respect_handler_level=True)
+        _listener.start()
+        logging.info(f"Logging configurado en {log_file} (nivel '{nivel}').")
+    except OSError as e:
+        logging.error(f"No se pudo configurar el logging: {e}")
+        raise
+
+
+def detener_logging():
+    """Escribe los registros pendientes de la cola y detiene el hilo del logging."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for manejador in _listener.handlers:
+            manejador.close()
+        _listener = None
+
+
+atexit.register(detener_logging)
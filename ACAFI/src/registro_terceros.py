@@ -0,0 +1,72 @@
+import os
+import time
+import sqlite3
+import logging
+
+
+class RegistroTerceros:
+    """
+    Registro persistente (SQLite) de los terceros que ya existen en cada empresa
+    de Siigo.
+
+    Se llena con los terceros creados por el bot y con los proveedores que Siigo
+    encontró sin pedir crearlos. Con él, registrar_cuenta_en_web no tiene que
+    esperar el modal de creación para los terceros conocidos.
+
+    Parámetros:
+        ruta_db (str): Ruta del archivo SQLite.
+    """
+
+    def __init__(self, ruta_db):
+        self.ruta_db = str(ruta_db)
+        directorio = os.path.dirname(self.ruta_db)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        self._conexion = sqlite3.connect(self.ruta_db, timeout=30)
+        self._conexion.execute(
+            """
+            CREATE TABLE IF NOT EXISTS terceros (
+                empresa TEXT NOT NULL,
+                nit TEXT NOT NULL,
+                origen TEXT NOT NULL,
+                registrado REAL NOT NULL,
+                PRIMARY KEY (empresa, nit)
+            )
+            """
+        )
+        self._conexion.commit()
+
+    def existe(self, empresa, nit):
+        """True si el tercero ya se sabe existente en la empresa."""
+        try:
+            fila = self._conexion.execute(
+                "SELECT 1 FROM terceros WHERE empresa = ? AND nit = ?",
+                (str(empresa), str(nit))).fetchone()
+            return fila is not None
+        except sqlite3.Error as e:
+            logging.warning(f"No se pudo consultar el registro de terceros: {e}")
+            return False
+
+    def registrar(self, empresa, nit, origen):
+        """Registra el tercero como existente ('creado' o 'busqueda')."""
+        try:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO terceros (empresa, nit, origen, registrado) "
+                "VALUES (?, ?, ?, ?)",
+                (str(empresa), str(nit), origen, time.time()))
+            self._conexion.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"No se pudo guardar el tercero {nit} en el registro: {e}")
+
+    def olvidar(self, empresa, nit):
+        """Elimina el tercero del registro (p. ej. si Siigo vuelve a pedir crearlo)."""
+        try:
+            self._conexion.execute(
+                "DELETE FROM terceros WHERE empresa = ? AND nit = ?",
+                (str(empresa), str(nit)))
+            self._conexion.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"No se pudo eliminar el tercero {nit} del registro: {e}")
+
+    def cerrar(self):
+        self._conexion.close()
@@ -0,0 +1,152 @@
+import logging
+import pandas as pd
+
+
+def convertir_a_str(valor):
+    """
+    Convierte un valor en una cadena de texto (str), eliminando ".0" si es un float sin decimales.
+
+    Parámetros:
+        valor (int, float, str, etc.): Valor a convertir.
+
+    Retorna:
+        str: Representación en cadena del valor, sin ".0" si es un float sin decimales.
+
+    Ejemplos:
+        >>> convertir_a_str(42.0)
+        "42"
+        >>> convertir_a_str(3.14)
+        "3.14"
+        >>> convertir_a_str("Hola")
+        "Hola"
+    """
+    try:
+        # Si el valor es un float sin decimales, convertirlo a int y luego a str
+        if isinstance(valor, float) and valor.is_integer():
+            return str(int(valor))
+        # En cualquier otro caso, convertir directamente a str
+        return str(valor)
+    except Exception as e:
+        logging.error(f"Error al convertir el valor a str: {e}")
+        raise
+
+
+def columna_a_str(serie):
+    """
+    convertir_a_str aplicado a una columna completa. Las columnas float se
+    convierten con operaciones vectorizadas; las demás valor por valor, sin crear
+    una Serie por fila.
+    """
+    if pd.api.types.is_float_dtype(serie):
+        texto = serie.astype(str)
+        enteros = serie.notna() & (serie % 1 == 0)
+        texto[enteros] = serie[enteros].astype("int64").astype(str)
+        return texto
+    if pd.api.types.is_integer_dtype(serie):
+        return serie.astype(str)
+    return serie.map(convertir_a_str)
+
+
+class RegistroFactura:
+    """
+    Datos normalizados de una fila del Excel de facturas (uno por fila, con
+    __slots__ para que los archivos grandes ocupen poca memoria).
+    """
+
+    __slots__ = (
+        "indice", "cufe", "factura", "fecha", "iva", "codigo_producto", "nit_tercero",
+        "razon_social_vendedor", "nombre_receptor", "prefijo", "consecutivo",
+        "tipo_documento", "centro_costo_excel", "valor_total",
+    )
+
+    def __init__(self, *valores):
+        for campo, valor in zip(self.__slots__, valores):
+            setattr(self, campo, valor)
+
+    def __repr__(self):
+        return f"RegistroFactura(indice={self.indice}, factura={self.factura!r})"
+
+
+# Columnas del Excel que se usan como texto
+COLUMNAS_TEXTO = (
+    "CUFE/CUDE", "Fecha Emisión", "IVA", "codigo de producto", "Tipo de documento",
+    "Grupo", "Total", "NIT Emisor", "Nombre Emisor", "Nombre Receptor", "NIT Receptor",
+)
+
+
+def normalizar_facturas(df):
+    """
+    Normaliza todas las filas del Excel con operaciones por columnas.
+
+    - Prefijo vacío o "nan": se usa "FE".
+    - Folio vacío: consecutivo "".
+    - Prefijo "" con folio: el folio trae prefijo y consecutivo juntos (p. ej. "FE123").
+    - NIT tercero: el NIT receptor si el Grupo es "Emitido" y el emisor si es "Recibido".
+
+    Parámetros:
+        df (DataFrame): Datos del archivo Excel.
+
+    Retorno:
+        dict: {indice: RegistroFactura}. Las filas sin un Grupo válido no tienen NIT
+        tercero y no se incluyen.
+    """
+    try:
+        texto = {columna: columna_a_str(df[columna]) for columna in COLUMNAS_TEXTO}
+        prefijo = df["Prefijo"]
+        folio = df["Folio"]
+        centro_costo_excel = df["centro de costos"]
+    except KeyError as e:
+        logging.error(f"Falta la columna {e} en el archivo Excel.")
+        return {}
+
+    # Prefijo y consecutivo
+    sin_prefijo = prefijo.isna() | (prefijo.astype(str).str.lower() == "nan")
+    sin_folio = folio.isna() | (folio.astype(str).str.lower() == "nan")
+    separar = ~sin_folio & ~sin_prefijo & (prefijo.astype(str) == "")
+    folio_texto = columna_a_str(folio)
+    partes = folio_texto.str.extract(r"^([A-Za-z]*)(\d*)")
+    prefijo_texto = columna_a_str(prefijo).mask(sin_prefijo, "FE").mask(separar, partes[0])
+    consecutivo = folio_texto.mask(sin_folio, "").mask(separar, partes[1])
+    factura = prefijo_texto + consecutivo
+
+    # NIT del tercero según el grupo del documento
+    grupo = texto["Grupo"]
+    nit_tercero = texto["NIT Receptor"].where(
+        grupo == "Emitido", texto["NIT Emisor"].where(grupo == "Recibido"))
+
+    registros = {}
+    for valores in zip(
+            df.index, texto["CUFE/CUDE"].tolist(), factura.tolist(),
+            texto["Fecha Emisión"].tolist(), texto["IVA"].tolist(),
+            texto["codigo de producto"].tolist(), nit_tercero.tolist(),
+            texto["Nombre Emisor"].tolist(), texto["Nombre Receptor"].tolist(),
+            prefijo_texto.tolist(), consecutivo.tolist(),
+            texto["Tipo de documento"].tolist(), centro_costo_excel.tolist(),
+            texto["Total"].tolist()):
+        if pd.isna(valores[6]):
+            logging.error(f"Fila {valores[0] + 1}: Grupo no válido, no se puede elegir el NIT tercero.")
+            continue
+        registros[valores[0]] = RegistroFactura(*valores)
+    return registros
+
+
+class PlanFila:
+    """
+    Plan de ejecución de una fila, resuelto antes de abrir el navegador: datos
+    del cliente, fecha formateada, ruta y datos del PDF, camino (nota o factura)
+    y cómo se registra el IVA.
+    """
+
+    __slots__ = (
+        "registro", "ruta_pdf", "nombre", "centro_costo", "iva_cliente", "codigo_iva",
+        "fecha_formateada", "es_nota", "xpath_accion", "datos_pdf", "forma_de_pago",
+        "valor", "linea_iva", "referencia_nota",
+    )
+
+    def __init__(self, **valores):
+        for campo in self.__slots__:
+            setattr(self, campo, valores.get(campo))
+
+    def __repr__(self):
+        camino = "nota" if self.es_nota else "factura"
+        return f"PlanFila(indice={self.registro.indice}, camino={camino!r})"
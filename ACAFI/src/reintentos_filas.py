@@ -0,0 +1,99 @@
+import logging
+from collections import deque
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+
+class NitNoEncontrado(LookupError):
+    """El NIT del cliente no aparece en la tabla de clientes de Siigo."""
+
+
+class FilaRechazada(ValueError):
+    """La fila no puede procesarse; se detecta en la planificación previa al navegador."""
+
+
+class FacturaGuardada(RuntimeError):
+    """
+    El error ocurrió después de que Siigo guardó el comprobante (al leer su número
+    o mover el PDF); repetir la fila crearía la factura otra vez.
+    """
+
+
+# Errores que no se corrigen repitiendo la fila en la misma ejecución
+ERRORES_NO_REINTENTABLES = {
+    "pdf_faltante", "nit_no_encontrado", "rechazada", "guardada"}
+
+
+def clasificar_error(error):
+    """
+    Clase del error de una fila:
+      pdf_faltante, nit_no_encontrado, rechazada, guardada
+      (no reintentables),
+      tiempo_agotado, navegador y otro (reintentables).
+    """
+    if isinstance(error, FileNotFoundError):
+        return "pdf_faltante"
+    if isinstance(error, NitNoEncontrado):
+        return "nit_no_encontrado"
+    if isinstance(error, FilaRechazada):
+        return "rechazada"
+    if isinstance(error, FacturaGuardada):
+        return "guardada"
+    if isinstance(error, TimeoutException):
+        return "tiempo_agotado"
+    if isinstance(error, WebDriverException):
+        return "navegador"
+    return "otro"
+
+
+class ColaReintentos:
+    """
+    Cola de filas fallidas que se reintentan al final del archivo en la misma
+    sesión del navegador, en lugar de reiniciar toda la ejecución.
+
+    Cada fila lleva su número de intentos; las filas con errores no reintentables
+    o que ya agotaron max_intentos no se vuelven a encolar.
+
+    Parámetros:
+        max_intentos (int): Intentos por fila, contando el primero.
+    """
+
+    def __init__(self, max_intentos=3):
+        self.max_intentos = max_intentos
+        self.intentos = {}
+        self.errores = {}
+        self._cola = deque()
+
+    def __len__(self):
+        return len(self._cola)
+
+    def agregar(self, indice, error):
+        """
+        Registra el fallo de una fila y la encola si vale la pena reintentarla.
+        Retorna True si quedó en la cola.
+        """
+        clase = clasificar_error(error)
+        self.intentos[indice] = self.intentos.get(indice, 0) + 1
+        self.errores[indice] = clase
+
+        if clase in ERRORES_NO_REINTENTABLES:
+            logging.info(f"Fila {indice + 1}: error '{clase}', no se reintenta.")
+            return False
+        if self.intentos[indice] >= self.max_intentos:
+            logging.warning(
+                f"Fila {indice + 1}: error '{clase}', se agotaron los "
+                f"{self.max_intentos} intentos.")
+            return False
+        if indice not in self._cola:
+            self._cola.append(indice)
+        logging.info(
+            f"Fila {indice + 1}: error '{clase}', se reintentará "
+            f"(intento {self.intentos[indice]} de {self.max_intentos}).")
+        return True
+
+    def vaciar(self):
+        """Descarta las filas encoladas (conserva el conteo de intentos)."""
+        self._cola.clear()
+
+    def tomar_lote(self, tamano):
+        """Saca de la cola hasta `tamano` índices de fila."""
+        return [self._cola.popleft() for _ in range(min(tamano, len(self._cola)))]
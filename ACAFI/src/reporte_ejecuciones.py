@@ -0,0 +1,390 @@
+import os
+import re
+import csv
+import sys
+import gzip
+import html
+import json
+import argparse
+from datetime import datetime, timedelta
+
+from estadisticas import percentil
+
+# Formato de texto de configurar_logging (el hilo solo está en los logs recientes):
+#   2025-04-03 00:46:11,907 - INFO - trabajador-1 - Procesando fila 3 del archivo Excel.
+PATRON_LINEA = re.compile(
+    r"^(?P<fecha>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (?P<nivel>[A-Z]+) - "
+    r"(?:(?P<hilo>MainThread|[\w]+-\d+(?: \(\w+\))?) - )?(?P<mensaje>.*)$")
+
+# Mensajes de main.py que marcan la línea de tiempo de archivos y filas
+PATRON_ARCHIVO = re.compile(r"^Archivo Excel cargado correctamente: (?P<ruta>.+)$")
+PATRON_INICIO_FILA = re.compile(r"^Procesando fila (?P<fila>\d+) del archivo Excel\.")
+PATRON_FILA_EXITOSA = re.compile(r"^La factura se procesó correctamente\.")
+PATRON_FILA_FALLIDA = re.compile(r"^Error al procesar la fila (?P<fila>\d+): (?P<causa>.*)$")
+PATRON_FILA_RECHAZADA = re.compile(
+    r"^Fila (?P<fila>\d+) rechazada antes del navegador: (?P<causa>.*)$")
+# Registro de resumen por fila del nivel "produccion" (MetricasPasos.factura)
+PATRON_RESUMEN_FILA = re.compile(
+    r"^Factura (?P<cufe>\S+) (?P<resultado>exitosa|fallida) en (?P<segundos>[\d.]+) s\.")
+PATRON_ESPERA_MINUTOS = re.compile(r"^Esperando (?P<minutos>[\d.]+) minutos")
+PATRON_ESPERA_SEGUNDOS = re.compile(r"^Esperando (?P<segundos>[\d.]+) s antes del siguiente lote")
+PATRON_INICIO_SCRIPT = re.compile(
+    r"^(Logging configurado|Iniciando la ejecución del script principal)")
+
+ARCHIVO_DESCONOCIDO = "(desconocido)"
+
+
+def _decodificar(linea):
+    # Los logs anteriores se escribieron con la codificación de Windows (cp1252)
+    try:
+        return linea.decode("utf-8")
+    except UnicodeDecodeError:
+        return linea.decode("cp1252", errors="replace")
+
+
+def _fecha(texto):
+    return datetime.strptime(texto, "%Y-%m-%d %H:%M:%S,%f")
+
+
+def leer_eventos(ruta):
+    """
+    Recorre un log línea por línea (sin cargarlo completo) y genera
+    (fecha, nivel, hilo, mensaje, contexto) para cada registro.
+
+    Acepta el formato de texto de configurar_logging y las líneas JSON de
+    registro_eventos (también los archivos rotados .gz). Las líneas que no
+    empiezan un registro (p. ej. trazas de excepciones) se ignoran.
+    """
+    abrir = gzip.open if ruta.endswith(".gz") else open
+    with abrir(ruta, "rb") as f:
+        for linea in f:
+            linea = _decodificar(linea).rstrip("\r\n")
+            if linea.startswith("{"):
+                try:
+                    registro = json.loads(linea)
+                    fecha = _fecha(registro["fecha"])
+                except (ValueError, KeyError):
+                    continue
+                yield (fecha, registro.get("nivel"), registro.get("hilo") or "MainThread",
+                       registro.get("mensaje", ""), registro)
+                continue
+            coincidencia = PATRON_LINEA.match(linea)
+            if not coincidencia:
+                continue
+            yield (_fecha(coincidencia["fecha"]), coincidencia["nivel"],
+                   coincidencia["hilo"] or "MainThread", coincidencia["mensaje"], {})
+
+
+def normalizar_causa(causa):
+    """Agrupa causas que solo difieren en NITs, números de fila o consecutivos."""
+    causa = causa.strip().split("\n")[0]
+    causa = re.sub(r"\d{3,}", "#", causa)
+    return causa[:200]
+
+
+class AnalizadorLog:
+    """
+    Reconstruye, a partir de los eventos del log, la línea de tiempo de cada
+    archivo Excel (una entrada por archivo y corrida del script) y de cada fila
+    (una entrada por intento).
+
+    Cada hilo lleva su propio archivo y fila en curso, así que los logs con
+    varios trabajadores se separan correctamente.
+    """
+
+    def __init__(self):
+        self.archivos = []
+        self.filas = []
+        self._archivo_hilo = {}
+        self._fila_hilo = {}
+        self._ultima_fila = {}
+        self._intentos = {}
+
+    # ------------------------------------------------------------------
+    # Estado por hilo
+    # ------------------------------------------------------------------
+
+    def _archivo(self, hilo, fecha, nombre=None):
+        actual = self._archivo_hilo.get(hilo)
+        if actual is None or (nombre is not None and actual["archivo"] != nombre):
+            actual = {
+                "archivo": nombre or ARCHIVO_DESCONOCIDO, "hilo": hilo,
+                "inicio": fecha, "fin": fecha, "ejecuciones": 0,
+                "esperas": 0, "segundos_espera": 0.0,
+            }
+            self.archivos.append(actual)
+            self._archivo_hilo[hilo] = actual
+        actual["fin"] = fecha
+        return actual
+
+    def _abrir_fila(self, hilo, fecha, fila, archivo):
+        self._cerrar_fila(hilo, fecha, "sin resultado", "")
+        clave = (archivo["archivo"], fila)
+        self._intentos[clave] = self._intentos.get(clave, 0) + 1
+        self._fila_hilo[hilo] = {
+            "archivo": archivo["archivo"], "fila": fila, "cufe": "", "hilo": hilo,
+            "intento": self._intentos[clave], "inicio": fecha, "fin": None,
+            "segundos": None, "resultado": "", "causa": "",
+        }
+
+    def _cerrar_fila(self, hilo, fecha, resultado, causa, segundos=None):
+        fila = self._fila_hilo.pop(hilo, None)
+        if fila is None:
+            return None
+        fila["fin"] = fecha
+        fila["segundos"] = (segundos if segundos is not None
+                            else round((fecha - fila["inicio"]).total_seconds(), 3))
+        fila["resultado"] = resultado
+        fila["causa"] = causa
+        self.filas.append(fila)
+        self._ultima_fila[hilo] = fila
+        return fila
+
+    # ------------------------------------------------------------------
+    # Eventos
+    # ------------------------------------------------------------------
+
+    def agregar(self, fecha, nivel, hilo, mensaje, contexto):
+        if PATRON_INICIO_SCRIPT.match(mensaje):
+            # Corrida nueva: lo que quedó abierto no terminó
+            for hilo_abierto in list(self._fila_hilo):
+                self._cerrar_fila(hilo_abierto, fecha, "interrumpida", "")
+            self._archivo_hilo.clear()
+            return
+
+        coincidencia = PATRON_ARCHIVO.match(mensaje)
+        if coincidencia:
+            # Se carga una vez por ejecución del archivo (hasta 3)
+            nombre = re.split(r"[\\/]", coincidencia["ruta"].strip())[-1]
+            self._archivo(hilo, fecha, nombre)["ejecuciones"] += 1
+            return
+        archivo = self._archivo(hilo, fecha, contexto.get("archivo"))
+
+        coincidencia = PATRON_INICIO_FILA.match(mensaje)
+        if coincidencia:
+            self._abrir_fila(hilo, fecha, int(coincidencia["fila"]), archivo)
+            return
+
+        if PATRON_FILA_EXITOSA.match(mensaje):
+            self._cerrar_fila(hilo, fecha, "exitosa", "")
+            return
+
+        coincidencia = PATRON_FILA_FALLIDA.match(mensaje)
+        if coincidencia:
+            if hilo not in self._fila_hilo:
+                self._abrir_fila(hilo, fecha, int(coincidencia["fila"]), archivo)
+            self._cerrar_fila(hilo, fecha, "fallida", coincidencia["causa"])
+            return
+
+        coincidencia = PATRON_FILA_RECHAZADA.match(mensaje)
+        if coincidencia:
+            self._abrir_fila(hilo, fecha, int(coincidencia["fila"]), archivo)
+            self._cerrar_fila(hilo, fecha, "rechazada", coincidencia["causa"], segundos=0.0)
+            return
+
+        coincidencia = PATRON_RESUMEN_FILA.match(mensaje)
+        if coincidencia:
+            # Resumen de la fila (MetricasPasos.factura). Con el nivel "detalle" llega
+            # después del cierre de la fila y solo la completa; con "produccion" es el
+            # único registro INFO de la fila
+            resultado = coincidencia["resultado"]
+            segundos = float(coincidencia["segundos"])
+            anterior = self._ultima_fila.get(hilo)
+            if (hilo not in self._fila_hilo and anterior is not None
+                    and anterior["resultado"] == resultado and not anterior["cufe"]):
+                anterior["cufe"] = coincidencia["cufe"]
+                anterior["segundos"] = segundos
+                return
+            if hilo not in self._fila_hilo:
+                self._abrir_fila(hilo, fecha - timedelta(seconds=segundos),
+                                 contexto.get("fila") or 0, archivo)
+            self._fila_hilo[hilo]["cufe"] = coincidencia["cufe"]
+            self._cerrar_fila(hilo, fecha, resultado, "", segundos)
+            return
+
+        coincidencia = PATRON_ESPERA_MINUTOS.match(mensaje)
+        if coincidencia:
+            archivo["esperas"] += 1
+            archivo["segundos_espera"] += float(coincidencia["minutos"]) * 60
+            return
+
+        coincidencia = PATRON_ESPERA_SEGUNDOS.match(mensaje)
+        if coincidencia:
+            archivo["esperas"] += 1
+            archivo["segundos_espera"] += float(coincidencia["segundos"])
+
+    def terminar(self):
+        """Cierra las filas que quedaron abiertas al final del log."""
+        for hilo in list(self._fila_hilo):
+            fila = self._fila_hilo[hilo]
+            self._cerrar_fila(hilo, fila["inicio"], "sin resultado", "")
+
+    # ------------------------------------------------------------------
+    # Resultados
+    # ------------------------------------------------------------------
+
+    def resumen_archivos(self):
+        """Una entrada por archivo y corrida con filas por hora y duraciones."""
+        filas_por_archivo = {}
+        for fila in self.filas:
+            filas_por_archivo.setdefault(fila["archivo"], []).append(fila)
+        resumen = []
+        for archivo in self.archivos:
+            filas = [
+                fila for fila in filas_por_archivo.get(archivo["archivo"], [])
+                if fila["hilo"] == archivo["hilo"]
+                and archivo["inicio"] <= fila["inicio"] <= archivo["fin"]]
+            if not filas and not archivo["esperas"] and archivo["archivo"] == ARCHIVO_DESCONOCIDO:
+                continue
+            exitosas = [fila for fila in filas if fila["resultado"] == "exitosa"]
+            duraciones = [fila["segundos"] for fila in exitosas]
+            segundos = (archivo["fin"] - archivo["inicio"]).total_seconds()
+            resumen.append({
+                "archivo": archivo["archivo"],
+                "hilo": archivo["hilo"],
+                "inicio": archivo["inicio"].isoformat(sep=" ", timespec="seconds"),
+                "fin": archivo["fin"].isoformat(sep=" ", timespec="seconds"),
+                "segundos": round(segundos, 1),
+                "filas": len(filas),
+                "exitosas": len(exitosas),
+                "fallidas": sum(1 for fila in filas if fila["resultado"] == "fallida"),
+                "rechazadas": sum(1 for fila in filas if fila["resultado"] == "rechazada"),
+                "reintentos": sum(1 for fila in filas if fila["intento"] > 1),
+                "ejecuciones": archivo["ejecuciones"],
+                "filas_por_hora": round(len(exitosas) * 3600 / segundos, 1) if segundos > 0 else None,
+                "p50_fila_s": percentil(duraciones, 50),
+                "p95_fila_s": percentil(duraciones, 95),
+                "esperas": archivo["esperas"],
+                "segundos_espera": round(archivo["segundos_espera"], 1),
+            })
+        return resumen
+
+    def causas(self, limite=20):
+        """Causas de fallo más frecuentes: [(causa, veces)]."""
+        conteo = {}
+        for fila in self.filas:
+            if fila["causa"]:
+                causa = normalizar_causa(fila["causa"])
+                conteo[causa] = conteo.get(causa, 0) + 1
+        return sorted(conteo.items(), key=lambda item: -item[1])[:limite]
+
+    def totales(self, archivos):
+        exitosas = [fila["segundos"] for fila in self.filas if fila["resultado"] == "exitosa"]
+        segundos = sum(archivo["segundos"] for archivo in archivos)
+        espera = sum(archivo["segundos_espera"] for archivo in archivos)
+        return {
+            "archivos": len(archivos),
+            "filas": len(self.filas),
+            "exitosas": len(exitosas),
+            "fallidas": sum(1 for fila in self.filas if fila["resultado"] == "fallida"),
+            "rechazadas": sum(1 for fila in self.filas if fila["resultado"] == "rechazada"),
+            "reintentos": sum(1 for fila in self.filas if fila["intento"] > 1),
+            "filas_por_hora": round(len(exitosas) * 3600 / segundos, 1) if segundos > 0 else None,
+            "p50_fila_s": percentil(exitosas, 50),
+            "p95_fila_s": percentil(exitosas, 95),
+            "segundos_espera": round(espera, 1),
+            "espera_pct": round(espera / segundos * 100, 1) if segundos > 0 else 0.0,
+        }
+
+
+def analizar_logs(rutas):
+    """Analiza los logs en el orden dado (del más antiguo al más reciente)."""
+    analizador = AnalizadorLog()
+    for ruta in rutas:
+        for evento in leer_eventos(ruta):
+            analizador.agregar(*evento)
+    analizador.terminar()
+    return analizador
+
+
+def escribir_csv(ruta, filas, columnas):
+    with open(ruta, "w", newline="", encoding="utf-8-sig") as f:
+        escritor = csv.DictWriter(f, fieldnames=columnas, extrasaction="ignore")
+        escritor.writeheader()
+        for fila in filas:
+            escritor.writerow(fila)
+
+
+def _tabla_html(columnas, filas):
+    encabezado = "".join(f"<th>{html.escape(str(columna))}</th>" for columna in columnas)
+    cuerpo = "".join(
+        "<tr>" + "".join(
+            f"<td>{html.escape('' if valor is None else str(valor))}</td>" for valor in fila)
+        + "</tr>"
+        for fila in filas)
+    return f"<table><tr>{encabezado}</tr>{cuerpo}</table>"
+
+
+def escribir_html(ruta, totales, archivos, causas, rutas_log):
+    columnas_archivos = [
+        "archivo", "inicio", "segundos", "filas", "exitosas", "fallidas", "rechazadas",
+        "reintentos", "ejecuciones", "filas_por_hora", "p50_fila_s", "p95_fila_s",
+        "esperas", "segundos_espera"]
+    contenido = f"""<!DOCTYPE html>
+<html lang="es"><head><meta charset="utf-8"><title>Reporte de ejecuciones</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 8px; text-align: left; }}
+th {{ background: #eee; }}
+</style></head><body>
+<h1>Reporte de ejecuciones</h1>
+<p>Logs: {html.escape(", ".join(rutas_log))}</p>
+<h2>Totales</h2>
+{_tabla_html(["métrica", "valor"], totales.items())}
+<h2>Causas de fallo más frecuentes</h2>
+{_tabla_html(["causa", "filas"], causas)}
+<h2>Archivos</h2>
+{_tabla_html(columnas_archivos, [[a[c] for c in columnas_archivos] for a in archivos])}
+</body></html>
+"""
+    with open(ruta, "w", encoding="utf-8") as f:
+        f.write(contenido)
+
+
+COLUMNAS_FILAS = ["archivo", "fila", "cufe", "hilo", "intento", "inicio", "fin", "segundos",
+                  "resultado", "causa"]
+COLUMNAS_ARCHIVOS = [
+    "archivo", "hilo", "inicio", "fin", "segundos", "filas", "exitosas", "fallidas",
+    "rechazadas", "reintentos", "ejecuciones", "filas_por_hora", "p50_fila_s", "p95_fila_s",
+    "esperas", "segundos_espera"]
+
+
+def generar_reporte(rutas, carpeta_salida):
+    """
+    Genera en la carpeta filas.csv, archivos.csv, causas.csv y reporte.html.
+
+    Retorno:
+        dict: Totales del reporte.
+    """
+    analizador = analizar_logs(rutas)
+    archivos = analizador.resumen_archivos()
+    causas = analizador.causas()
+    totales = analizador.totales(archivos)
+
+    os.makedirs(carpeta_salida, exist_ok=True)
+    escribir_csv(os.path.join(carpeta_salida, "filas.csv"), analizador.filas, COLUMNAS_FILAS)
+    escribir_csv(os.path.join(carpeta_salida, "archivos.csv"), archivos, COLUMNAS_ARCHIVOS)
+    escribir_csv(
+        os.path.join(carpeta_salida, "causas.csv"),
+        [{"causa": causa, "filas": veces} for causa, veces in causas], ["causa", "filas"])
+    escribir_html(os.path.join(carpeta_salida, "reporte.html"), totales, archivos, causas, rutas)
+    return totales
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Genera un reporte de rendimiento y fallos a partir de los logs del bot.")
+    parser.add_argument("logs", nargs="+",
+                        help="Logs a analizar, del más antiguo al más reciente "
+                             "(script.log, script.jsonl, rotados .gz).")
+    parser.add_argument("--salida", default="reportes",
+                        help="Carpeta donde se escriben los CSV y el HTML.")
+    opciones = parser.parse_args(argumentos)
+
+    totales = generar_reporte(opciones.logs, opciones.salida)
+    print(json.dumps(totales, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
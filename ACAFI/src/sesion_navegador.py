@@ -0,0 +1,119 @@
+import logging
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from selenium.common.exceptions import WebDriverException
+
+
+def crear_opciones_chrome():
+    """
+    Opciones de Chrome usadas por el bot.
+
+    Retorna:
+        Options: Opciones de configuración del navegador.
+    """
+    options = Options()
+    # Maximizar la ventana del navegador
+    options.add_argument("--start-maximized")
+    # Deshabilitar la política de mismo origen
+    options.add_argument("--disable-web-security")
+    # Deshabilitar notificaciones
+    options.add_argument("--disable-notifications")
+    # Evitar detección de automatización
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    # Ignorar errores de certificados SSL
+    options.add_argument("--ignore-certificate-errors")
+    # Permitir conexiones inseguras a localhost
+    options.add_argument("--allow-insecure-localhost")
+    # evitar que el navegador se cierre para ver el error
+    options.add_experimental_option("detach", True)
+    return options
+
+
+class GestorSesiones:
+    """
+    Mantiene un navegador autenticado por usuario de Siigo y lo reutiliza entre
+    archivos e intentos.
+
+    Antes de entregar una sesión existente se verifica que el navegador responda
+    y se vuelve a la página principal; solo si la sesión está muerta se relanza
+    Chrome, y solo si Siigo muestra de nuevo el formulario de login se vuelve a
+    iniciar sesión.
+
+    Parámetros:
+        iniciar (callable): iniciar() -> WebDriver; lanza un navegador nuevo.
+        navegar (callable): navegar(driver) lleva el navegador a la página principal.
+        autenticar (callable): autenticar(driver, usuario, contrasena) hace el login.
+    """
+
+    def __init__(self, iniciar, navegar, autenticar):
+        self._iniciar = iniciar
+        self._navegar = navegar
+        self._autenticar = autenticar
+        self._sesiones = {}
+
+    @staticmethod
+    def esta_viva(driver):
+        """Verifica que el navegador y su sesión de WebDriver sigan respondiendo."""
+        try:
+            driver.execute_script("return document.readyState")
+            return len(driver.window_handles) > 0
+        except WebDriverException:
+            return False
+
+    @staticmethod
+    def requiere_login(driver):
+        """True si la página actual muestra el formulario de login."""
+        try:
+            return bool(driver.find_elements(By.CSS_SELECTOR, "#username"))
+        except WebDriverException:
+            return True
+
+    def obtener(self, usuario, contrasena):
+        """
+        Retorna un navegador autenticado para el usuario, reutilizando el existente
+        si sigue vivo.
+        """
+        driver = self._sesiones.get(usuario)
+        if driver is not None:
+            if self.esta_viva(driver):
+                try:
+                    self._navegar(driver)
+                    if self.requiere_login(driver):
+                        logging.info("La sesión expiró; iniciando sesión de nuevo...")
+                        self._autenticar(driver, usuario, contrasena)
+                    logging.info(f"Reutilizando la sesión del navegador para {usuario}.")
+                    return driver
+                except WebDriverException as e:
+                    logging.warning(f"No se pudo reutilizar la sesión de {usuario}: {e}")
+            else:
+                logging.warning(f"La sesión del navegador de {usuario} no responde; se relanza.")
+            self.cerrar(usuario)
+
+        driver = self._iniciar()
+        try:
+            self._navegar(driver)
+            self._autenticar(driver, usuario, contrasena)
+        except Exception:
+            self._cerrar_driver(driver)
+            raise
+        self._sesiones[usuario] = driver
+        logging.info(f"Nueva sesión del navegador iniciada para {usuario}.")
+        return driver
+
+    @staticmethod
+    def _cerrar_driver(driver):
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def cerrar(self, usuario):
+        """Cierra y olvida la sesión de un usuario."""
+        driver = self._sesiones.pop(usuario, None)
+        if driver is not None:
+            self._cerrar_driver(driver)
+
+    def cerrar_todas(self):
+        for usuario in list(self._sesiones):
+            self.cerrar(usuario)
+        logging.info("Navegadores cerrados correctamente.")
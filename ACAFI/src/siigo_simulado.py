@@ -0,0 +1,601 @@
+import sys
+import json
+import logging
+import argparse
+import threading
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# Latencias simuladas (s) de cada respuesta de la interfaz:
+#   login: del clic en "Ingresar" a la tabla de empresas
+#   tabla_empresas: carga de las filas de #wc-data-table-general
+#   encabezado: del clic en la empresa al encabezado con el botón "Crear"
+#   formulario: del clic en el menú "Crear" al formulario del comprobante
+#   desplegable: carga de las opciones de los <select>
+#   autocompletado: de la escritura a la lista de resultados (siigo-ac-table)
+#   modal_tercero: aparición y cierre del modal de creación de terceros
+#   guardar: del clic en "Guardar" al title-container con el número asignado
+LATENCIAS_POR_DEFECTO = {
+    "login": 0.5,
+    "tabla_empresas": 0.4,
+    "encabezado": 0.3,
+    "formulario": 0.4,
+    "desplegable": 0.2,
+    "autocompletado": 0.3,
+    "modal_tercero": 0.5,
+    "guardar": 1.0,
+}
+
+# Página única que imita los elementos de Siigo que usa el bot: campos de login y
+# tabla de empresas dentro de shadow roots, siigo-header-molecule con el botón
+# "Crear", formularios de factura de compra y nota débito, autocompletados
+# (siigo-ac-table) y el modal de creación de terceros.
+PAGINA_SIMULADA = r"""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>Siigo (simulado)</title>
+<style>
+    body { font-family: sans-serif; margin: 0; }
+    [hidden] { display: none !important; }
+    main, #contenido { padding: 16px; }
+    label { display: block; margin-top: 8px; }
+    input, select { margin: 4px 0; }
+    .siigo-ac-table { position: absolute; z-index: 10; background: #fff;
+                      border: 1px solid #888; border-collapse: collapse; }
+    .siigo-ac-table div { padding: 4px 12px; cursor: pointer; }
+    .agregar-item { color: #06c; cursor: pointer; margin: 8px 0; }
+    .errores { color: #c00; }
+    modal-container { position: fixed; inset: 0; z-index: 20; display: block;
+                      background: rgba(0, 0, 0, .4); }
+    .modal-content { background: #fff; width: 640px; margin: 40px auto; padding: 16px; }
+    .emergente { position: fixed; top: 16px; right: 16px; z-index: 30;
+                 background: #fee; border: 1px solid #c00; padding: 8px; }
+</style>
+</head>
+<body>
+<main id="vista"></main>
+<table class="siigo-ac-table" hidden><tbody></tbody></table>
+<script>
+const CONFIG = __CONFIG__;
+const vista = document.getElementById('vista');
+const tablaAc = document.querySelector('.siigo-ac-table');
+const estado = {empresa: null, comprobante: null};
+
+const despues = (latencia, accion) => setTimeout(accion, (CONFIG.latencias[latencia] || 0) * 1000);
+const api = (ruta, datos) => fetch(ruta, datos === undefined ? {} : {
+    method: 'POST', headers: {'Content-Type': 'application/json'}, body: JSON.stringify(datos),
+}).then(respuesta => respuesta.json());
+
+// ---------------------------------------------------------------- elementos con shadow root
+const PLANTILLAS = {
+    'siigo-campo-login': (el) =>
+        `<input id="${el.dataset.input}" type="${el.dataset.tipo || 'text'}">`,
+    'siigo-button-atom': () => '<button type="button" class="btn-element"><slot></slot></button>',
+    'siigo-button-dropdown-atom': () =>
+        '<button type="button" class="button-dropdown__btn">Ingresar</button>',
+    'siigo-textfield-web': () =>
+        '<label><slot></slot><input class="mdc-text-field__input"></label>',
+    'siigo-identification-input-web': () => '<div id="identification"><input></div>',
+    'siigo-dropdownlist-web': () =>
+        '<div class="mdc-select" tabindex="0">Tipo de tercero</div>' +
+        '<ul class="mdc-list" hidden>' +
+        '<li><span class="mdc-list-item__text">Empresa</span></li>' +
+        '<li><span class="mdc-list-item__text">Es persona</span></li></ul>',
+    'siigo-empresas': () => '<p>Cargando empresas...</p>',
+    'siigo-header-molecule': () =>
+        '<siigo-button-atom data-id="header-create-button">Crear</siigo-button-atom>' +
+        '<nav class="menu-crear" hidden>' +
+        '<a data-value="Factura de compra / Gasto">Factura de compra / Gasto</a> ' +
+        '<a data-value="Nota débito (compras)">Nota débito (compras)</a></nav>',
+};
+
+const COMPORTAMIENTOS = {
+    'siigo-dropdownlist-web': (el, raiz) => {
+        const lista = raiz.querySelector('.mdc-list');
+        raiz.querySelector('.mdc-select').addEventListener('click', () => { lista.hidden = false; });
+        for (const opcion of raiz.querySelectorAll('.mdc-list-item__text')) {
+            opcion.addEventListener('click', () => {
+                el.dataset.valor = opcion.textContent;
+                raiz.querySelector('.mdc-select').textContent = opcion.textContent;
+                lista.hidden = true;
+            });
+        }
+    },
+    'siigo-button-dropdown-atom': (el) => {
+        el.addEventListener('click', () => vistaEncabezado(el.dataset.nit));
+    },
+    'siigo-empresas': (el, raiz) => {
+        despues('tabla_empresas', () => {
+            const filas = Object.entries(CONFIG.empresas).map(([nit, nombre]) =>
+                `<tr><td>${nombre}</td><td>${nit}</td>` +
+                `<td><siigo-button-dropdown-atom data-nit="${nit}"></siigo-button-dropdown-atom></td></tr>`);
+            raiz.innerHTML = `<table id="wc-data-table-general">${filas.join('')}</table>`;
+        });
+    },
+    'siigo-header-molecule': (el, raiz) => {
+        const menu = raiz.querySelector('.menu-crear');
+        raiz.querySelector('siigo-button-atom').addEventListener('click', () => { menu.hidden = false; });
+        for (const enlace of menu.querySelectorAll('a')) {
+            enlace.addEventListener('click', () => {
+                menu.hidden = true;
+                vistaComprobante(enlace.dataset.value.startsWith('Nota') ? 'nota' : 'factura');
+            });
+        }
+    },
+};
+
+for (const [etiqueta, plantilla] of Object.entries(PLANTILLAS)) {
+    customElements.define(etiqueta, class extends HTMLElement {
+        connectedCallback() {
+            if (this.shadowRoot) {
+                return;
+            }
+            const raiz = this.attachShadow({mode: 'open'});
+            raiz.innerHTML = plantilla(this);
+            if (COMPORTAMIENTOS[etiqueta]) {
+                COMPORTAMIENTOS[etiqueta](this, raiz);
+            }
+        }
+    });
+}
+
+// ---------------------------------------------------------------- vistas
+function vistaLogin() {
+    vista.innerHTML = '<h1>Ingreso</h1>' +
+        '<siigo-campo-login id="username" data-input="username-input"></siigo-campo-login>' +
+        '<siigo-campo-login id="current-password" data-input="password-input" data-tipo="password"></siigo-campo-login>' +
+        '<button id="login-submit" type="button">Ingresar</button>';
+    document.getElementById('login-submit').addEventListener('click', () => {
+        const usuario = document.getElementById('username').shadowRoot.querySelector('input').value;
+        if (!usuario) {
+            return;
+        }
+        despues('login', () => {
+            document.cookie = `sesion_simulada=${encodeURIComponent(usuario)}; path=/`;
+            vistaEmpresas();
+        });
+    });
+}
+
+function vistaEmpresas() {
+    vista.innerHTML = '<h1>Mis empresas</h1><siigo-empresas style="z-index: 1;"></siigo-empresas>';
+}
+
+function vistaEncabezado(nit) {
+    estado.empresa = nit;
+    vista.innerHTML = '';
+    despues('encabezado', () => {
+        vista.innerHTML = '<siigo-header-molecule class="data-siigo-five9"></siigo-header-molecule>' +
+            '<section id="contenido"></section>';
+    });
+}
+
+const HTML_FACTURA = `
+<h2>Factura de compra / Gasto</h2>
+<label>Tipo</label><div value="ERPDocumentTypeID"><select><option value="">Seleccione</option></select></div>
+<label>Fecha de elaboración</label><div class="dx-texteditor-input-container"><input name="fecha"></div>
+<label>Proveedor</label><div class="autocompletecontainer" data-campo="proveedor"><div><input></div></div>
+<label>No. factura proveedor</label><input id="txtExternalPrefix"><input id="txtExternalConsecutive">
+<label>Centro de costos</label><div class="autocompletecontainer" data-campo="centro_costo"><div><input></div></div>
+<label>Contacto</label><div class="autocompletecontainer" data-campo="contacto"><div><input></div></div>
+<div id="trEditRow">
+    <div>Tipo de ítem</div>
+    <div><siigo-dropdownenum><select><option value="">Seleccione</option></select></siigo-dropdownenum></div>
+    <div class="autocompletecontainer" data-campo="producto"><div><input></div></div>
+    <div class="dx-texteditor-container"><div><input id="inputDecimal_siigoInputDecimal" name="cantidad" value="1"></div></div>
+    <div class="dx-texteditor-container"><div><input id="inputDecimal_siigoInputDecimal" name="descuento" value="0"></div></div>
+    <div class="dx-texteditor-container"><div><input id="inputDecimal_siigoInputDecimal" name="valor"></div></div>
+    <siigo-dropdown id="editAddTax"><div><select id="dropdown_dropdownSelect">
+        <option>Sin impuesto</option><option>IVA 19 MV</option><option>IVA 5 MV</option>
+    </select></div></siigo-dropdown>
+</div>
+<div class="agregar-item"></div>
+<label>Forma de pago</label><input id="editingAcAccount_autocompleteInput">
+<div class="errores"></div>
+<button type="button" class="SiigoButtonPrimary">Guardar</button>`;
+
+const HTML_NOTA = `
+<h2>Nota débito (compras)</h2>
+<label>No. de compra / Doc. soporte</label><div class="autocompletecontainer" data-campo="compra"><div><input></div></div>
+<label>Forma de pago</label><input id="editingAcAccount_autocompleteInput">
+<div class="errores"></div>
+<button type="button" class="SiigoButtonPrimary">Guardar</button>`;
+
+function vistaComprobante(tipo) {
+    const contenido = document.getElementById('contenido');
+    contenido.innerHTML = '';
+    tablaAc.hidden = true;
+    estado.comprobante = {tipo: tipo, proveedor: null, lineas: [], forma_pago: null};
+    despues('formulario', () => {
+        contenido.innerHTML = tipo === 'nota' ? HTML_NOTA : HTML_FACTURA;
+        prepararComprobante(contenido);
+    });
+}
+
+// ---------------------------------------------------------------- formulario
+function agregarOpciones(select, textos) {
+    despues('desplegable', () => {
+        for (const texto of textos) {
+            select.add(new Option(texto, texto));
+        }
+    });
+}
+
+function mostrarResultados(input, campo, textos) {
+    const posicion = input.getBoundingClientRect();
+    tablaAc.style.left = `${posicion.left + window.scrollX}px`;
+    tablaAc.style.top = `${posicion.bottom + window.scrollY}px`;
+    tablaAc.dataset.campo = campo;
+    // Los textos llevan espacios alrededor, igual que en Siigo
+    tablaAc.tBodies[0].innerHTML = textos.map(texto => `<tr><td><div> ${texto} </div></td></tr>`).join('');
+    tablaAc.hidden = false;
+}
+
+function prepararAutocompletado(contenedor) {
+    const campo = contenedor.dataset.campo;
+    const input = contenedor.querySelector('input');
+    let consulta = 0;
+    input.addEventListener('input', () => {
+        const actual = ++consulta;
+        delete input.dataset.seleccionado;
+        tablaAc.hidden = true;
+        despues('autocompletado', () => {
+            if (actual === consulta && input.value) {
+                mostrarResultados(input, campo, [`${input.value} - ${campo}`]);
+            }
+        });
+    });
+    input.addEventListener('keydown', (evento) => {
+        if (evento.key !== 'Enter' || tablaAc.hidden || tablaAc.dataset.campo !== campo) {
+            return;
+        }
+        tablaAc.hidden = true;
+        input.dataset.seleccionado = input.value;
+        if (campo === 'proveedor') {
+            verificarTercero(input);
+        }
+    });
+}
+
+function verificarTercero(input) {
+    const nit = input.value.trim();
+    api(`/api/terceros?empresa=${encodeURIComponent(estado.empresa)}&nit=${encodeURIComponent(nit)}`)
+        .then(respuesta => {
+            if (respuesta.existe) {
+                estado.comprobante.proveedor = nit;
+                return;
+            }
+            input.value = '';
+            delete input.dataset.seleccionado;
+            despues('modal_tercero', mostrarModalTercero);
+        });
+}
+
+function prepararComprobante(contenido) {
+    for (const contenedor of contenido.querySelectorAll('.autocompletecontainer')) {
+        prepararAutocompletado(contenedor);
+    }
+    const tipoDocumento = contenido.querySelector("[value='ERPDocumentTypeID'] select");
+    if (tipoDocumento) {
+        agregarOpciones(tipoDocumento, ['FC - 1 - Compra', 'FC - 2 - Gasto']);
+        agregarOpciones(contenido.querySelector('#trEditRow select'),
+            ['Producto', 'Activo fijo', 'Gasto / Cuenta contable']);
+        const agregar = contenido.querySelector('.agregar-item');
+        agregar.textContent = ' Agregar otro ítem ';
+        agregar.addEventListener('click', () => agregarLinea(contenido));
+    }
+
+    const formaPago = contenido.querySelector('#editingAcAccount_autocompleteInput');
+    formaPago.addEventListener('click', () => {
+        despues('autocompletado', () => {
+            mostrarResultados(formaPago, 'forma_pago', ['Otras cuentas por pagar', 'Caja general']);
+        });
+    });
+    tablaAc.onclick = (evento) => {
+        const opcion = evento.target.closest('div');
+        if (!opcion || tablaAc.dataset.campo !== 'forma_pago') {
+            return;
+        }
+        formaPago.value = opcion.textContent.trim();
+        estado.comprobante.forma_pago = formaPago.value;
+        tablaAc.hidden = true;
+        if (Math.random() < CONFIG.probabilidad_emergente) {
+            mostrarEmergente();
+        }
+    };
+    contenido.querySelector('.SiigoButtonPrimary').addEventListener('click', () => guardar(contenido));
+}
+
+function lineaActual(contenido) {
+    const fila = contenido.querySelector('#trEditRow');
+    const producto = fila.querySelector('.autocompletecontainer input');
+    const valor = fila.querySelector("input[name='valor']");
+    return {
+        fila: fila, producto: producto, valor: valor,
+        datos: {
+            tipo: fila.querySelector('siigo-dropdownenum select').value,
+            producto: producto.dataset.seleccionado || null,
+            valor: valor.value,
+            impuesto: fila.querySelector('#dropdown_dropdownSelect').value,
+        },
+    };
+}
+
+function agregarLinea(contenido) {
+    const linea = lineaActual(contenido);
+    if (linea.datos.producto && linea.datos.valor) {
+        estado.comprobante.lineas.push(linea.datos);
+    }
+    linea.fila.querySelector('siigo-dropdownenum select').selectedIndex = 0;
+    linea.producto.value = '';
+    delete linea.producto.dataset.seleccionado;
+    linea.valor.value = '';
+}
+
+function mostrarEmergente() {
+    const emergente = document.createElement('div');
+    emergente.className = 'emergente';
+    emergente.innerHTML = 'Aviso del sistema <i class="icon-siigo-simbolos-cerrar red">x</i>';
+    emergente.querySelector('i').addEventListener('click', () => emergente.remove());
+    document.body.appendChild(emergente);
+}
+
+function errores(contenido) {
+    const comprobante = estado.comprobante;
+    const faltantes = [];
+    if (!comprobante.forma_pago) {
+        faltantes.push('forma de pago');
+    }
+    if (comprobante.tipo === 'nota') {
+        if (!contenido.querySelector('.autocompletecontainer input').dataset.seleccionado) {
+            faltantes.push('factura de compra');
+        }
+        return faltantes;
+    }
+    if (!contenido.querySelector("[value='ERPDocumentTypeID'] select").value) {
+        faltantes.push('tipo de documento');
+    }
+    if (!contenido.querySelector("input[name='fecha']").value) {
+        faltantes.push('fecha');
+    }
+    if (!comprobante.proveedor) {
+        faltantes.push('proveedor');
+    }
+    if (!contenido.querySelector('#txtExternalConsecutive').value) {
+        faltantes.push('número de factura del proveedor');
+    }
+    const linea = lineaActual(contenido).datos;
+    if (!comprobante.lineas.length && !(linea.producto && linea.valor)) {
+        faltantes.push('ítems');
+    }
+    return faltantes;
+}
+
+function guardar(contenido) {
+    document.querySelectorAll('.emergente').forEach(emergente => emergente.remove());
+    const faltantes = errores(contenido);
+    if (faltantes.length) {
+        contenido.querySelector('.errores').textContent = `Faltan: ${faltantes.join(', ')}`;
+        return;
+    }
+    const comprobante = estado.comprobante;
+    if (comprobante.tipo === 'factura') {
+        const linea = lineaActual(contenido).datos;
+        if (linea.producto && linea.valor) {
+            comprobante.lineas.push(linea);
+        }
+        comprobante.prefijo = contenido.querySelector('#txtExternalPrefix').value;
+        comprobante.consecutivo = contenido.querySelector('#txtExternalConsecutive').value;
+        comprobante.fecha = contenido.querySelector("input[name='fecha']").value;
+    }
+    comprobante.empresa = estado.empresa;
+    despues('guardar', () => {
+        api('/api/comprobantes', comprobante).then(respuesta => {
+            const titulo = comprobante.tipo === 'nota' ? 'Nota débito' : 'Factura de compra';
+            contenido.innerHTML = `<div class="title-container">${titulo}: ${respuesta.numero}</div>`;
+        });
+    });
+}
+
+// ---------------------------------------------------------------- modal de terceros
+const HTML_MODAL_TERCERO = `
+<div class="modal-dialog"><div class="modal-wrapper"><div class="modal-content">
+    <h3>Crear tercero</h3>
+    <div id="CO-CL-MX"><div><siigo-dropdownlist-web></siigo-dropdownlist-web></div></div>
+    <div id="CO_P_E-2"><div><siigo-identification-input-web></siigo-identification-input-web></div></div>
+    <div id="MX_MR_EX-CO_E-1"><div><siigo-textfield-web>Razón social</siigo-textfield-web></div></div>
+    <div id="MX_FS-CO_P-1"><div><siigo-textfield-web>Nombres</siigo-textfield-web></div></div>
+    <div id="MX_FS-CO_P2"><div><siigo-textfield-web>Apellidos</siigo-textfield-web></div></div>
+    <div class="responsabilidades">
+        <label><input type="checkbox"><span>O-13</span></label>
+        <label><input type="checkbox"><span>O-15</span></label>
+        <label><input type="checkbox"><span>O-23</span></label>
+        <label><input type="checkbox"><span>O-47</span></label>
+    </div>
+    <div class="errores"></div>
+    <div class="modal-footer"><div>
+        <siigo-button-atom data-accion="cancelar">Cancelar</siigo-button-atom>
+        <siigo-button-atom data-accion="guardar">Guardar</siigo-button-atom>
+    </div></div>
+</div></div></div>`;
+
+function mostrarModalTercero() {
+    const modal = document.createElement('modal-container');
+    modal.innerHTML = HTML_MODAL_TERCERO;
+    document.body.appendChild(modal);
+    const valorDe = (selector) =>
+        modal.querySelector(selector).shadowRoot.querySelector('input').value.trim();
+    modal.querySelector("[data-accion='cancelar']").addEventListener('click', () => modal.remove());
+    modal.querySelector("[data-accion='guardar']").addEventListener('click', () => {
+        const tipo = modal.querySelector('siigo-dropdownlist-web').dataset.valor;
+        const nit = valorDe('#CO_P_E-2 siigo-identification-input-web');
+        const nombre = valorDe('#MX_MR_EX-CO_E-1 siigo-textfield-web') ||
+            valorDe('#MX_FS-CO_P-1 siigo-textfield-web');
+        if (!tipo || !nit || !nombre) {
+            modal.querySelector('.errores').textContent = 'Faltan datos del tercero';
+            return;
+        }
+        api('/api/terceros', {empresa: estado.empresa, nit: nit, nombre: nombre, tipo: tipo})
+            .then(() => despues('modal_tercero', () => modal.remove()));
+    });
+}
+
+// ---------------------------------------------------------------- inicio
+if (document.cookie.split('; ').some(cookie => cookie.startsWith('sesion_simulada='))) {
+    vistaEmpresas();
+} else {
+    vistaLogin();
+}
+</script>
+</body>
+</html>
+"""
+
+
+class SimuladorSiigo:
+    """
+    Servidor local que imita las páginas de Siigo que recorre el bot, para medir
+    y probar el flujo web sin red ni tenant real.
+
+    Los terceros y los comprobantes guardados quedan en memoria (compartidos por
+    todas las sesiones del navegador, como en Siigo).
+
+    Parámetros:
+        puerto (int): Puerto local; 0 elige uno libre.
+        latencias (dict): Latencias (s) que reemplazan a LATENCIAS_POR_DEFECTO.
+        empresas (dict): {nit: nombre} de la tabla de empresas.
+        terceros (iterable): (empresa, nit) que ya existen en Siigo.
+        probabilidad_emergente (float): Probabilidad de la ventana emergente
+            después de elegir la forma de pago.
+    """
+
+    def __init__(self, puerto=0, latencias=None, empresas=None, terceros=(),
+                 probabilidad_emergente=0.0):
+        self.latencias = dict(LATENCIAS_POR_DEFECTO)
+        self.latencias.update(latencias or {})
+        self.empresas = {str(nit): nombre for nit, nombre in (empresas or {}).items()}
+        self.probabilidad_emergente = probabilidad_emergente
+        self.terceros = {(str(empresa), str(nit)) for empresa, nit in terceros}
+        self.comprobantes = []
+        self._candado = threading.Lock()
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", puerto), _ManejadorSiigo)
+        self._servidor.simulador = self
+        self._hilo = None
+
+    @property
+    def url(self):
+        host, puerto = self._servidor.server_address[:2]
+        return f"http://{host}:{puerto}/"
+
+    def pagina(self):
+        configuracion = {
+            "latencias": self.latencias,
+            "empresas": self.empresas,
+            "probabilidad_emergente": self.probabilidad_emergente,
+        }
+        return PAGINA_SIMULADA.replace("__CONFIG__", json.dumps(configuracion))
+
+    def tercero_existe(self, empresa, nit):
+        with self._candado:
+            return (str(empresa), str(nit)) in self.terceros
+
+    def registrar_tercero(self, empresa, nit):
+        with self._candado:
+            self.terceros.add((str(empresa), str(nit)))
+
+    def guardar_comprobante(self, comprobante):
+        """Guarda el comprobante y retorna el número asignado (FC-1-n o ND-1-n)."""
+        with self._candado:
+            self.comprobantes.append(comprobante)
+            prefijo = "ND" if comprobante.get("tipo") == "nota" else "FC"
+            return f"{prefijo}-1-{len(self.comprobantes)}"
+
+    def iniciar(self):
+        """Atiende las peticiones en un hilo de fondo."""
+        self._hilo = threading.Thread(
+            target=self._servidor.serve_forever, name="siigo-simulado", daemon=True)
+        self._hilo.start()
+        logging.info(f"Siigo simulado escuchando en {self.url}")
+        return self
+
+    def detener(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+        if self._hilo is not None:
+            self._hilo.join()
+
+
+class _ManejadorSiigo(BaseHTTPRequestHandler):
+
+    def _responder(self, cuerpo, tipo="application/json", estado=200):
+        datos = cuerpo.encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+        self.send_header("Content-Length", str(len(datos)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def do_GET(self):
+        simulador = self.server.simulador
+        url = urlparse(self.path)
+        if url.path == "/api/terceros":
+            consulta = parse_qs(url.query)
+            existe = simulador.tercero_existe(
+                consulta.get("empresa", [""])[0], consulta.get("nit", [""])[0])
+            self._responder(json.dumps({"existe": existe}))
+        elif url.path == "/api/comprobantes":
+            self._responder(json.dumps(simulador.comprobantes, ensure_ascii=False))
+        elif url.path.startswith("/api/"):
+            self._responder(json.dumps({"error": "no encontrado"}), estado=404)
+        else:
+            self._responder(simulador.pagina(), tipo="text/html")
+
+    def do_POST(self):
+        simulador = self.server.simulador
+        longitud = int(self.headers.get("Content-Length", 0))
+        try:
+            datos = json.loads(self.rfile.read(longitud) or b"{}")
+        except ValueError:
+            self._responder(json.dumps({"error": "JSON no válido"}), estado=400)
+            return
+        ruta = urlparse(self.path).path
+        if ruta == "/api/terceros":
+            simulador.registrar_tercero(datos.get("empresa"), datos.get("nit"))
+            self._responder(json.dumps({"existe": True}))
+        elif ruta == "/api/comprobantes":
+            self._responder(json.dumps({"numero": simulador.guardar_comprobante(datos)}))
+        else:
+            self._responder(json.dumps({"error": "no encontrado"}), estado=404)
+
+    def log_message(self, formato, *argumentos):
+        logging.debug(f"Siigo simulado: {formato % argumentos}")
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(
+        description="Servidor local que imita las páginas de Siigo usadas por el bot.")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--empresa", action="append", default=[],
+                        help="NIT de una empresa de la tabla (se puede repetir).")
+    parser.add_argument("--latencias", type=json.loads, default={},
+                        help='Latencias en segundos, p. ej. \'{"guardar": 2}\'.')
+    parser.add_argument("--probabilidad-emergente", type=float, default=0.0)
+    opciones = parser.parse_args(argumentos)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    simulador = SimuladorSiigo(
+        opciones.puerto, opciones.latencias,
+        {nit: f"Empresa {nit}" for nit in opciones.empresa or ["900000001"]},
+        probabilidad_emergente=opciones.probabilidad_emergente)
+    simulador.iniciar()
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        simulador.detener()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,148 @@
+import os
+import time
+import logging
+from contextlib import contextmanager
+
+try:
+    import win32con
+    import win32event
+    import win32file
+except ImportError:  # Fuera de Windows: sondeo de la carpeta
+    win32file = None
+
+# Extensiones de las descargas que aún se están escribiendo
+EXTENSIONES_PARCIALES = (".crdownload", ".part", ".partial", ".download", ".tmp")
+
+
+def es_pdf_completo(ruta):
+    """El PDF se puede abrir y termina con la marca %%EOF (no está a medio escribir)."""
+    try:
+        with open(ruta, "rb") as f:
+            if f.read(5) != b"%PDF-":
+                return False
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - 1024, 0))
+            return b"%%EOF" in f.read()
+    except OSError:
+        # En Windows el archivo sigue bloqueado mientras la aplicación lo escribe
+        return False
+
+
+class VigilanteDescargas:
+    """
+    Detecta el PDF que llega a la carpeta de descargas después de cada clic en
+    "Descargar" y lo atribuye al CUFE que lo pidió.
+
+    Antes del clic se toma una foto de la carpeta (marcar); esperar solo
+    considera los archivos que aparecen o cambian después de esa foto, así que
+    nunca se toma un PDF anterior. Un PDF ya atribuido tampoco se vuelve a
+    entregar, salvo que otra descarga lo reescriba con el mismo nombre. Un
+    archivo está listo cuando su tamaño no cambia durante "estabilidad"
+    segundos, no tiene extensión de descarga parcial y es un PDF completo.
+
+    En Windows la espera se despierta con las notificaciones de cambios de la
+    carpeta (FindFirstChangeNotification de pywin32); en otros sistemas se
+    sondea cada "sondeo" segundos.
+
+    Parámetros:
+        carpeta (str): Carpeta de descargas.
+        extension (str): Extensión de los archivos esperados.
+        estabilidad (float): Tiempo que el tamaño debe quedar fijo (s).
+        sondeo (float): Intervalo máximo entre revisiones de la carpeta (s).
+    """
+
+    def __init__(self, carpeta, extension=".pdf", estabilidad=0.3, sondeo=0.2):
+        self.carpeta = str(carpeta)
+        self.extension = extension.lower()
+        self.estabilidad = float(estabilidad)
+        self.sondeo = float(sondeo)
+        self.atribuciones = {}
+        # ruta -> (tamaño, modificación) del archivo cuando se atribuyó; si el
+        # nombre se reutiliza en otra descarga la firma cambia y se vuelve a tomar
+        self._atribuidos = {}
+        self._foto = {}
+
+    def _listar(self):
+        archivos = {}
+        try:
+            with os.scandir(self.carpeta) as entradas:
+                for entrada in entradas:
+                    nombre = entrada.name.lower()
+                    if not nombre.endswith(self.extension) or nombre.endswith(EXTENSIONES_PARCIALES):
+                        continue
+                    try:
+                        estado = entrada.stat()
+                    except OSError:
+                        continue
+                    archivos[entrada.path] = (estado.st_size, estado.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return archivos
+
+    def marcar(self):
+        """Foto de la carpeta justo antes de pedir una descarga."""
+        self._foto = self._listar()
+
+    @contextmanager
+    def _notificaciones(self):
+        """Función esperar_cambio(segundos) que retorna antes si la carpeta cambia."""
+        if win32file is None:
+            yield time.sleep
+            return
+        manejador = win32file.FindFirstChangeNotification(
+            self.carpeta, False,
+            win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_SIZE
+            | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE)
+
+        def esperar_cambio(segundos):
+            resultado = win32event.WaitForSingleObject(manejador, int(segundos * 1000))
+            if resultado == win32event.WAIT_OBJECT_0:
+                win32file.FindNextChangeNotification(manejador)
+
+        try:
+            yield esperar_cambio
+        finally:
+            win32file.FindCloseChangeNotification(manejador)
+
+    def esperar(self, cufe=None, maximo=60):
+        """
+        Espera el PDF nuevo desde la última foto y lo atribuye al CUFE. Si llegan
+        varios, se prefiere el que tiene el CUFE en el nombre y luego el primero
+        que apareció.
+
+        Retorno:
+            str: Ruta del PDF descargado, o None si no llegó dentro del máximo (s).
+        """
+        limite = time.monotonic() + maximo
+        # ruta -> (tamaño, momento desde el que no cambia, orden de aparición)
+        candidatos = {}
+        with self._notificaciones() as esperar_cambio:
+            while True:
+                ahora = time.monotonic()
+                firmas = self._listar()
+                for ruta, firma in firmas.items():
+                    if self._foto.get(ruta) == firma or self._atribuidos.get(ruta) == firma:
+                        continue
+                    tamano = firma[0]
+                    anterior = candidatos.get(ruta)
+                    if anterior is None or anterior[0] != tamano:
+                        orden = anterior[2] if anterior else len(candidatos)
+                        candidatos[ruta] = (tamano, ahora, orden)
+
+                listos = [
+                    ruta for ruta, (tamano, desde, _) in candidatos.items()
+                    if tamano > 0 and ahora - desde >= self.estabilidad and es_pdf_completo(ruta)]
+                if listos:
+                    listos.sort(key=lambda ruta: (
+                        not (cufe and cufe.lower() in os.path.basename(ruta).lower()),
+                        candidatos[ruta][2]))
+                    ruta = listos[0]
+                    self.atribuciones[ruta] = cufe
+                    self._atribuidos[ruta] = firmas.get(ruta)
+                    logging.info(f"Descarga de {cufe} lista: {ruta}")
+                    return ruta
+
+                if ahora >= limite:
+                    logging.warning(f"No llegó ningún PDF para {cufe} en {maximo} s.")
+                    return None
+                esperar_cambio(min(self.sondeo, limite - ahora))
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del bot se importan por nombre desde ACAFI/src, como al ejecutar main.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
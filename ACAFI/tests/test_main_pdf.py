@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+from benchmark_pdf import comparar_campos
+from corpus_facturas import generar_corpus
+from main_pdf import (
+    CAMPO_FORMA_PAGO, CAMPO_NIT_EMISOR, CAMPO_TOTAL_IVA, CAMPO_VENDEDOR, MOTOR_CAMPOS,
+    process_pdf)
+
+VENDEDOR = "Datos del Emisor / Vendedor"
+COMPRADOR = "Datos del Adquiriente / Comprador"
+
+
+def test_gana_la_primera_etiqueta():
+    texto = "Forma de pago: Contado\nNotas\nForma de pago: Crédito\n"
+    assert MOTOR_CAMPOS.extraer(texto)[CAMPO_FORMA_PAGO] == "Contado"
+
+
+def test_gana_la_ultima_etiqueta_en_la_seccion_del_vendedor():
+    texto = (f"{VENDEDOR}\nDepartamento: Antioquia\nDepartamento: Caldas\n"
+             f"{COMPRADOR}\nDepartamento: Cundinamarca\n")
+    assert MOTOR_CAMPOS.extraer(texto)[CAMPO_VENDEDOR]["Departamento"] == "Caldas"
+
+
+def test_campo_de_seccion_fuera_de_su_seccion():
+    texto = f"Departamento: Antioquia\n{VENDEDOR}\nNit del Emisor: 900.123.456-7\n"
+    resultado = MOTOR_CAMPOS.extraer(texto)
+    assert resultado[CAMPO_VENDEDOR]["Departamento"] is None
+    assert resultado[CAMPO_NIT_EMISOR] == "900123456"
+
+
+def test_seccion_cerrada_no_aporta_valores():
+    texto = f"{VENDEDOR}\nNit del Emisor: 900.123.456-7\n{COMPRADOR}\nDepartamento: Cundinamarca\n"
+    assert MOTOR_CAMPOS.extraer(texto)[CAMPO_VENDEDOR]["Departamento"] is None
+
+
+def test_escaneo_completo_al_cerrar_la_seccion():
+    escaneo = MOTOR_CAMPOS.escaneo((CAMPO_VENDEDOR,))
+    escaneo.agregar(f"{VENDEDOR}\nDepartamento: Antioquia\n")
+    assert not escaneo.completo
+    # La sección del comprador empieza en la página siguiente: los campos del
+    # vendedor que faltaban ya no pueden aparecer
+    escaneo.agregar(f"{COMPRADOR}\nRégimen Fiscal: O-13\n")
+    assert escaneo.completo
+    assert escaneo.resultados()[CAMPO_VENDEDOR] == {
+        "Tipo de contribuyente": None, "Departamento": "Antioquia", "Régimen fiscal": None}
+
+
+def test_dos_campos_en_la_misma_linea():
+    texto = f"{VENDEDOR}\nRazón Social: Ferretería S.A.S.    Departamento: Antioquia\n"
+    assert MOTOR_CAMPOS.extraer(texto)[CAMPO_VENDEDOR]["Departamento"] == "Antioquia"
+
+
+@pytest.mark.parametrize("linea", [
+    "IVA 38.000,00",
+    "IVA 19% 38.000,00",
+    "IVA (19%) 38.000,00",
+    "Total IVA 19 % 38.000,00",
+    "Total IVA: 38.000,00",
+])
+def test_total_iva_salta_la_tarifa(linea):
+    assert MOTOR_CAMPOS.extraer(f"Totales\n{linea}\n")[CAMPO_TOTAL_IVA] == "38000.00"
+
+
+def test_total_iva_solo_con_tarifa():
+    assert MOTOR_CAMPOS.extraer("IVA 19%\n")[CAMPO_TOTAL_IVA] is None
+
+
+def test_process_pdf_sobre_el_corpus(tmp_path):
+    esperado = generar_corpus(str(tmp_path), documentos=12, semilla=7)
+    for nombre, valores in esperado.items():
+        aciertos = comparar_campos(process_pdf(os.path.join(tmp_path, nombre)), valores)
+        assert all(aciertos.values()), (nombre, aciertos)
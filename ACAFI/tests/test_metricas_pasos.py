@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+# esperas (contadores de tiempo por hilo) importa selenium
+pytest.importorskip("selenium")
+from esperas import pausar
+from metricas_pasos import MetricasPasos
+
+
+@pytest.fixture
+def metricas(tmp_path):
+    return MetricasPasos(str(tmp_path / "metricas" / "pasos.jsonl"), "900123456.xlsx")
+
+
+def test_paso_registra_la_duracion_y_las_pausas(metricas):
+    with metricas.paso("ingresar_cliente", cufe="c1", fila=0):
+        pausar(0.05)
+    medicion = metricas.mediciones[0]
+    assert (medicion["paso"], medicion["cufe"], medicion["fila"], medicion["ok"]) == (
+        "ingresar_cliente", "c1", 0, True)
+    assert medicion["pausa"] >= 0.05
+    assert medicion["segundos"] >= medicion["pausa"]
+
+
+def test_paso_fallido_se_registra_y_propaga(metricas):
+    with pytest.raises(RuntimeError):
+        with metricas.paso("login"):
+            raise RuntimeError("sin sesión")
+    assert metricas.mediciones[0]["ok"] is False
+
+
+def test_resumen(metricas):
+    for segundos in (0.01, 0.02, 0.03):
+        with metricas.paso("ingresar_datos_factura"):
+            pausar(segundos)
+    with metricas.paso("login"):
+        pass
+    metricas.factura("c1", 0, True, 12.0)
+    metricas.factura("c2", 1, False, 8.0)
+
+    resumen = metricas.resumen()
+    pasos = resumen["pasos"]
+    assert set(pasos) == {"ingresar_datos_factura", "login"}
+    assert pasos["ingresar_datos_factura"]["n"] == 3
+    duraciones = sorted(m["segundos"] for m in metricas.mediciones
+                        if m["paso"] == "ingresar_datos_factura")
+    assert pasos["ingresar_datos_factura"]["p50"] == duraciones[1]
+    assert pasos["ingresar_datos_factura"]["p95"] == duraciones[2]
+    assert (resumen["facturas"], resumen["facturas_exitosas"]) == (2, 1)
+    assert resumen["facturas_por_hora"] > 0
+    assert resumen["pausas_s"] == pytest.approx(0.06, abs=0.01)
+    assert 0 < resumen["pausas_pct"] <= 100
+    assert "ingresar_datos_factura: n=3" in metricas.texto_resumen()
+
+
+def test_jsonl_una_linea_por_medicion(metricas):
+    with metricas.paso("guardar_excel"):
+        pass
+    metricas.factura("c1", 0, True, 3.5)
+    with open(metricas.ruta_jsonl, encoding="utf-8") as f:
+        lineas = [json.loads(linea) for linea in f]
+    assert [linea["paso"] for linea in lineas] == ["guardar_excel", "factura"]
+    assert all(linea["archivo"] == "900123456.xlsx" for linea in lineas)
+    # Las facturas no cuentan como pasos en el resumen
+    assert set(metricas.resumen()["pasos"]) == {"guardar_excel"}
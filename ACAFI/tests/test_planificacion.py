@@ -0,0 +1,95 @@
+import pytest
+
+# main.py necesita selenium, pandas y pywin32 (solo en el equipo del bot)
+main = pytest.importorskip("main")
+from registros_factura import RegistroFactura
+from reintentos_filas import FilaRechazada
+
+NIT_CLIENTE = "900123456"
+CONFIG_CLIENTES = {
+    NIT_CLIENTE: {
+        "nombre": "Cliente de prueba", "centro de costo": "nulo",
+        "iva": "IVA 19 MV", "codigo_iva": "2408",
+    },
+}
+DATOS_PDF = {"Forma de Pago": "Contado", "Total Bruto Factura": "100000.00"}
+
+
+def registro(cufe="cufe1", tipo_documento="Factura electrónica", iva="19000",
+             valor_total="119000", codigo_producto="1001"):
+    return RegistroFactura(
+        0, cufe, "FE1", "15/01/2025", iva, codigo_producto, "800111222",
+        "Proveedor SAS", "Cliente de prueba", "FE", "1", tipo_documento, "", valor_total)
+
+
+@pytest.fixture
+def carpeta_pdf(tmp_path):
+    (tmp_path / NIT_CLIENTE).mkdir()
+    (tmp_path / NIT_CLIENTE / "cufe1.pdf").write_bytes(b"%PDF-1.4\n%%EOF\n")
+    return str(tmp_path)
+
+
+def planificar(fila, carpeta_pdf):
+    return main.planificar_fila(
+        fila, carpeta_pdf, NIT_CLIENTE, CONFIG_CLIENTES, {"cufe1": (dict(DATOS_PDF), None)})
+
+
+@pytest.mark.parametrize("iva", ["", " - ", "0", "nan", 0, float("nan")])
+def test_calcular_linea_iva_sin_iva(iva):
+    assert main.calcular_linea_iva("100000", iva, "119000") is None
+
+
+def test_calcular_linea_iva_total_con_19_por_ciento():
+    assert main.calcular_linea_iva("100000", "19000", "119000") == "impuesto"
+
+
+def test_calcular_linea_iva_total_distinto():
+    assert main.calcular_linea_iva("100000", "5000", "105000") == "item"
+
+
+def test_calcular_linea_iva_valor_no_numerico():
+    with pytest.raises(ValueError):
+        main.calcular_linea_iva("Desconocido", "19000", "119000")
+
+
+def test_planificar_fila_factura(carpeta_pdf):
+    plan = planificar(registro(), carpeta_pdf)
+    assert not plan.es_nota
+    assert plan.linea_iva == "impuesto"
+    assert plan.valor == "100000.00"
+    assert plan.fecha_formateada == "15/01/2025"
+    assert plan.codigo_iva == "2408"
+
+
+def test_planificar_fila_nota_toma_la_referencia(carpeta_pdf, monkeypatch):
+    monkeypatch.setattr(main, "extract_reference_invoice", lambda ruta: "FE77")
+    plan = planificar(registro(tipo_documento="Nota crédito"), carpeta_pdf)
+    assert plan.es_nota
+    assert plan.referencia_nota == "FE77"
+    assert plan.linea_iva is None
+
+
+def test_planificar_fila_nota_sin_referencia(carpeta_pdf, monkeypatch):
+    monkeypatch.setattr(main, "extract_reference_invoice", lambda ruta: None)
+    with pytest.raises(FilaRechazada):
+        planificar(registro(tipo_documento="Nota crédito"), carpeta_pdf)
+
+
+@pytest.mark.parametrize("fila", [
+    None,
+    registro(cufe="nan"),
+    registro(cufe="otro"),
+    registro(codigo_producto="nan"),
+    registro(valor_total="no es un número"),
+])
+def test_planificar_fila_rechazos(fila, carpeta_pdf):
+    with pytest.raises(FilaRechazada):
+        planificar(fila, carpeta_pdf)
+
+
+def test_planificar_fila_iva_como_item_sin_codigo(carpeta_pdf):
+    config = {NIT_CLIENTE: dict(CONFIG_CLIENTES[NIT_CLIENTE], codigo_iva="nan")}
+    with pytest.raises(FilaRechazada):
+        main.planificar_fila(
+            registro(iva="5000", valor_total="105000"), carpeta_pdf, NIT_CLIENTE, config,
+            {"cufe1": (dict(DATOS_PDF), None)})
@@ -0,0 +1,99 @@
+import json
+import logging
+
+import pytest
+
+from registro_eventos import (
+    FiltroContexto, configurar_logging, contexto_log, detener_logging, fijar_contexto)
+
+
+def registro(nivel=logging.INFO, **extra):
+    record = logging.LogRecord("prueba", nivel, __file__, 1, "mensaje", None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+@pytest.fixture(autouse=True)
+def contexto_limpio():
+    fijar_contexto(archivo=None, cufe=None, fila=None, paso=None)
+    yield
+    fijar_contexto(archivo=None, cufe=None, fila=None, paso=None)
+
+
+def test_copia_el_contexto_del_hilo():
+    record = registro()
+    with contexto_log(archivo="a.xlsx", cufe="c1", fila=3):
+        with contexto_log(paso="login"):
+            assert FiltroContexto().filter(record)
+    assert (record.archivo, record.cufe, record.fila, record.paso) == ("a.xlsx", "c1", 3, "login")
+
+
+def test_contextos_anidados_se_restauran():
+    with contexto_log(fila=1):
+        with contexto_log(fila=2):
+            pass
+        record = registro()
+        FiltroContexto().filter(record)
+    assert record.fila == 1
+    record = registro()
+    FiltroContexto().filter(record)
+    assert record.fila is None
+
+
+def test_no_reemplaza_campos_del_registro():
+    record = registro(cufe="propio")
+    with contexto_log(cufe="del hilo"):
+        FiltroContexto().filter(record)
+    assert record.cufe == "propio"
+
+
+def test_detalle_deja_pasar_todo():
+    with contexto_log(fila=1):
+        assert FiltroContexto(solo_resumen=False).filter(registro())
+
+
+@pytest.mark.parametrize("nivel, extra, pasa", [
+    (logging.INFO, {}, False),
+    (logging.DEBUG, {}, False),
+    (logging.INFO, {"resumen": True}, True),
+    (logging.WARNING, {}, True),
+    (logging.ERROR, {}, True),
+])
+def test_produccion_dentro_de_una_fila(nivel, extra, pasa):
+    with contexto_log(fila=5):
+        assert FiltroContexto(solo_resumen=True).filter(registro(nivel, **extra)) is pasa
+
+
+def test_produccion_fuera_de_una_fila():
+    assert FiltroContexto(solo_resumen=True).filter(registro())
+
+
+@pytest.fixture
+def raiz_original():
+    raiz = logging.getLogger()
+    manejadores, nivel = list(raiz.handlers), raiz.level
+    yield
+    detener_logging()
+    for manejador in list(raiz.handlers):
+        raiz.removeHandler(manejador)
+    for manejador in manejadores:
+        raiz.addHandler(manejador)
+    raiz.setLevel(nivel)
+
+
+def test_archivo_jsonl_en_produccion(tmp_path, raiz_original):
+    ruta = tmp_path / "logs" / "script.jsonl"
+    configurar_logging(str(ruta), nivel="produccion", consola=False)
+    with contexto_log(archivo="a.xlsx", cufe="c1", fila=0):
+        logging.info("paso intermedio")
+        logging.info("Factura c1 exitosa", extra={"resumen": True})
+        logging.warning("advertencia de la fila")
+    detener_logging()
+
+    eventos = [json.loads(linea) for linea in ruta.read_text(encoding="utf-8").splitlines()]
+    mensajes = [evento["mensaje"] for evento in eventos]
+    assert "paso intermedio" not in mensajes
+    resumen = eventos[mensajes.index("Factura c1 exitosa")]
+    assert resumen["resumen"] is True
+    assert (resumen["archivo"], resumen["cufe"], resumen["fila"]) == ("a.xlsx", "c1", 0)
+    assert "advertencia de la fila" in mensajes
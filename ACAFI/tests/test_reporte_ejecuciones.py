@@ -0,0 +1,107 @@
+import gzip
+import json
+
+from estadisticas import percentil
+from reporte_ejecuciones import analizar_logs, generar_reporte, normalizar_causa
+
+LOG_TEXTO = """\
+2025-04-03 08:00:00,000 - INFO - MainThread - Iniciando la ejecución del script principal.
+2025-04-03 08:00:01,000 - INFO - trabajador-1 - Archivo Excel cargado correctamente: C:\\inputs\\900123456.xlsx
+2025-04-03 08:00:01,500 - INFO - trabajador-2 - Archivo Excel cargado correctamente: C:\\inputs\\800555666.xlsx
+2025-04-03 08:00:02,000 - WARNING - trabajador-1 - Fila 4 rechazada antes del navegador: La fila no tiene CUFE/CUDE.
+2025-04-03 08:00:10,000 - INFO - trabajador-1 - Procesando fila 1 del archivo Excel.
+2025-04-03 08:00:12,000 - INFO - trabajador-2 - Procesando fila 1 del archivo Excel.
+2025-04-03 08:00:40,000 - INFO - trabajador-1 - La factura se procesó correctamente.
+2025-04-03 08:00:41,000 - INFO - trabajador-1 - Procesando fila 2 del archivo Excel.
+2025-04-03 08:00:52,000 - ERROR - trabajador-2 - Error al procesar la fila 1: Message: timeout esperando 900123456
+Traceback (most recent call last):
+  File "main.py", line 1, in <module>
+2025-04-03 08:01:01,000 - ERROR - trabajador-1 - Error al procesar la fila 2: Message: timeout esperando 800555666
+2025-04-03 08:01:02,000 - INFO - trabajador-1 - Esperando 30 s antes del siguiente lote...
+2025-04-03 08:01:32,000 - INFO - trabajador-1 - Procesando fila 2 del archivo Excel.
+2025-04-03 08:02:02,000 - INFO - trabajador-1 - La factura se procesó correctamente.
+"""
+
+
+def escribir_jsonl(ruta, eventos, comprimir=False):
+    abrir = gzip.open if comprimir else open
+    with abrir(ruta, "wt", encoding="utf-8") as f:
+        for evento in eventos:
+            f.write(json.dumps(evento, ensure_ascii=False) + "\n")
+
+
+def test_log_de_texto_con_dos_trabajadores(tmp_path):
+    ruta = tmp_path / "script.log"
+    ruta.write_text(LOG_TEXTO, encoding="utf-8")
+    analizador = analizar_logs([str(ruta)])
+
+    filas = {(fila["archivo"], fila["fila"], fila["intento"]): fila for fila in analizador.filas}
+    assert filas[("900123456.xlsx", 1, 1)]["resultado"] == "exitosa"
+    assert filas[("900123456.xlsx", 1, 1)]["segundos"] == 30.0
+    assert filas[("900123456.xlsx", 2, 1)]["resultado"] == "fallida"
+    assert filas[("900123456.xlsx", 2, 2)]["resultado"] == "exitosa"
+    assert filas[("900123456.xlsx", 4, 1)]["resultado"] == "rechazada"
+    # La fila del otro trabajador no se mezcla con las del primero
+    assert filas[("800555666.xlsx", 1, 1)]["resultado"] == "fallida"
+    assert filas[("800555666.xlsx", 1, 1)]["hilo"] == "trabajador-2"
+
+    archivos = {archivo["archivo"]: archivo for archivo in analizador.resumen_archivos()}
+    primero = archivos["900123456.xlsx"]
+    assert (primero["exitosas"], primero["fallidas"], primero["rechazadas"]) == (2, 1, 1)
+    assert primero["reintentos"] == 1
+    assert (primero["esperas"], primero["segundos_espera"]) == (1, 30.0)
+
+    # Las causas que solo difieren en números se agrupan
+    assert analizador.causas() == [
+        ("Message: timeout esperando #", 2), ("La fila no tiene CUFE/CUDE.", 1)]
+
+
+def test_log_jsonl_en_produccion(tmp_path):
+    # Con el nivel "produccion" cada fila deja solo su registro de resumen
+    ruta = tmp_path / "script.jsonl.1.gz"
+    base = {"hilo": "trabajador-1", "archivo": "900123456.xlsx"}
+    escribir_jsonl(ruta, [
+        {**base, "fecha": "2025-04-03 09:00:20,000", "nivel": "INFO", "fila": 0,
+         "cufe": "c1", "mensaje": "Factura c1 exitosa en 20.0 s.", "resumen": True},
+        {**base, "fecha": "2025-04-03 09:00:50,000", "nivel": "INFO", "fila": 1,
+         "cufe": "c2", "mensaje": "Factura c2 fallida en 25.5 s.", "resumen": True},
+        {**base, "fecha": "2025-04-03 09:01:20,000", "nivel": "INFO", "fila": 2,
+         "cufe": "c3", "mensaje": "Factura c3 exitosa en 30.0 s.", "resumen": True},
+    ], comprimir=True)
+    analizador = analizar_logs([str(ruta)])
+
+    assert [(fila["cufe"], fila["resultado"], fila["segundos"]) for fila in analizador.filas] == [
+        ("c1", "exitosa", 20.0), ("c2", "fallida", 25.5), ("c3", "exitosa", 30.0)]
+    assert {fila["archivo"] for fila in analizador.filas} == {"900123456.xlsx"}
+
+
+def test_resumen_completa_la_fila_del_nivel_detalle(tmp_path):
+    ruta = tmp_path / "script.log"
+    ruta.write_text(
+        "2025-04-03 08:00:10,000 - INFO - trabajador-1 - Procesando fila 1 del archivo Excel.\n"
+        "2025-04-03 08:00:40,000 - INFO - trabajador-1 - La factura se procesó correctamente.\n"
+        "2025-04-03 08:00:40,100 - INFO - trabajador-1 - Factura c1 exitosa en 29.5 s.\n",
+        encoding="utf-8")
+    analizador = analizar_logs([str(ruta)])
+    assert len(analizador.filas) == 1
+    assert (analizador.filas[0]["cufe"], analizador.filas[0]["segundos"]) == ("c1", 29.5)
+
+
+def test_generar_reporte(tmp_path):
+    ruta = tmp_path / "script.log"
+    ruta.write_text(LOG_TEXTO, encoding="utf-8")
+    totales = generar_reporte([str(ruta)], str(tmp_path / "reporte"))
+    assert (totales["filas"], totales["exitosas"], totales["fallidas"]) == (5, 2, 2)
+    for nombre in ("filas.csv", "archivos.csv", "causas.csv", "reporte.html"):
+        assert (tmp_path / "reporte" / nombre).exists()
+
+
+def test_normalizar_causa():
+    assert normalizar_causa("NIT 900123456 no existe\nTraceback") == "NIT # no existe"
+
+
+def test_percentil():
+    assert percentil([], 50) is None
+    assert percentil([3, 1, 2], 50) == 2
+    assert percentil(list(range(1, 101)), 95) == 95
+    assert percentil([7], 0) == 7
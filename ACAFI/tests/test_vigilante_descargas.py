@@ -0,0 +1,100 @@
+import os
+import threading
+
+from vigilante_descargas import VigilanteDescargas, es_pdf_completo
+
+PDF_COMPLETO = b"%PDF-1.4\n1 0 obj\n<<>>\nendobj\ntrailer\n<<>>\n%%EOF\n"
+
+
+def vigilante(carpeta):
+    return VigilanteDescargas(carpeta, estabilidad=0.05, sondeo=0.02)
+
+
+def despues(segundos, funcion):
+    temporizador = threading.Timer(segundos, funcion)
+    temporizador.start()
+    return temporizador
+
+
+def test_es_pdf_completo(tmp_path):
+    completo = tmp_path / "a.pdf"
+    completo.write_bytes(PDF_COMPLETO)
+    a_medias = tmp_path / "b.pdf"
+    a_medias.write_bytes(PDF_COMPLETO[:20])
+    otro = tmp_path / "c.pdf"
+    otro.write_bytes(b"<html></html>")
+    assert es_pdf_completo(str(completo))
+    assert not es_pdf_completo(str(a_medias))
+    assert not es_pdf_completo(str(otro))
+    assert not es_pdf_completo(str(tmp_path / "no_existe.pdf"))
+
+
+def test_ignora_los_pdf_anteriores_a_la_marca(tmp_path):
+    (tmp_path / "anterior.pdf").write_bytes(PDF_COMPLETO)
+    descargas = vigilante(tmp_path)
+    descargas.marcar()
+    assert descargas.esperar("cufe1", maximo=0.3) is None
+
+
+def test_ignora_las_descargas_parciales(tmp_path):
+    descargas = vigilante(tmp_path)
+    descargas.marcar()
+    (tmp_path / "cufe1.pdf.crdownload").write_bytes(PDF_COMPLETO)
+    assert descargas.esperar("cufe1", maximo=0.3) is None
+
+
+def test_espera_a_que_el_pdf_termine_de_escribirse(tmp_path):
+    ruta = tmp_path / "cufe1.pdf"
+    descargas = vigilante(tmp_path)
+    descargas.marcar()
+    ruta.write_bytes(PDF_COMPLETO[:20])
+    temporizador = despues(0.3, lambda: ruta.write_bytes(PDF_COMPLETO))
+    try:
+        assert descargas.esperar("cufe1", maximo=5) == str(ruta)
+    finally:
+        temporizador.join()
+    assert es_pdf_completo(str(ruta))
+
+
+def test_pdf_reescrito_despues_de_la_marca(tmp_path):
+    ruta = tmp_path / "cufe1.pdf"
+    ruta.write_bytes(b"%PDF-1.4\nviejo\n%%EOF\n")
+    descargas = vigilante(tmp_path)
+    descargas.marcar()
+    ruta.write_bytes(PDF_COMPLETO)
+    assert descargas.esperar("cufe1", maximo=2) == str(ruta)
+
+
+def test_prefiere_el_pdf_con_el_cufe_y_no_lo_repite(tmp_path):
+    descargas = vigilante(tmp_path)
+    descargas.marcar()
+    (tmp_path / "otro.pdf").write_bytes(PDF_COMPLETO)
+    (tmp_path / "factura_CUFE2.pdf").write_bytes(PDF_COMPLETO)
+    assert os.path.basename(descargas.esperar("cufe2", maximo=2)) == "factura_CUFE2.pdf"
+    # El PDF ya atribuido no se entrega otra vez; queda el otro
+    assert os.path.basename(descargas.esperar("cufe3", maximo=2)) == "otro.pdf"
+    assert descargas.atribuciones[str(tmp_path / "otro.pdf")] == "cufe3"
+
+
+def test_nombre_reutilizado_en_otra_descarga(tmp_path):
+    ruta = tmp_path / "documento.pdf"
+    descargas = vigilante(tmp_path)
+    descargas.marcar()
+    ruta.write_bytes(PDF_COMPLETO)
+    assert descargas.esperar("cufe1", maximo=2) == str(ruta)
+
+    # El PDF se mueve fuera de la carpeta y la siguiente descarga usa el mismo nombre
+    ruta.rename(tmp_path.parent / f"{tmp_path.name}_movido.pdf")
+    descargas.marcar()
+    ruta.write_bytes(PDF_COMPLETO + b"% segunda descarga\n%%EOF\n")
+    assert descargas.esperar("cufe2", maximo=2) == str(ruta)
+    assert descargas.atribuciones[str(ruta)] == "cufe2"
+
+
+def test_pdf_atribuido_sin_cambios_no_se_repite(tmp_path):
+    ruta = tmp_path / "documento.pdf"
+    descargas = vigilante(tmp_path)
+    descargas.marcar()
+    ruta.write_bytes(PDF_COMPLETO)
+    assert descargas.esperar("cufe1", maximo=2) == str(ruta)
+    assert descargas.esperar("cufe2", maximo=0.3) is None